@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from datetime import timedelta
+from benchmarks.bench_suite import FIRST_DAY, REPOSITORIES, SLOTS_PER_DAY, add_people, generate_appointments
+from src.system import HospitalSystem
+
+def build(repository: str, count: int, doctors: int) -> HospitalSystem:
+    system = HospitalSystem(REPOSITORIES[repository]())
+    add_people(system, 1, doctors)
+    with system.repository.batch():
+        for app in generate_appointments(count, 1, doctors, random.Random(7)):
+            system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+    return system
+
+def timed(query, repeat: int):
+    start = timer.perf_counter()
+    for _ in range(repeat):
+        found = sum(1 for _ in query())
+    return (timer.perf_counter() - start) / repeat, found
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily agenda and weekly doctor schedule: time index against a full scan")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--doctors", type=int, default=100)
+    parser.add_argument("--repository", choices=sorted(REPOSITORIES), default="memory")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'appointments':>12} {'query':>10} {'rows':>6} {'index ms':>9} {'scan ms':>9}")
+    for size in args.sizes:
+        system = build(args.repository, size, args.doctors)
+        day = FIRST_DAY + timedelta(days=size // args.doctors // SLOTS_PER_DAY // 2)
+        queries = {
+            "day": (day, day + timedelta(days=1), None),
+            "week": (day, day + timedelta(days=7), "D00000"),
+        }
+        for name, (start, end, doctor_id) in queries.items():
+            indexed, rows = timed(lambda: system.get_appointments_between(start, end, doctor_id=doctor_id), args.repeat)
+            scan, _ = timed(lambda: (a for a in system.appointments.values()
+                                     if start <= a.date < end and doctor_id in (None, a.doctor_id)), 1)
+            print(f"{size:>12} {name:>10} {rows:>6} {indexed * 1e3:>9.3f} {scan * 1e3:>9.1f}")
+        system.close()
+
+if __name__ == "__main__":
+    main()
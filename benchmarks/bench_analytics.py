@@ -0,0 +1,86 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from collections import Counter
+from datetime import date, time, timedelta
+from benchmarks.bench_suite import add_people
+from src import analytics
+from src.columnar import ColumnarRepository
+from src.models import Appointment, AppointmentStatus
+from src.system import HospitalSystem
+
+STATUSES = list(AppointmentStatus)
+
+def populate(count: int, doctors: int = 1000, patients: int = 100_000) -> HospitalSystem:
+    rng = random.Random(42)
+    system = HospitalSystem(ColumnarRepository())
+    add_people(system, patients, doctors)
+    days = [date(2020, 1, 1) + timedelta(days=d) for d in range(365 * 5)]
+    add = system.repository.add_appointment
+    # Historical data is loaded as-is, like a snapshot restore, so statuses and slots are not validated
+    for i in range(count):
+        add(Appointment(f"A{i:08d}", f"P{rng.randrange(patients):07d}", f"D{rng.randrange(doctors):05d}", rng.choice(days),
+                        time(8 + i % 10, 0), STATUSES[1 + rng.randrange(2)]))
+    return system
+
+def naive(system: HospitalSystem):
+    per_doctor_day = Counter()
+    specialty_totals, specialty_cancelled = Counter(), Counter()
+    insurer_totals, insurer_completed = Counter(), Counter()
+    for app in system.appointments.values():
+        per_doctor_day[(app.doctor_id, app.date)] += 1
+        doctor = system.get_doctor(app.doctor_id)
+        if doctor is not None:
+            specialty_totals[doctor.specialty] += 1
+            if app.status == AppointmentStatus.CANCELLED:
+                specialty_cancelled[doctor.specialty] += 1
+        patient = system.get_patient(app.patient_id)
+        if patient is not None:
+            insurer = patient.insurance_name if patient.has_insurance else analytics.UNINSURED
+            insurer_totals[insurer] += 1
+            if app.status == AppointmentStatus.COMPLETED:
+                insurer_completed[insurer] += 1
+    bands = Counter(patient.age // 10 for patient in system.patients.values())
+    return (dict(per_doctor_day),
+            {s: specialty_cancelled[s] / n for s, n in specialty_totals.items()},
+            {i: insurer_completed[i] / n for i, n in insurer_totals.items()},
+            {f"{b * 10}-{b * 10 + 9}": n for b, n in sorted(bands.items())})
+
+def columnar(system: HospitalSystem, backend: str):
+    columns = analytics.build_columns(system)
+    return (analytics.appointments_per_doctor_per_day(columns, backend),
+            analytics.cancellation_rate_by_specialty(columns, backend),
+            analytics.completion_rate_by_insurer(columns, backend),
+            analytics.age_band_distribution(columns, backend=backend))
+
+def timed(function, *args):
+    start = timer.perf_counter()
+    result = function(*args)
+    return timer.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard aggregates: analytics module vs Python loops over the records")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+    backends = [b for b in analytics.BACKENDS if b != "numpy" or analytics.np is not None]
+
+    print(f"{'appointments':>12} {'method':>14} {'seconds':>9} {'speedup':>8}")
+    for size in args.sizes:
+        system = populate(size)
+        baseline, expected = timed(naive, system)
+        print(f"{size:>12} {'naive loops':>14} {baseline:>9.3f} {1:>8.1f}")
+        for backend in backends:
+            elapsed, result = timed(columnar, system, backend)
+            if result[0] != expected[0] or result[3] != expected[3]:
+                raise AssertionError(f"{backend} results differ from the naive loops")
+            print(f"{size:>12} {backend:>14} {elapsed:>9.3f} {baseline / elapsed:>8.1f}")
+        del system
+
+if __name__ == "__main__":
+    main()
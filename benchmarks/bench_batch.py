@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import io
+import json
+import time as timer
+import random
+from benchmarks.bench_suite import generate_appointments, generate_doctors, generate_patients
+from src.batch import run_batch
+from src.codec import to_dict
+from src.system import HospitalSystem
+
+def generate(count: int, doctors: int = 100, patients: int = 1000) -> str:
+    rng = random.Random(42)
+    lines = [{"op": "add_patient", "args": to_dict(patient)} for patient in generate_patients(patients, rng)]
+    lines += [{"op": "add_doctor", "args": to_dict(doctor)} for doctor in generate_doctors(doctors, rng)]
+    bookings = generate_appointments(count, patients, doctors, rng)
+    # Alternate bookings with lookups and status changes of earlier bookings
+    for i in range(len(lines), count):
+        if i % 4 == 1:
+            lines.append({"op": "get_appointment", "args": {"appointment_id": kept}})
+        elif i % 4 == 3:
+            lines.append({"op": "complete_appointment" if i // 4 % 2 else "cancel_appointment",
+                          "args": {"appointment_id": kept}})
+        else:
+            app = next(bookings)
+            if i % 4 == 0:
+                kept = app.appointment_id
+            lines.append({"op": "schedule_appointment", "args": to_dict(app)})
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of main.py batch mode (src.batch.run_batch)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'commands':>10} {'seconds':>10} {'us/command':>11} {'commands/s':>12} {'failed':>8}")
+    for size in args.sizes:
+        commands = io.StringIO(generate(size))
+        start = timer.perf_counter()
+        report = run_batch(HospitalSystem(), commands, io.StringIO())
+        elapsed = timer.perf_counter() - start
+        print(f"{report.commands:>10} {elapsed:>10.3f} {elapsed / report.commands * 1e6:>11.2f} "
+              f"{report.commands / elapsed:>12.0f} {report.failed:>8}")
+
+if __name__ == "__main__":
+    main()
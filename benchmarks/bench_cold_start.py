@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time as timer
+import random
+from benchmarks.bench_suite import DIAGNOSES, EXAMS, SYMPTOMS, add_people, generate_appointments
+from src.models import Anamnesis, ExamRequest
+from src.persistence import DurableHospitalSystem, SyncPolicy
+
+def populate(system, records: int):
+    # Roughly 2% patients, 0.1% doctors, the rest split between appointments and clinical records
+    patients = max(1, records // 50)
+    doctors = max(1, records // 1000)
+    appointments = max(1, (records - patients - doctors) * 2 // 3)
+    clinical = records - patients - doctors - appointments
+    add_people(system, patients, doctors)
+    rng = random.Random(7)
+    for app in generate_appointments(appointments, patients, doctors, rng):
+        system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time,
+                                    app.description)
+    for i in range(clinical):
+        if i % 2:
+            system.add_anamnesis(Anamnesis(f"A{i:08d}", rng.choice(SYMPTOMS), rng.choice(DIAGNOSES)))
+        else:
+            system.add_exam_request(ExamRequest(f"E{i:08d}", f"A{i:08d}", rng.choice(EXAMS)))
+
+def cold_start(directory: str) -> float:
+    start = timer.perf_counter()
+    system = DurableHospitalSystem(directory)
+    elapsed = timer.perf_counter() - start
+    system.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time from a snapshot versus full log replay")
+    parser.add_argument("--records", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = timer.perf_counter()
+        system = DurableHospitalSystem(directory, SyncPolicy.NEVER)
+        populate(system, args.records)
+        system.close()
+        print(f"built {args.records} records in {timer.perf_counter() - start:.1f}s")
+
+        log_size = os.path.getsize(os.path.join(directory, "journal.log"))
+        print(f"log replay:     {cold_start(directory):8.2f}s  ({log_size / 1e6:.1f} MB log)")
+
+        system = DurableHospitalSystem(directory, SyncPolicy.NEVER)
+        snapshot = system.snapshot()
+        system.close()
+        snapshot_size = os.path.getsize(snapshot)
+        print(f"snapshot load:  {cold_start(directory):8.2f}s  ({snapshot_size / 1e6:.1f} MB snapshot)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import threading
+import time as timer
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.concurrency import ConcurrentHospitalSystem
+
+def book(threads: int, count: int, doctors: int = 100, patients: int = 1000, contended: bool = False):
+    system = ConcurrentHospitalSystem()
+    add_people(system, patients, doctors)
+    appointments = list(generate_appointments(count, patients, doctors, random.Random(7)))
+    rejected = [0] * threads
+
+    def worker(index: int):
+        # Uncontended: each thread owns the slots i with i % threads == index.
+        # Contended: every thread tries every slot and all but one booking fail.
+        for app in appointments[0 if contended else index::1 if contended else threads]:
+            try:
+                system.schedule_appointment(f"{app.appointment_id}-{index}", app.patient_id, app.doctor_id,
+                                            app.date, app.time)
+            except ValueError:
+                rejected[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = timer.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = timer.perf_counter() - start
+
+    booked = len(system.appointments)
+    if booked != count:
+        raise AssertionError(f"Expected {count} bookings, found {booked}")
+    system.check_invariants()
+    return elapsed, sum(rejected)
+
+def main():
+    parser = argparse.ArgumentParser(description="Booking throughput of ConcurrentHospitalSystem by thread count")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--contended", action="store_true", help="have every thread race for every slot")
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'seconds':>10} {'attempts/s':>12} {'bookings/s':>12} {'rejected':>10}")
+    for threads in args.threads:
+        elapsed, rejected = book(threads, args.count, contended=args.contended)
+        attempts = args.count + rejected
+        print(f"{threads:>7} {elapsed:>10.3f} {attempts / elapsed:>12.0f} {args.count / elapsed:>12.0f} {rejected:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import threading
+import time as timer
+import random
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.events import ChangeFeed
+from src.system import HospitalSystem
+
+def build(doctors: int) -> HospitalSystem:
+    system = HospitalSystem()
+    add_people(system, 1, doctors)
+    return system
+
+def book(system: HospitalSystem, count: int, doctors: int) -> float:
+    appointments = list(generate_appointments(count, 1, doctors, random.Random(7)))
+    start = timer.perf_counter()
+    for app in appointments:
+        system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+    return timer.perf_counter() - start
+
+def run(mode: str, count: int, doctors: int, capacity: int, delay: float):
+    """Seconds to book count appointments, events received and events dropped by the subscriber."""
+    system = build(doctors)
+    if mode == "off":
+        return book(system, count, doctors), 0, 0
+    feed = system.enable_change_feed(ChangeFeed(capacity))
+    if mode == "no subscriber":
+        return book(system, count, doctors), 0, 0
+
+    subscription = feed.subscribe()
+    done = threading.Event()
+    received = [0]
+
+    def consume():
+        while not done.is_set() or subscription.position < feed.last_seq:
+            received[0] += len(subscription.poll(max_events=256, timeout=0.01))
+            if mode == "slow subscriber":
+                timer.sleep(delay)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    elapsed = book(system, count, doctors)
+    done.set()
+    consumer.join()
+    return elapsed, received[0], subscription.dropped
+
+def main():
+    parser = argparse.ArgumentParser(description="Booking cost of the change feed, with fast and slow subscribers")
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=4096)
+    parser.add_argument("--delay", type=float, default=0.005, help="Seconds the slow subscriber spends per batch")
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'seconds':>8} {'bookings/s':>11} {'received':>9} {'dropped':>9}")
+    for mode in ("off", "no subscriber", "subscriber", "slow subscriber"):
+        elapsed, received, dropped = run(mode, args.count, args.doctors, args.capacity, args.delay)
+        print(f"{mode:<16} {elapsed:>8.2f} {args.count / elapsed:>11.0f} {received:>9} {dropped:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from benchmarks.bench_suite import REPOSITORIES, add_people, generate_appointments
+from src.models import Anamnesis, ExamRequest
+from src.system import HospitalSystem
+
+def build(repository: str, patients: int, visits: int, doctors: int) -> HospitalSystem:
+    system = HospitalSystem(REPOSITORIES[repository]())
+    with system.repository.batch():
+        add_people(system, patients, doctors)
+        for i, app in enumerate(generate_appointments(patients * visits, patients, doctors, random.Random(7))):
+            system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+            system.add_anamnesis(Anamnesis(app.appointment_id, "Cough", "Flu"))
+            if i % 3 == 0:
+                system.add_exam_request(ExamRequest(f"r{i}", app.appointment_id, "Blood Test"))
+    return system
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart views: cached get_patient_history against rebuilding each time")
+    parser.add_argument("--repositories", nargs="+", choices=sorted(REPOSITORIES), default=sorted(REPOSITORIES))
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--visits", type=int, default=10, help="Appointments per patient")
+    parser.add_argument("--views", type=int, default=20_000)
+    parser.add_argument("--hot", type=int, default=500, help="Patients whose charts are viewed")
+    parser.add_argument("--doctors", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    views = [f"P{rng.randrange(args.hot):07d}" for _ in range(args.views)]
+    print(f"{'repository':<12} {'uncached µs':>12} {'cached µs':>10} {'speedup':>8} {'hit ratio':>10}")
+    for repository in args.repositories:
+        system = build(repository, args.patients, args.visits, args.doctors)
+        start = timer.perf_counter()
+        for patient_id in views:
+            system._load_history(patient_id)
+        uncached = (timer.perf_counter() - start) / len(views)
+        start = timer.perf_counter()
+        for patient_id in views:
+            system.get_patient_history(patient_id)
+        cached = (timer.perf_counter() - start) / len(views)
+        stats = system.history_cache_stats()
+        print(f"{repository:<12} {uncached * 1e6:>12.1f} {cached * 1e6:>10.1f} {uncached / cached:>8.1f} "
+              f"{stats.hit_ratio:>10.3f}")
+        system.close()
+
+if __name__ == "__main__":
+    main()
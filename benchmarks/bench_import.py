@@ -0,0 +1,56 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import tempfile
+import time as timer
+import random
+from benchmarks.bench_suite import generate_appointments, generate_doctors, generate_patients
+from src.codec import to_dict
+from src.importer import import_file
+from src.system import HospitalSystem
+
+def write_csv(path: str, records):
+    with open(path, "w", newline="") as f:
+        w = None
+        for record in records:
+            row = to_dict(record)
+            if w is None:
+                w = csv.DictWriter(f, fieldnames=list(row))
+                w.writeheader()
+            w.writerow(row)
+
+def write_files(directory: str, rows: int):
+    patients = max(1, rows // 10)
+    doctors = max(1, rows // 1000)
+    appointments = rows - patients - doctors
+    rng = random.Random(42)
+    write_csv(os.path.join(directory, "patients.csv"), generate_patients(patients, rng))
+    write_csv(os.path.join(directory, "doctors.csv"), generate_doctors(doctors, rng))
+    write_csv(os.path.join(directory, "appointments.csv"), generate_appointments(appointments, patients, doctors, rng))
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming CSV import throughput")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_files(directory, args.rows)
+        system = HospitalSystem()
+        total_rows, total_time = 0, 0.0
+        for kind in ("patients", "doctors", "appointments"):
+            start = timer.perf_counter()
+            report = import_file(system, kind, os.path.join(directory, f"{kind}.csv"), batch_size=args.batch_size)
+            elapsed = timer.perf_counter() - start
+            total_rows += report.rows
+            total_time += elapsed
+            print(f"{kind:>12}: {report.rows:>8} rows {elapsed:8.2f}s {report.rows / elapsed:>10.0f} rows/s ({len(report.errors)} errors)")
+        print(f"{'total':>12}: {total_rows:>8} rows {total_time:8.2f}s {total_rows / total_time:>10.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
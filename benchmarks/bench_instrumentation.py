@@ -0,0 +1,41 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.system import HospitalSystem
+
+def book(count: int, instrumented: bool, doctors: int = 100) -> float:
+    system = HospitalSystem()
+    if instrumented:
+        system.enable_instrumentation()
+    add_people(system, 1, doctors)
+    appointments = list(generate_appointments(count, 1, doctors, random.Random(7)))
+    start = timer.perf_counter()
+    for app in appointments:
+        system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+        system.get_appointment(app.appointment_id)
+    return timer.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of HospitalSystem instrumentation on booking and lookups")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Alternate the modes so heap growth and timing drift hit both alike
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(args.repeat):
+        for instrumented in best:
+            best[instrumented] = min(best[instrumented], book(args.count, instrumented))
+    print(f"{'mode':>12} {'us/booking+lookup':>18}")
+    for mode, instrumented in (("disabled", False), ("enabled", True)):
+        print(f"{mode:>12} {best[instrumented] / args.count * 1e6:>18.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import random
+import tracemalloc
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.columnar import ColumnarRepository
+from src.models import _SLOTS
+from src.repository import InMemoryRepository
+from src.system import HospitalSystem
+
+REPOSITORIES = {"memory": InMemoryRepository, "columnar": ColumnarRepository}
+
+def bytes_per_appointment(repository_cls, count: int, doctors: int = 100, patients: int = 1000) -> float:
+    system = HospitalSystem(repository_cls())
+    add_people(system, patients, doctors)
+    # Build the argument values before measuring so only what the store keeps is counted
+    rows = [(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+            for app in generate_appointments(count, patients, doctors, random.Random(7))]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i, row in enumerate(rows):
+        appointment = system.schedule_appointment(*row)
+        # Most stored appointments are history rather than future bookings
+        if i % 4:
+            appointment.complete()
+    del appointment
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used per stored appointment by repository")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repositories", nargs="+", choices=sorted(REPOSITORIES), default=["memory", "columnar"])
+    args = parser.parse_args()
+
+    print(f"Python {sys.version.split()[0]}, record __slots__ {'on' if _SLOTS else 'off'}")
+    print(f"{'repository':>10} {'appointments':>12} {'bytes/appointment':>18}")
+    for size in args.sizes:
+        for name in args.repositories:
+            print(f"{name:>10} {size:>12} {bytes_per_appointment(REPOSITORIES[name], size):>18.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from benchmarks.bench_suite import FIRST, LAST, percentile
+from src.search import NameIndex
+
+QUERIES = ["P0012", "mar", "maria", "silva", "maria sil", "joao santos", "slva", "fernandse", "patricia alm",
+           "rodrigo nascimento", "zzz"]
+
+def random_name(rng: random.Random) -> str:
+    # A rare extra surname keeps the vocabulary realistic
+    return f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)}{rng.randrange(5000)}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Front-desk patient search latency (NameIndex.search)")
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = NameIndex()
+    start = timer.perf_counter()
+    for i in range(args.patients):
+        index.add(f"P{i:07d}", random_name(rng))
+    print(f"indexed {args.patients} patients in {timer.perf_counter() - start:.1f}s")
+
+    print(f"{'query':>20} {'hits':>5} {'p50 us':>8} {'p99 us':>8}")
+    for query in QUERIES:
+        latencies = []
+        for _ in range(args.repeat):
+            start = timer.perf_counter()
+            hits = index.search(query, args.limit)
+            latencies.append(timer.perf_counter() - start)
+        latencies.sort()
+        print(f"{query:>20} {len(hits):>5} {percentile(latencies, 0.5) * 1e6:>8.1f} {percentile(latencies, 0.99) * 1e6:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.system import HospitalSystem
+
+def book(count: int, doctors: int = 100, patients: int = 1000) -> float:
+    system = HospitalSystem()
+    add_people(system, patients, doctors)
+    appointments = list(generate_appointments(count, patients, doctors, random.Random(7)))
+
+    start = timer.perf_counter()
+    for app in appointments:
+        system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+    return timer.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk booking throughput of HospitalSystem.schedule_appointment")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'appointments':>12} {'seconds':>10} {'us/booking':>11} {'bookings/s':>12}")
+    for size in args.sizes:
+        elapsed = book(size)
+        print(f"{size:>12} {elapsed:>10.3f} {elapsed / size * 1e6:>11.2f} {size / elapsed:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from benchmarks.bench_suite import percentile
+from src.search import TextIndex, fold
+
+SYMPTOMS = ["dor", "peito", "cabeça", "febre", "tosse", "falta", "ar", "náusea", "vômito", "tontura", "cansaço",
+            "palpitação", "dispneia", "edema", "lombar", "abdominal", "coceira", "mancha", "pressão", "alta"]
+DIAGNOSES = ["angina", "enxaqueca", "gripe", "pneumonia", "asma", "hipertensão", "gastrite", "dermatite",
+             "arritmia", "lombalgia", "sinusite", "anemia", "diabetes", "bronquite", "otite", "covid"]
+EXAMS = ["hemograma", "eletrocardiograma", "raio-x", "tórax", "ressonância", "ultrassom", "glicemia", "urina",
+         "ecocardiograma", "tomografia"]
+QUERIES = [("dor peito", True), ("febre tosse", True), ("pressão alta hipertensão", True), ("angina", True),
+           ("raio-x torax", True), ("asma bronquite", False), ("dor", False), ("eletrocardiograma arritmia", False)]
+
+def note(rng: random.Random) -> str:
+    return " ".join(rng.choices(SYMPTOMS, k=4) + ["de"] + rng.choices(DIAGNOSES, k=1) + rng.choices(EXAMS, k=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Clinical text search latency: inverted index vs substring scan")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20, help="top-k results per query")
+    args = parser.parse_args()
+
+    print(f"{'documents':>10} {'query':>28} {'mode':>4} {'hits':>8} {'p50 ms':>8} {'p99 ms':>8} {'scan ms':>9}")
+    for size in args.sizes:
+        rng = random.Random(42)
+        index = TextIndex()
+        notes = {}
+        for i in range(size):
+            text = note(rng)
+            index.add(f"a{i}", text)
+            notes[f"a{i}"] = fold(text)
+
+        for query, match_all in QUERIES:
+            latencies = []
+            for _ in range(args.repeat):
+                start = timer.perf_counter()
+                index.search(query, match_all, args.limit)
+                latencies.append(timer.perf_counter() - start)
+            latencies.sort()
+            hits = len(index.search(query, match_all))
+
+            # The linear scan this replaces: substring tests over every note
+            words = fold(query).split()
+            start = timer.perf_counter()
+            test = all if match_all else any
+            [doc for doc, text in notes.items() if test(word in text for word in words)]
+            scan = timer.perf_counter() - start
+
+            print(f"{size:>10} {query:>28} {'and' if match_all else 'or':>4} {hits:>8} "
+                  f"{percentile(latencies, 0.5) * 1e3:>8.2f} {percentile(latencies, 0.99) * 1e3:>8.2f} {scan * 1e3:>9.1f}")
+
+if __name__ == "__main__":
+    main()
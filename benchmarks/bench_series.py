@@ -0,0 +1,65 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time as timer
+from datetime import date, time, timedelta
+from benchmarks.bench_suite import add_people
+from src.columnar import ColumnarRepository
+from src.models import Recurrence
+from src.persistence import DurableHospitalSystem, SyncPolicy
+from src.repository import InMemoryRepository, SqliteRepository
+from src.system import HospitalSystem
+
+START_DAY = date(2025, 1, 6)
+
+def single(system, n: int):
+    system.schedule_appointment(f"a{n}", "P0000000", f"D{n:05d}", START_DAY, time(9, 0))
+
+def one_by_one(system, n: int, weeks: int):
+    for week in range(weeks):
+        system.schedule_appointment(f"a{n}-{week + 1}", "P0000000", f"D{n:05d}", START_DAY + timedelta(weeks=week), time(9, 0))
+
+def series(system, n: int, weeks: int):
+    system.schedule_series(f"a{n}", "P0000000", f"D{n:05d}", START_DAY, time(9, 0), Recurrence.weekly(count=weeks))
+
+def measure(make_system, book, repeat: int) -> float:
+    """Seconds per call, each call on a doctor with an empty agenda."""
+    system = make_system()
+    try:
+        add_people(system, 1, repeat)
+        start = timer.perf_counter()
+        for n in range(repeat):
+            book(system, n)
+        return (timer.perf_counter() - start) / repeat
+    finally:
+        system.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Booking a weekly series at once against one appointment at a time")
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setups = {
+            "memory": lambda: HospitalSystem(InMemoryRepository()),
+            "columnar": lambda: HospitalSystem(ColumnarRepository()),
+            "sqlite file": lambda: HospitalSystem(SqliteRepository(os.path.join(directory, f"{timer.perf_counter_ns()}.db"))),
+            "durable always": lambda: DurableHospitalSystem(
+                os.path.join(directory, str(timer.perf_counter_ns())), SyncPolicy.ALWAYS),
+        }
+        print(f"{'setup':<16} {'single µs':>10} {f'{args.weeks} calls µs':>13} {'series µs':>10} {'series/single':>14}")
+        for name, make_system in setups.items():
+            repeat = args.repeat if name in ("memory", "columnar") else max(1, args.repeat // 10)
+            one = measure(make_system, single, repeat)
+            calls = measure(make_system, lambda s, n: one_by_one(s, n, args.weeks), repeat)
+            whole = measure(make_system, lambda s, n: series(s, n, args.weeks), repeat)
+            print(f"{name:<16} {one * 1e6:>10.1f} {calls * 1e6:>13.1f} {whole * 1e6:>10.1f} {whole / one:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import random
+import time as timer
+from benchmarks.bench_suite import generate_appointments, generate_doctors, generate_patients, percentile
+from src.codec import to_dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def encode(method: str, path: str, body=None) -> bytes:
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    return f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode("ascii") + data
+
+async def read_status(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    length = next(int(line.split(b":")[1]) for line in lines if line.lower().startswith(b"content-length:"))
+    await reader.readexactly(length)
+    return int(lines[0].split(b" ")[1])
+
+async def run_connection(port: int, requests, pipeline: int, latencies, failures):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for start in range(0, len(requests), pipeline):
+        window = requests[start:start + pipeline]
+        sent = timer.perf_counter()
+        writer.write(b"".join(window))
+        for _ in window:
+            if await read_status(reader) >= 400:
+                failures.append(1)
+            # Latency of a pipelined request runs from sending its window to reading its response
+            latencies.append(timer.perf_counter() - sent)
+    writer.close()
+
+def workload(name: str, count: int, patients: int, doctors: int):
+    rng = random.Random(7)
+    if name == "read":
+        return [encode("GET", f"/patients/P{rng.randrange(patients):07d}") for _ in range(count)]
+    return [encode("POST", "/appointments", to_dict(app)) for app in generate_appointments(count, patients, doctors, rng)]
+
+async def load(port: int, args, connections: int):
+    rng = random.Random(42)
+    seed = [encode("POST", "/patients", to_dict(patient)) for patient in generate_patients(args.patients, rng)]
+    seed += [encode("POST", "/doctors", to_dict(doctor)) for doctor in generate_doctors(args.doctors, rng)]
+    await run_connection(port, seed, 256, [], [])
+
+    requests = workload(args.workload, args.requests, args.patients, args.doctors)
+    latencies, failures = [], []
+    start = timer.perf_counter()
+    await asyncio.gather(*(
+        run_connection(port, requests[i::connections], args.pipeline, latencies, failures)
+        for i in range(connections)
+    ))
+    return timer.perf_counter() - start, sorted(latencies), len(failures)
+
+async def wait_for_server(port: int):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("Server did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the HTTP/JSON server (src/main.py serve)")
+    parser.add_argument("--workload", choices=["read", "book"], default="read")
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--pipeline", type=int, default=1, help="requests in flight per connection")
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--doctors", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'connections':>11} {'pipeline':>8} {'seconds':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for connections in args.connections:
+        # A fresh server per run so booking runs start from an empty schedule
+        port = free_port()
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "src", "main.py"), "serve", "--port", str(port)],
+                                   stderr=subprocess.DEVNULL)
+        try:
+            asyncio.run(wait_for_server(port))
+            elapsed, latencies, errors = asyncio.run(load(port, args, connections))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{connections:>11} {args.pipeline:>8} {elapsed:>9.3f} {len(latencies) / elapsed:>9.0f} "
+              f"{percentile(latencies, 0.5) * 1e3:>8.2f} {percentile(latencies, 0.99) * 1e3:>8.2f} {errors:>7}")
+
+if __name__ == "__main__":
+    main()
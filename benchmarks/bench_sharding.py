@@ -0,0 +1,55 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time as timer
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.sharding import ShardedHospitalSystem
+from src.system import HospitalSystem
+
+def appointments(count: int, doctors: int, patients: int):
+    return list(generate_appointments(count, patients, doctors, random.Random(7)))
+
+def single_process(count: int, doctors: int, patients: int) -> float:
+    system = HospitalSystem()
+    add_people(system, patients, doctors)
+    rows = appointments(count, doctors, patients)
+    start = timer.perf_counter()
+    for app in rows:
+        system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+    return timer.perf_counter() - start
+
+def sharded(shards: int, count: int, doctors: int, patients: int, chunk: int) -> float:
+    with ShardedHospitalSystem(shards) as front:
+        add_people(front, patients, doctors)
+        rows = appointments(count, doctors, patients)
+        start = timer.perf_counter()
+        for offset in range(0, count, chunk):
+            result = front.schedule_many(rows[offset:offset + chunk])
+            assert not result.errors, result.errors[:3]
+        return timer.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Booking throughput of ShardedHospitalSystem by number of shards")
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--doctors", type=int, default=400)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--chunk", type=int, default=10_000, help="Appointments per schedule_many call")
+    parser.add_argument("--shards", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, os.cpu_count() or 1} & set(range(1, (os.cpu_count() or 1) + 1))))
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'shards':>8} {'seconds':>8} {'bookings/s':>11} {'speedup':>8}")
+    base = single_process(args.count, args.doctors, args.patients)
+    print(f"{'none':>8} {base:>8.2f} {args.count / base:>11.0f} {1:>8.2f}")
+    for shards in args.shards:
+        elapsed = sharded(shards, args.count, args.doctors, args.patients, args.chunk)
+        print(f"{shards:>8} {elapsed:>8.2f} {args.count / elapsed:>11.0f} {base / elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
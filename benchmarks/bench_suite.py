@@ -0,0 +1,395 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import inspect
+import json
+import platform
+import random
+import subprocess
+import time as timer
+import tracemalloc
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from src.columnar import ColumnarRepository
+from src.models import Patient, Doctor, Appointment, Anamnesis, ExamRequest, MedicalCertificate, Recurrence
+from src.repository import InMemoryRepository, SqliteRepository
+from src.system import HospitalSystem
+
+REPOSITORIES = {"memory": InMemoryRepository, "sqlite": SqliteRepository, "columnar": ColumnarRepository}
+
+FIRST = ["Maria", "José", "Ana", "João", "Antônio", "Francisca", "Carlos", "Paulo", "Pedro", "Lucas", "Luiz",
+         "Marcos", "Luís", "Gabriel", "Rafael", "Márcia", "Daniel", "Marcelo", "Bruno", "Eduardo", "Felipe",
+         "Raimundo", "Rodrigo", "Adriana", "Juliana", "Fernanda", "Patrícia", "Aline", "Sandra", "Camila"]
+LAST = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+        "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+        "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas"]
+SPECIALTIES = ["Cardiologia", "Clínica Geral", "Dermatologia", "Endocrinologia", "Neurologia", "Ortopedia",
+               "Pediatria", "Psiquiatria"]
+INSURERS = ["Unimed", "Amil", "Bradesco Saúde", "SulAmérica"]
+SYMPTOMS = ["dor de cabeça", "febre alta", "tosse seca", "dor torácica", "falta de ar", "náusea", "tontura",
+            "dor lombar", "pressão alta", "cansaço"]
+DIAGNOSES = ["enxaqueca", "gripe", "bronquite", "hipertensão", "gastrite", "lombalgia", "ansiedade", "sinusite"]
+EXAMS = ["Hemograma", "Raio-X de tórax", "Eletrocardiograma", "Glicemia", "Ressonância", "Ultrassom"]
+
+FIRST_DAY = date(2024, 1, 1)
+SLOTS_PER_DAY = 16
+
+# Methods with nothing worth timing
+SKIPPED = {"close", "enable_instrumentation", "disable_instrumentation", "enable_change_feed", "disable_change_feed",
+           "history_cache_stats"}
+
+# Lower is better for every metric except throughput
+METRICS = ("throughput", "p50_us", "p90_us", "p99_us", "peak_kib")
+# Differences below these are noise, whatever the ratio
+NOISE_FLOOR = {"throughput": 0.0, "p50_us": 1.0, "p90_us": 1.0, "p99_us": 2.0, "peak_kib": 1.0}
+
+def generate_patients(count: int, rng: random.Random) -> Iterator[Patient]:
+    for i in range(count):
+        insured = rng.random() < 0.6
+        yield Patient(f"P{i:07d}", f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)}",
+                      rng.randrange(0, 100), rng.choice("FM"), insured, rng.choice(INSURERS) if insured else "")
+
+def generate_doctors(count: int, rng: random.Random) -> Iterator[Doctor]:
+    for i in range(count):
+        yield Doctor(f"D{i:05d}", f"Dr. {rng.choice(FIRST)} {rng.choice(LAST)}", SPECIALTIES[i % len(SPECIALTIES)])
+
+def slot_moment(slot: int) -> Tuple[date, time]:
+    """Nth half-hour slot of a doctor's agenda, 16 per day from 08:00."""
+    day, index = divmod(slot, SLOTS_PER_DAY)
+    return FIRST_DAY + timedelta(days=day), time(8 + index // 2, 30 * (index % 2))
+
+def generate_appointments(count: int, patients: int, doctors: int, rng: random.Random) -> Iterator[Appointment]:
+    # Doctors take turns, so agendas fill up day by day without clashes
+    for i in range(count):
+        slot, doctor = divmod(i, doctors)
+        app_date, app_time = slot_moment(slot)
+        yield Appointment(f"A{i:08d}", f"P{rng.randrange(patients):07d}", f"D{doctor:05d}", app_date, app_time,
+                          description=rng.choice(SYMPTOMS))
+
+def add_people(system, patients: int, doctors: int, seed: int = 42):
+    """Add generated patients and doctors to a HospitalSystem or anything with the same add methods."""
+    rng = random.Random(seed)
+    for patient in generate_patients(patients, rng):
+        system.add_patient(patient)
+    for doctor in generate_doctors(doctors, rng):
+        system.add_doctor(doctor)
+
+class Dataset:
+    """A populated system plus what cases need to pick existing records or make new ones."""
+
+    def __init__(self, system: HospitalSystem, size: int, patients: int, doctors: int, seed: int):
+        self.system = system
+        self.size = size
+        self.patients = patients
+        self.doctors = doctors
+        self.rng = random.Random(seed + 1)
+        self._serial = 0
+        # New bookings go after the generated agendas
+        self._next_slot = (size // doctors + 1 + SLOTS_PER_DAY) // SLOTS_PER_DAY * SLOTS_PER_DAY * doctors
+        self.days = self._next_slot // doctors // SLOTS_PER_DAY
+
+    def new_id(self, prefix: str) -> str:
+        self._serial += 1
+        return f"{prefix}-new{self._serial:07d}"
+
+    def patient_id(self) -> str:
+        return f"P{self.rng.randrange(self.patients):07d}"
+
+    def doctor_id(self) -> str:
+        return f"D{self.rng.randrange(self.doctors):05d}"
+
+    def appointment_id(self) -> str:
+        return f"A{self.rng.randrange(self.size):08d}"
+
+    def recorded_appointment_id(self) -> str:
+        """An appointment that got an anamnesis, exam request and certificate when generated."""
+        return f"A{self.rng.randrange(0, self.size, 50):08d}"
+
+    def day(self) -> date:
+        return FIRST_DAY + timedelta(days=self.rng.randrange(self.days))
+
+    def new_patient(self) -> Patient:
+        return Patient(self.new_id("P"), f"{self.rng.choice(FIRST)} {self.rng.choice(LAST)}", 40, "F")
+
+    def new_doctor(self) -> Doctor:
+        return Doctor(self.new_id("D"), f"Dr. {self.rng.choice(LAST)}", self.rng.choice(SPECIALTIES))
+
+    def new_appointment(self) -> Appointment:
+        slot, doctor = divmod(self._next_slot, self.doctors)
+        self._next_slot += 1
+        app_date, app_time = slot_moment(slot)
+        return Appointment(self.new_id("A"), self.patient_id(), f"D{doctor:05d}", app_date, app_time)
+
+    def book(self) -> str:
+        app = self.new_appointment()
+        self.system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+        return app.appointment_id
+
+def build(repository: str, size: int, seed: int = 42) -> Dataset:
+    """A system with size appointments: 40% completed, 10% cancelled, clinical records on every tenth."""
+    rng = random.Random(seed)
+    patients, doctors = max(100, size // 10), max(10, size // 500)
+    system = HospitalSystem(REPOSITORIES[repository]())
+    with system.repository.batch():
+        for patient in generate_patients(patients, rng):
+            system.add_patient(patient)
+        for doctor in generate_doctors(doctors, rng):
+            system.add_doctor(doctor)
+        for i, app in enumerate(generate_appointments(size, patients, doctors, rng)):
+            system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time,
+                                        app.description)
+            if i % 10 < 4:
+                system.complete_appointment(app.appointment_id)
+            elif i % 10 == 4:
+                system.cancel_appointment(app.appointment_id)
+            if i % 10 == 0:
+                system.add_anamnesis(Anamnesis(app.appointment_id, app.description, rng.choice(DIAGNOSES)))
+            if i % 50 == 0:
+                system.add_exam_request(ExamRequest(f"E{i:08d}", app.appointment_id, rng.choice(EXAMS)))
+                system.add_medical_certificate(MedicalCertificate(f"C{i:08d}", app.appointment_id, 3))
+    return Dataset(system, size, patients, doctors, seed)
+
+# A case prepares the calls for one method, untimed, and returns the function with one argument tuple per call
+Prepare = Callable[[Dataset, int], Tuple[Callable, List[tuple]]]
+
+def _calls(count: int, make: Callable[[], tuple]) -> List[tuple]:
+    return [make() for _ in range(count)]
+
+def _booked(data: Dataset, count: int) -> List[tuple]:
+    with data.system.repository.batch():
+        return [(data.book(),) for _ in range(count)]
+
+def _removable_patients(data: Dataset, count: int) -> List[tuple]:
+    patients = [data.new_patient() for _ in range(count)]
+    with data.system.repository.batch():
+        for patient in patients:
+            data.system.add_patient(patient)
+    return [(patient.patient_id,) for patient in patients]
+
+def _removable_doctors(data: Dataset, count: int) -> List[tuple]:
+    doctors = [data.new_doctor() for _ in range(count)]
+    with data.system.repository.batch():
+        for doctor in doctors:
+            data.system.add_doctor(doctor)
+    return [(doctor.doctor_id,) for doctor in doctors]
+
+def _week(data: Dataset) -> tuple:
+    start = data.day()
+    return start, start + timedelta(days=6)
+
+def _agenda(system: HospitalSystem, start: date, end: date, doctor_id: Optional[str] = None) -> int:
+    # The iterator is lazy, so consume it to time the whole query
+    return sum(1 for _ in system.get_appointments_between(start, end, doctor_id))
+
+BULK = 100
+
+CASES: Dict[str, Prepare] = {
+    "add_patient": lambda d, n: (d.system.add_patient, _calls(n, lambda: (d.new_patient(),))),
+    "get_patient": lambda d, n: (d.system.get_patient, _calls(n, lambda: (d.patient_id(),))),
+    "remove_patient": lambda d, n: (d.system.remove_patient, _removable_patients(d, n)),
+    "search_patients": lambda d, n: (d.system.search_patients, _calls(n, lambda: (
+        f"{d.rng.choice(FIRST)} {d.rng.choice(LAST)[:4]}",))),
+    "add_doctor": lambda d, n: (d.system.add_doctor, _calls(n, lambda: (d.new_doctor(),))),
+    "get_doctor": lambda d, n: (d.system.get_doctor, _calls(n, lambda: (d.doctor_id(),))),
+    "remove_doctor": lambda d, n: (d.system.remove_doctor, _removable_doctors(d, n)),
+    "schedule_appointment": lambda d, n: (d.system.schedule_appointment, _calls(n, lambda: (
+        lambda app: (app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time))(d.new_appointment()))),
+    # A year of weekly visits, each series on a doctor with an empty agenda
+    "schedule_series": lambda d, n: (d.system.schedule_series, [
+        (d.new_id("S"), d.patient_id(), doctor_id, FIRST_DAY, time(9, 0), Recurrence.weekly(count=52))
+        for (doctor_id,) in _removable_doctors(d, n)]),
+    "cancel_appointment": lambda d, n: (d.system.cancel_appointment, _booked(d, n)),
+    "complete_appointment": lambda d, n: (d.system.complete_appointment, _booked(d, n)),
+    "get_appointment": lambda d, n: (d.system.get_appointment, _calls(n, lambda: (d.appointment_id(),))),
+    "get_appointments_by_patient": lambda d, n: (d.system.get_appointments_by_patient,
+                                                 _calls(n, lambda: (d.patient_id(),))),
+    "get_appointments_by_doctor": lambda d, n: (d.system.get_appointments_by_doctor,
+                                                _calls(n, lambda: (d.doctor_id(),))),
+    "get_appointments_between": lambda d, n: (lambda *args: _agenda(d.system, *args), _calls(n, lambda: (
+        lambda day: (day, day + timedelta(days=7), d.doctor_id()))(d.day()))),
+    "get_appointment_counts": lambda d, n: (d.system.get_appointment_counts,
+                                            _calls(n, lambda: (d.doctor_id(), None, d.day()))),
+    "appointment_counts_snapshot": lambda d, n: (d.system.appointment_counts_snapshot, _calls(n, tuple)),
+    "count_active_appointments_by_patient": lambda d, n: (d.system.count_active_appointments_by_patient,
+                                                          _calls(n, lambda: (d.patient_id(),))),
+    "count_active_appointments_by_doctor": lambda d, n: (d.system.count_active_appointments_by_doctor,
+                                                         _calls(n, lambda: (d.doctor_id(),))),
+    "get_doctors_by_specialty": lambda d, n: (d.system.get_doctors_by_specialty,
+                                              _calls(n, lambda: (d.rng.choice(SPECIALTIES),))),
+    "find_free_slots": lambda d, n: (d.system.find_free_slots, _calls(n, lambda: _week(d) + (d.doctor_id(),))),
+    "add_anamnesis": lambda d, n: (d.system.add_anamnesis, [
+        (Anamnesis(app_id, d.rng.choice(SYMPTOMS), d.rng.choice(DIAGNOSES)),) for (app_id,) in _booked(d, n)]),
+    "get_anamnesis": lambda d, n: (d.system.get_anamnesis, _calls(n, lambda: (d.recorded_appointment_id(),))),
+    "add_exam_request": lambda d, n: (d.system.add_exam_request, _calls(n, lambda: (
+        ExamRequest(d.new_id("E"), d.appointment_id(), d.rng.choice(EXAMS)),))),
+    "get_exam_requests_by_appointment": lambda d, n: (d.system.get_exam_requests_by_appointment,
+                                                      _calls(n, lambda: (d.recorded_appointment_id(),))),
+    "add_medical_certificate": lambda d, n: (d.system.add_medical_certificate, _calls(n, lambda: (
+        MedicalCertificate(d.new_id("C"), d.appointment_id(), 2),))),
+    "get_medical_certificates_by_appointment": lambda d, n: (d.system.get_medical_certificates_by_appointment,
+                                                             _calls(n, lambda: (d.recorded_appointment_id(),))),
+    "get_patient_history": lambda d, n: (d.system.get_patient_history, _calls(n, lambda: (d.patient_id(),))),
+    "get_appointment_bundle": lambda d, n: (d.system.get_appointment_bundle,
+                                            _calls(n, lambda: (d.recorded_appointment_id(),))),
+    "search_clinical_text": lambda d, n: (d.system.search_clinical_text, _calls(n, lambda: (
+        d.rng.choice(SYMPTOMS), True, 20))),
+    # Bulk cases time one batch of BULK records per call
+    "bulk_add_patients": lambda d, n: (d.system.bulk_add_patients, _calls(n, lambda: (
+        [d.new_patient() for _ in range(BULK)],))),
+    "bulk_add_doctors": lambda d, n: (d.system.bulk_add_doctors, _calls(n, lambda: (
+        [d.new_doctor() for _ in range(BULK)],))),
+    "bulk_schedule": lambda d, n: (d.system.bulk_schedule, _calls(n, lambda: (
+        [d.new_appointment() for _ in range(BULK)],))),
+    "check_invariants": lambda d, n: (d.system.check_invariants, _calls(n, tuple)),
+}
+
+# Calls per measurement for cases that scan everything or insert in batches
+MAX_OPS = {"appointment_counts_snapshot": 20, "check_invariants": 3, "get_doctors_by_specialty": 100,
+           "bulk_add_patients": 20, "bulk_add_doctors": 20, "bulk_schedule": 20,
+           "schedule_series": 20}
+
+def public_methods() -> List[str]:
+    return sorted(name for name, member in inspect.getmembers(HospitalSystem, inspect.isfunction)
+                  if not name.startswith("_"))
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """The value at fraction of sorted values."""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def measure(data: Dataset, method: str, ops: int, memory_ops: int) -> Dict[str, float]:
+    ops = min(ops, MAX_OPS.get(method, ops))
+    function, calls = CASES[method](data, ops)
+    latencies = []
+    for args in calls:
+        start = timer.perf_counter_ns()
+        function(*args)
+        latencies.append(timer.perf_counter_ns() - start)
+    latencies.sort()
+
+    # tracemalloc slows every allocation down, so memory gets its own, smaller round
+    function, calls = CASES[method](data, max(1, min(ops, memory_ops)))
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for args in calls:
+        function(*args)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    total = sum(latencies) or 1
+    return {
+        "ops": len(latencies),
+        "throughput": len(latencies) / total * 1e9,
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p90_us": percentile(latencies, 0.90) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+        "max_us": latencies[-1] / 1e3,
+        "peak_kib": max(0, peak) / 1024,
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def run(repository: str, sizes: List[int], methods: List[str], ops: int, memory_ops: int, seed: int) -> dict:
+    results = []
+    for size in sizes:
+        start = timer.perf_counter()
+        data = build(repository, size, seed)
+        print(f"built {size} appointments in {timer.perf_counter() - start:.1f}s", file=sys.stderr)
+        for method in methods:
+            result = {"repository": repository, "size": size, "method": method}
+            result.update(measure(data, method, ops, memory_ops))
+            results.append(result)
+            print(f"{size:>10} {method:>40} {result['throughput']:>12.0f} {result['p50_us']:>9.1f} "
+                  f"{result['p99_us']:>9.1f} {result['peak_kib']:>9.1f}")
+        data.system.close()
+    return {
+        "meta": {"commit": git_commit(), "created": datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "platform": platform.platform(), "seed": seed,
+                 "ops": ops, "memory_ops": memory_ops},
+        "results": results,
+    }
+
+def compare(baseline: dict, current: dict, threshold: float, metrics: Sequence[str]) -> List[str]:
+    """Regressions of current against baseline, as printable lines; entries missing from either side are skipped."""
+    previous = {(r["repository"], r["size"], r["method"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["repository"], result["size"], result["method"]))
+        if old is None:
+            continue
+        for metric in metrics:
+            before, after = old[metric], result[metric]
+            if metric == "throughput":
+                worse = after < before * (1 - threshold)
+            else:
+                worse = after > before * (1 + threshold) and after - before > NOISE_FLOOR[metric]
+            if worse:
+                change = (after - before) / before * 100 if before else float("inf")
+                regressions.append(f"{result['repository']} {result['size']} {result['method']} {metric}: "
+                                   f"{before:.1f} -> {after:.1f} ({change:+.0f}%)")
+    return regressions
+
+def report(regressions: List[str], threshold: float) -> int:
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%}.")
+        return 0
+    print(f"{len(regressions)} regressions beyond {threshold:.0%}:")
+    for line in regressions:
+        print(f"  {line}")
+    return 1
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Throughput, latency and memory of every public HospitalSystem method")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Measure and save results as JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                            help="Appointments in the generated data set (up to 10_000_000)")
+    run_parser.add_argument("--repository", choices=sorted(REPOSITORIES), default="memory")
+    run_parser.add_argument("--methods", nargs="+", choices=sorted(CASES), default=None)
+    run_parser.add_argument("--ops", type=int, default=1000, help="Timed calls per method")
+    run_parser.add_argument("--memory-ops", type=int, default=100, help="Calls traced for peak memory per method")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.add_argument("--baseline", help="Earlier results to compare against")
+    run_parser.add_argument("--threshold", type=float, default=0.10)
+    run_parser.add_argument("--metrics", nargs="+", choices=METRICS, default=["p50_us", "peak_kib"])
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Allowed slowdown as a fraction, 0.10 meaning 10%%")
+    compare_parser.add_argument("--metrics", nargs="+", choices=METRICS, default=["p50_us", "peak_kib"])
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        return report(compare(load(args.baseline), load(args.current), args.threshold, args.metrics), args.threshold)
+
+    missing = [name for name in public_methods() if name not in CASES and name not in SKIPPED]
+    if missing:
+        print(f"No benchmark case for: {', '.join(missing)}", file=sys.stderr)
+    print(f"{'size':>10} {'method':>40} {'ops/s':>12} {'p50 us':>9} {'p99 us':>9} {'peak KiB':>9}")
+    results = run(args.repository, args.sizes, args.methods or list(CASES), args.ops, args.memory_ops, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {len(results['results'])} results to {args.output}")
+    if args.baseline:
+        return report(compare(load(args.baseline), results, args.threshold, args.metrics), args.threshold)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
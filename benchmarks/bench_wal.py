@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time as timer
+import random
+from benchmarks.bench_suite import add_people, generate_appointments
+from src.persistence import DurableHospitalSystem, SyncPolicy
+
+def run(policy: SyncPolicy, count: int, batch_size: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        system = DurableHospitalSystem(directory, policy, batch_size=batch_size)
+        add_people(system, 1, 10)
+        appointments = list(generate_appointments(count, 1, 10, random.Random(7)))
+        start = timer.perf_counter()
+        for app in appointments:
+            system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time)
+        system.close()
+        return timer.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Journaled booking throughput for each fsync policy")
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'policy':>8} {'records':>8} {'seconds':>9} {'records/s':>10}")
+    for policy in SyncPolicy:
+        # fsync per record is orders of magnitude slower; keep its run short
+        count = max(1, args.count // 20) if policy == SyncPolicy.ALWAYS else args.count
+        elapsed = run(policy, count, args.batch_size)
+        print(f"{policy.value:>8} {count:>8} {elapsed:>9.3f} {count / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import threading
+from datetime import date
+from typing import Dict, List, Optional
+from src.models import Appointment, AppointmentStatus
+
+STATUSES = list(AppointmentStatus)
+_INDEX = {status: index for index, status in enumerate(STATUSES)}
+
+# Per-day counts, one slot per AppointmentStatus in STATUSES order
+DayCounts = Dict[date, List[int]]
+
+def _copy(days: DayCounts) -> DayCounts:
+    return {day: list(counts) for day, counts in days.items()}
+
+def _bump(days: DayCounts, day: date, index: int, delta: int):
+    counts = days.get(day)
+    if counts is None:
+        counts = days[day] = [0] * len(STATUSES)
+    counts[index] += delta
+    if not any(counts):
+        del days[day]
+
+class AppointmentCounts:
+    """Appointment counts by status per doctor, specialty and day, as of one moment."""
+
+    def __init__(self, by_doctor: Optional[Dict[str, DayCounts]] = None,
+                 by_specialty: Optional[Dict[str, DayCounts]] = None, by_day: Optional[DayCounts] = None,
+                 version: int = 0):
+        self._by_doctor: Dict[str, DayCounts] = by_doctor if by_doctor is not None else {}
+        self._by_specialty: Dict[str, DayCounts] = by_specialty if by_specialty is not None else {}
+        self._by_day: DayCounts = by_day if by_day is not None else {}
+        # Number of changes applied so far
+        self.version = version
+
+    def by_status(self, doctor_id: Optional[str] = None, specialty: Optional[str] = None,
+                  day: Optional[date] = None) -> Dict[AppointmentStatus, int]:
+        """Counts for one doctor or one specialty (or all appointments), on one day or over all days."""
+        if doctor_id is not None and specialty is not None:
+            raise ValueError("Provide either a doctor ID or a specialty")
+        if doctor_id is not None:
+            days = self._by_doctor.get(doctor_id, {})
+        elif specialty is not None:
+            days = self._by_specialty.get(specialty, {})
+        else:
+            days = self._by_day
+        if day is not None:
+            totals = days.get(day, [0] * len(STATUSES))
+        else:
+            totals = [sum(column) for column in zip(*days.values())] or [0] * len(STATUSES)
+        return dict(zip(STATUSES, totals))
+
+    def count(self, doctor_id: Optional[str] = None, specialty: Optional[str] = None, day: Optional[date] = None,
+              status: Optional[AppointmentStatus] = None) -> int:
+        counts = self.by_status(doctor_id, specialty, day)
+        return counts[status] if status is not None else sum(counts.values())
+
+class AppointmentCounters(AppointmentCounts):
+    """Live counts kept up to date by HospitalSystem in O(1) per change.
+
+    Statuses are passed in rather than read from the appointment, since a change made inside a
+    batch is only counted once the batch commits.
+
+    Queries run under the same lock as updates, so a result never mixes the halves of a
+    status change. snapshot() copies everything at once for several related queries.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        # Each doctor's current specialty; a removed doctor's appointments count under none, as they
+        # do when the counters are rebuilt from the records
+        self._specialties: Dict[str, Optional[str]] = {}
+
+    def add(self, appointment: Appointment, specialty: Optional[str], status: AppointmentStatus):
+        with self._lock:
+            self._specialties.setdefault(appointment.doctor_id, specialty)
+            self._apply(appointment, _INDEX[status], 1)
+            self.version += 1
+
+    def set_specialty(self, doctor_id: str, specialty: Optional[str]):
+        """Count the doctor's appointments under specialty from now on, or under none."""
+        with self._lock:
+            previous = self._specialties.pop(doctor_id, None)
+            if specialty is not None:
+                self._specialties[doctor_id] = specialty
+            days = self._by_doctor.get(doctor_id)
+            if previous == specialty or not days:
+                return
+            for day, counts in days.items():
+                for index, count in enumerate(counts):
+                    if previous is not None:
+                        _bump(self._by_specialty[previous], day, index, -count)
+                    if specialty is not None:
+                        _bump(self._by_specialty.setdefault(specialty, {}), day, index, count)
+            self.version += 1
+
+    def move(self, appointment: Appointment, previous: AppointmentStatus, status: AppointmentStatus):
+        if status == previous:
+            return
+        with self._lock:
+            self._apply(appointment, _INDEX[previous], -1)
+            self._apply(appointment, _INDEX[status], 1)
+            self.version += 1
+
+    def _apply(self, appointment: Appointment, index: int, delta: int):
+        day = appointment.date
+        _bump(self._by_doctor.setdefault(appointment.doctor_id, {}), day, index, delta)
+        specialty = self._specialties.get(appointment.doctor_id)
+        if specialty is not None:
+            _bump(self._by_specialty.setdefault(specialty, {}), day, index, delta)
+        _bump(self._by_day, day, index, delta)
+
+    def by_status(self, doctor_id: Optional[str] = None, specialty: Optional[str] = None,
+                  day: Optional[date] = None) -> Dict[AppointmentStatus, int]:
+        with self._lock:
+            return super().by_status(doctor_id, specialty, day)
+
+    def snapshot(self) -> AppointmentCounts:
+        with self._lock:
+            return AppointmentCounts(
+                {doctor: _copy(days) for doctor, days in self._by_doctor.items()},
+                {specialty: _copy(days) for specialty, days in self._by_specialty.items()},
+                _copy(self._by_day), self.version,
+            )
@@ -0,0 +1,150 @@
+from array import array
+from collections import Counter
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from src.columnar import STATUSES, ColumnarRepository
+from src.models import AppointmentStatus
+from src.system import HospitalSystem
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKENDS = ("numpy", "python")
+
+# Insurer key of patients without insurance
+UNINSURED = ""
+
+_CANCELLED = STATUSES.index(AppointmentStatus.CANCELLED)
+_COMPLETED = STATUSES.index(AppointmentStatus.COMPLETED)
+
+class Columns:
+    """Appointment and patient attributes as parallel arrays of small ints.
+
+    Patients and doctors are referred to by code, an index into patient_ids / doctor_ids.
+    Appointments whose patient or doctor was removed map to group -1 and are left out of
+    the per-specialty and per-insurer rates.
+    """
+
+    def __init__(self):
+        self.patient_ids: List[str] = []
+        self.doctor_ids: List[str] = []
+        # One entry per appointment
+        self.patient = array("I")
+        self.doctor = array("I")
+        self.date = array("I")
+        self.status = array("B")
+        # Doctor code -> specialty code, patient code -> insurer code
+        self.specialties: List[str] = []
+        self.doctor_specialty = array("i")
+        self.insurers: List[str] = []
+        self.patient_insurer = array("i")
+        # Ages of the current patients
+        self.ages = array("I")
+
+def _code(codes: Dict[str, int], labels: List[str], value: str) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(labels)
+        labels.append(value)
+    return code
+
+def build_columns(system: HospitalSystem) -> Columns:
+    columns = Columns()
+    repository = system.repository
+    if isinstance(repository, ColumnarRepository):
+        (columns.patient_ids, columns.patient, columns.doctor_ids, columns.doctor,
+         columns.date, columns.status) = repository.appointment_columns()
+    else:
+        patient_codes: Dict[str, int] = {}
+        doctor_codes: Dict[str, int] = {}
+        status_codes = {status: code for code, status in enumerate(STATUSES)}
+        for app in system.appointments.values():
+            columns.patient.append(_code(patient_codes, columns.patient_ids, app.patient_id))
+            columns.doctor.append(_code(doctor_codes, columns.doctor_ids, app.doctor_id))
+            columns.date.append(app.date.toordinal())
+            columns.status.append(status_codes[app.status])
+
+    specialty_codes: Dict[str, int] = {}
+    for doctor_id in columns.doctor_ids:
+        doctor = system.get_doctor(doctor_id)
+        columns.doctor_specialty.append(-1 if doctor is None else _code(specialty_codes, columns.specialties, doctor.specialty))
+    insurer_codes: Dict[str, int] = {}
+    for patient_id in columns.patient_ids:
+        patient = system.get_patient(patient_id)
+        if patient is None:
+            columns.patient_insurer.append(-1)
+        else:
+            insurer = patient.insurance_name if patient.has_insurance else UNINSURED
+            columns.patient_insurer.append(_code(insurer_codes, columns.insurers, insurer))
+    columns.ages.extend(patient.age for patient in system.patients.values())
+    return columns
+
+def _numpy(backend: Optional[str]) -> bool:
+    if backend is None:
+        return np is not None
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}")
+    if backend == "numpy" and np is None:
+        raise ValueError("The numpy backend requires the numpy package")
+    return backend == "numpy"
+
+def _np(values: array):
+    # Zero-copy view through the buffer protocol, keeping the array's item type
+    return np.asarray(values)
+
+def appointments_per_doctor_per_day(columns: Columns, backend: Optional[str] = None) -> Dict[Tuple[str, date], int]:
+    if _numpy(backend):
+        if not len(columns.date):
+            return {}
+        days = _np(columns.date).astype(np.int64)
+        first = int(days.min())
+        span = int(days.max()) - first + 1
+        keys, counts = np.unique(_np(columns.doctor).astype(np.int64) * span + (days - first), return_counts=True)
+        doctors, offsets = np.divmod(keys, span)
+        pairs = zip(doctors.tolist(), offsets.tolist(), counts.tolist())
+        return {(columns.doctor_ids[d], date.fromordinal(first + o)): n for d, o, n in pairs}
+    counts = Counter(zip(columns.doctor, columns.date))
+    return {(columns.doctor_ids[d], date.fromordinal(o)): n for (d, o), n in counts.items()}
+
+def _rate_by_group(groups: array, owners: array, labels: List[str], status: array, code: int,
+                   use_numpy: bool) -> Dict[str, float]:
+    """Share of appointments with the given status per group, where groups maps each owner code to a group."""
+    if use_numpy:
+        appointment_groups = _np(groups)[_np(owners)]
+        known = appointment_groups >= 0
+        totals = np.bincount(appointment_groups[known], minlength=len(labels))
+        hits = np.bincount(appointment_groups[known & (_np(status) == code)], minlength=len(labels))
+        totals, hits = totals.tolist(), hits.tolist()
+        return {labels[g]: hits[g] / totals[g] for g in range(len(labels)) if totals[g]}
+    totals = [0] * len(labels)
+    hits = [0] * len(labels)
+    for owner, value in zip(owners, status):
+        group = groups[owner]
+        if group >= 0:
+            totals[group] += 1
+            if value == code:
+                hits[group] += 1
+    return {labels[g]: hits[g] / totals[g] for g in range(len(labels)) if totals[g]}
+
+def cancellation_rate_by_specialty(columns: Columns, backend: Optional[str] = None) -> Dict[str, float]:
+    return _rate_by_group(columns.doctor_specialty, columns.doctor, columns.specialties, columns.status, _CANCELLED,
+                          _numpy(backend))
+
+def completion_rate_by_insurer(columns: Columns, backend: Optional[str] = None) -> Dict[str, float]:
+    """Patients without insurance are grouped under UNINSURED."""
+    return _rate_by_group(columns.patient_insurer, columns.patient, columns.insurers, columns.status, _COMPLETED,
+                          _numpy(backend))
+
+def age_band_distribution(columns: Columns, width: int = 10, backend: Optional[str] = None) -> Dict[str, int]:
+    """Number of patients per age band, labelled like "30-39"."""
+    if width <= 0:
+        raise ValueError("Band width must be positive")
+    if _numpy(backend):
+        counts = np.bincount(_np(columns.ages) // width).tolist() if len(columns.ages) else []
+    else:
+        counts = [0] * (max(columns.ages) // width + 1 if columns.ages else 0)
+        for age in columns.ages:
+            counts[age // width] += 1
+    return {f"{band * width}-{band * width + width - 1}": n for band, n in enumerate(counts) if n}
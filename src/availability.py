@@ -0,0 +1,25 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Tuple
+from src.models import FreeSlot
+
+def iter_free_slots(doctor_id: str, booked: Iterator[Tuple[date, time]], start_date: date, end_date: date,
+                    slot_length: timedelta, day_start: time, day_end: time) -> Iterator[FreeSlot]:
+    """Walk the working-hours grid and the doctor's sorted bookings together.
+
+    A slot is free when no SCHEDULED appointment starts inside it. `booked` must yield the doctor's
+    bookings in order, starting at or after the first candidate slot.
+    """
+    upcoming = next(booked, None)
+    day = start_date
+    while day <= end_date:
+        current = datetime.combine(day, day_start)
+        closing = datetime.combine(day, day_end)
+        while current + slot_length <= closing:
+            slot_end = current + slot_length
+            start_key = (current.date(), current.time())
+            while upcoming is not None and upcoming < start_key:
+                upcoming = next(booked, None)
+            if upcoming is None or upcoming >= (slot_end.date(), slot_end.time()):
+                yield FreeSlot(doctor_id, current.date(), current.time())
+            current = slot_end
+        day += timedelta(days=1)
@@ -0,0 +1,154 @@
+import json
+import sys
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from typing import Any, Callable, Dict, Optional, TextIO, Tuple
+from src.codec import decode_value, from_dict, to_dict
+from src.models import Patient, Doctor, Appointment, Anamnesis, ExamRequest, MedicalCertificate, Recurrence
+from src.system import HospitalSystem
+
+def _record(record: Any) -> Any:
+    return None if record is None else to_dict(record)
+
+def _records(records) -> Any:
+    return [to_dict(record) for record in records]
+
+def _schedule(system: HospitalSystem, app: Appointment) -> Any:
+    return to_dict(system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time,
+                                               app.description))
+
+def _schedule_series(system: HospitalSystem, args: Dict[str, Any]) -> Any:
+    recurrence = Recurrence(args.get("interval_days", 7), args.get("count"), args.get("until"))
+    return _records(system.schedule_series(
+        args["id_prefix"], args["patient_id"], args["doctor_id"], args["start_date"], args["time"], recurrence,
+        args.get("description", "")))
+
+def _set_status(method: str) -> Callable[[HospitalSystem, Dict[str, Any]], Any]:
+    def run(system: HospitalSystem, args: Dict[str, Any]) -> Any:
+        getattr(system, method)(args["appointment_id"])
+        return to_dict(system.get_appointment(args["appointment_id"]))
+    return run
+
+def _find_free_slots(system: HospitalSystem, args: Dict[str, Any]) -> Any:
+    start = args["start_date"]
+    return _records(system.find_free_slots(
+        start, args.get("end_date", start), doctor_id=args.get("doctor_id"), specialty=args.get("specialty"),
+        slot_length=timedelta(minutes=args.get("minutes", 30)), count=args.get("count", 10),
+        day_start=args.get("day_start", time(8, 0)), day_end=args.get("day_end", time(18, 0))))
+
+_PATIENT_ID = {"patient_id": str}
+_DOCTOR_ID = {"doctor_id": str}
+_APPOINTMENT_ID = {"appointment_id": str}
+
+# op -> (argument types, function(system, decoded args) returning a JSON-ready result). Arguments are
+# decoded before the function runs, so a badly typed one fails the command before it changes anything.
+# A record class decodes the whole args object into that record.
+COMMANDS: Dict[str, Tuple[Any, Callable[[HospitalSystem, Any], Any]]] = {
+    "add_patient": (Patient, lambda s, p: s.add_patient(p)),
+    "get_patient": (_PATIENT_ID, lambda s, a: _record(s.get_patient(a["patient_id"]))),
+    "remove_patient": (_PATIENT_ID, lambda s, a: s.remove_patient(a["patient_id"])),
+    "add_doctor": (Doctor, lambda s, d: s.add_doctor(d)),
+    "get_doctor": (_DOCTOR_ID, lambda s, a: _record(s.get_doctor(a["doctor_id"]))),
+    "remove_doctor": (_DOCTOR_ID, lambda s, a: s.remove_doctor(a["doctor_id"])),
+    "get_doctors_by_specialty": ({"specialty": str}, lambda s, a: _records(s.get_doctors_by_specialty(a["specialty"]))),
+    "schedule_appointment": (Appointment, _schedule),
+    "schedule_series": ({"id_prefix": str, "patient_id": str, "doctor_id": str, "start_date": date, "time": time,
+                         "interval_days": int, "count": Optional[int], "until": Optional[date], "description": str},
+                        _schedule_series),
+    "cancel_appointment": (_APPOINTMENT_ID, _set_status("cancel_appointment")),
+    "complete_appointment": (_APPOINTMENT_ID, _set_status("complete_appointment")),
+    "get_appointment": (_APPOINTMENT_ID, lambda s, a: _record(s.get_appointment(a["appointment_id"]))),
+    "get_appointments_by_patient": (_PATIENT_ID, lambda s, a: _records(s.get_appointments_by_patient(a["patient_id"]))),
+    "get_appointments_by_doctor": (_DOCTOR_ID, lambda s, a: _records(s.get_appointments_by_doctor(a["doctor_id"]))),
+    "find_free_slots": ({"start_date": date, "end_date": date, "doctor_id": Optional[str], "specialty": Optional[str],
+                         "minutes": int, "count": int, "day_start": time, "day_end": time}, _find_free_slots),
+    "add_anamnesis": (Anamnesis, lambda s, a: s.add_anamnesis(a)),
+    "get_anamnesis": (_APPOINTMENT_ID, lambda s, a: _record(s.get_anamnesis(a["appointment_id"]))),
+    "add_exam_request": (ExamRequest, lambda s, r: s.add_exam_request(r)),
+    "get_exam_requests_by_appointment": (_APPOINTMENT_ID, lambda s, a: _records(
+        s.get_exam_requests_by_appointment(a["appointment_id"]))),
+    "add_medical_certificate": (MedicalCertificate, lambda s, c: s.add_medical_certificate(c)),
+    "get_medical_certificates_by_appointment": (_APPOINTMENT_ID, lambda s, a: _records(
+        s.get_medical_certificates_by_appointment(a["appointment_id"]))),
+}
+
+def decode_args(op: str, args: Dict[str, Any]) -> Any:
+    """Check and convert the arguments of op; missing ones are reported when the command reads them."""
+    kinds = COMMANDS[op][0]
+    if not isinstance(kinds, dict):
+        return from_dict(kinds, args)
+    decoded = {}
+    for name, kind in kinds.items():
+        if name in args:
+            try:
+                decoded[name] = decode_value(kind, args[name])
+            except ValueError as e:
+                raise ValueError(f"Argument {name}: {e}")
+    return decoded
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+@dataclass
+class BatchReport:
+    commands: int = 0
+    failed: int = 0
+
+def run_command(system: HospitalSystem, line: str) -> Dict[str, Any]:
+    """Run one JSON command of the form {"op": ..., "args": {...}, "id": optional}."""
+    try:
+        command = json.loads(line)
+    except ValueError as e:
+        return {"ok": False, "error": f"Invalid JSON: {e}"}
+    if not isinstance(command, dict):
+        return {"ok": False, "error": "Command must be a JSON object"}
+    result: Dict[str, Any] = {"id": command["id"]} if "id" in command else {}
+    op, args = command.get("op"), command.get("args", {})
+    if op not in COMMANDS:
+        result.update(ok=False, error=f"Unknown operation {op}")
+    elif not isinstance(args, dict):
+        result.update(ok=False, error="Command args must be a JSON object")
+    else:
+        try:
+            result.update(ok=True, result=COMMANDS[op][1](system, decode_args(op, args)))
+        except KeyError as e:
+            result.update(ok=False, error=f"Missing argument {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            result.update(ok=False, error=str(e))
+    return result
+
+def run_batch(system: HospitalSystem, commands: TextIO, output: TextIO, chunk_size: int = 4096) -> BatchReport:
+    """Run line-delimited JSON commands and write one JSON result per command.
+
+    Results carry the 1-based line number of their command. Blank lines are skipped.
+    Output is written in chunks of chunk_size results.
+    """
+    report = BatchReport()
+    lines = []
+    for number, line in enumerate(commands, 1):
+        if not line.strip():
+            continue
+        result = run_command(system, line)
+        result["line"] = number
+        report.commands += 1
+        if not result["ok"]:
+            report.failed += 1
+        lines.append(_encode(result))
+        if len(lines) >= chunk_size:
+            output.write("\n".join(lines) + "\n")
+            lines.clear()
+    if lines:
+        output.write("\n".join(lines) + "\n")
+    return report
+
+def run_batch_file(system: HospitalSystem, path: str, output_path: str = "-", stdin: Optional[TextIO] = None) -> BatchReport:
+    commands = (stdin or sys.stdin) if path == "-" else open(path, encoding="utf-8")
+    try:
+        if output_path == "-":
+            report = run_batch(system, commands, sys.stdout)
+            sys.stdout.flush()
+            return report
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as output:
+            return run_batch(system, commands, output)
+    finally:
+        if path != "-":
+            commands.close()
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    capacity: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class LRUCache(Generic[V]):
+    """Read-through cache of at most capacity values, evicting the least recently used.
+
+    Values are loaded outside the lock. A load that overlaps an invalidation may have read
+    the old state, so its result is returned but not kept.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._values: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation
+        self._generation = 0
+        self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._values
+
+    def get(self, key: Hashable, load: Callable[[], V]) -> V:
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self._hits += 1
+                return self._values[key]
+            self._misses += 1
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                self._values[key] = value
+                self._values.move_to_end(key)
+                if len(self._values) > self.capacity:
+                    self._values.popitem(last=False)
+                    self._evictions += 1
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            if key in self._values:
+                del self._values[key]
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._values.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, self._invalidations, len(self._values),
+                              self.capacity)
@@ -0,0 +1,82 @@
+from dataclasses import fields
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, Tuple, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+
+T = TypeVar("T")
+
+_hints_cache: Dict[type, Dict[str, Any]] = {}
+_fields_cache: Dict[type, Tuple[str, ...]] = {}
+
+def _hints(cls: type) -> Dict[str, Any]:
+    hints = _hints_cache.get(cls)
+    if hints is None:
+        hints = _hints_cache[cls] = get_type_hints(cls)
+    return hints
+
+def _init_fields(cls: type) -> Tuple[str, ...]:
+    names = _fields_cache.get(cls)
+    if names is None:
+        names = _fields_cache[cls] = tuple(f.name for f in fields(cls) if f.init)
+    return names
+
+def encode_value(value: Any) -> Any:
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+_TRUE = {"true", "1", "y", "yes"}
+_FALSE = {"false", "0", "n", "no", ""}
+
+def decode_value(kind: Any, value: Any) -> Any:
+    """Convert value to kind, raising ValueError when it has the wrong type.
+
+    Strings are parsed, since they come from text formats such as CSV.
+    """
+    if get_origin(kind) is Union:
+        if value is None and type(None) in get_args(kind):
+            return None
+        kind = next(arg for arg in get_args(kind) if arg is not type(None))
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in _TRUE or lowered in _FALSE:
+                return lowered in _TRUE
+        raise ValueError(f"Invalid boolean value {value!r}")
+    if kind is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            return int(value)
+        raise ValueError(f"Invalid integer value {value!r}")
+    if kind is date or kind is time:
+        if isinstance(value, kind) and not isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            return kind.fromisoformat(value)
+        raise ValueError(f"Invalid {kind.__name__} value {value!r}")
+    if kind is str:
+        if isinstance(value, str):
+            return value
+        raise ValueError(f"Invalid text value {value!r}")
+    if isinstance(kind, type) and issubclass(kind, Enum) and not isinstance(value, kind):
+        return kind(value)
+    return value
+
+def to_dict(record: Any) -> Dict[str, Any]:
+    return {name: encode_value(getattr(record, name)) for name in _init_fields(type(record))}
+
+def from_dict(cls: Type[T], data: Dict[str, Any]) -> T:
+    hints = _hints(cls)
+    kwargs = {}
+    for name in _init_fields(cls):
+        if name in data:
+            try:
+                kwargs[name] = decode_value(hints[name], data[name])
+            except ValueError as e:
+                raise ValueError(f"Field {name}: {e}")
+    return cls(**kwargs)
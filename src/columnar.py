@@ -0,0 +1,284 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping
+from datetime import date, datetime, time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.models import Appointment, AppointmentStatus
+from src.repository import InMemoryRepository
+from src.sortedlist import SortedList
+
+STATUSES = list(AppointmentStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_SCHEDULED = _STATUS_CODES[AppointmentStatus.SCHEDULED]
+
+# Slot keys pack (doctor code, date ordinal, minute of day) into one int
+_MINUTE_BITS = 11
+_DAY_BITS = 22
+
+def _minute_of_day(app_time: time) -> int:
+    if app_time.second or app_time.microsecond or app_time.tzinfo is not None:
+        raise ValueError("The compact store keeps appointment times to the minute")
+    return app_time.hour * 60 + app_time.minute
+
+def _moment(ordinal: int, minute: int) -> int:
+    return (ordinal << _MINUTE_BITS) | minute
+
+# Schedule entries pack (moment, row) into one int
+_ROW_BITS = 32
+
+def _first_moment_from(value: datetime) -> int:
+    # Round a time with seconds up to the next minute
+    minute = value.hour * 60 + value.minute + bool(value.second or value.microsecond)
+    return (value.toordinal() << _MINUTE_BITS) + minute
+
+class _Codes:
+    """Interns strings as small ints."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class _AppointmentColumns(Mapping):
+    def __init__(self, repository: "ColumnarRepository"):
+        self._repository = repository
+
+    def __getitem__(self, appointment_id: str) -> Appointment:
+        return self._repository._view(self._repository._rows[appointment_id])
+
+    def __contains__(self, appointment_id) -> bool:
+        return appointment_id in self._repository._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._repository._ids)
+
+    def __len__(self) -> int:
+        return len(self._repository._ids)
+
+class ColumnarRepository(InMemoryRepository):
+    """In-memory storage that keeps appointments as columns instead of objects.
+
+    Each appointment is a row across typed arrays: interned patient and doctor codes,
+    the date ordinal, the minute of day and a status code. Appointment objects are built
+    only when a record is read, so two reads return separate objects; as with SQLite,
+    a stale copy cannot override a status changed through another one.
+    Patients, doctors and clinical records are stored as in InMemoryRepository.
+    """
+
+    supports_concurrent_reads = False
+
+    def __init__(self):
+        super().__init__()
+        self._patient_codes = _Codes()
+        self._doctor_codes = _Codes()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._patient_col = array("I")
+        self._doctor_col = array("I")
+        self._date_col = array("I")
+        self._minute_col = array("H")
+        self._status_col = array("B")
+        self._descriptions: List[str] = []
+        self._view_of_appointments = _AppointmentColumns(self)
+        # Secondary indexes: patient / doctor code -> rows in insertion order
+        self._rows_by_patient: Dict[int, array] = {}
+        self._rows_by_doctor: Dict[int, array] = {}
+        # Slot key of every SCHEDULED appointment -> row
+        self._booked_rows: Dict[int, int] = {}
+        # Sorted moments of SCHEDULED appointments per doctor code
+        self._moments: Dict[int, array] = {}
+        # Schedule entries of every appointment, overall and per doctor code
+        self._entries = SortedList()
+        self._entries_by_doctor: Dict[int, SortedList] = {}
+        self._active_patients: Dict[int, int] = {}
+        self._active_doctors: Dict[int, int] = {}
+
+    @property
+    def appointments(self) -> Mapping:
+        return self._view_of_appointments
+
+    def _view(self, row: int) -> Appointment:
+        minute = self._minute_col[row]
+        appointment = Appointment(
+            self._ids[row], self._patient_codes.values[self._patient_col[row]],
+            self._doctor_codes.values[self._doctor_col[row]], date.fromordinal(self._date_col[row]),
+            time(minute // 60, minute % 60), STATUSES[self._status_col[row]], self._descriptions[row],
+        )
+        appointment._observer = self.status_observer
+        return appointment
+
+    def _slot(self, doctor: int, ordinal: int, minute: int) -> int:
+        return (doctor << (_DAY_BITS + _MINUTE_BITS)) | _moment(ordinal, minute)
+
+    def validate_appointment(self, appointment: Appointment):
+        _minute_of_day(appointment.time)
+
+    def add_appointment(self, appointment: Appointment):
+        minute = _minute_of_day(appointment.time)
+        row = len(self._ids)
+        patient = self._patient_codes.code(appointment.patient_id)
+        doctor = self._doctor_codes.code(appointment.doctor_id)
+        ordinal = appointment.date.toordinal()
+        status = _STATUS_CODES[appointment.status]
+
+        self._ids.append(appointment.appointment_id)
+        self._rows[appointment.appointment_id] = row
+        self._patient_col.append(patient)
+        self._doctor_col.append(doctor)
+        self._date_col.append(ordinal)
+        self._minute_col.append(minute)
+        self._status_col.append(status)
+        self._descriptions.append(appointment.description)
+        self._rows_by_patient.setdefault(patient, array("I")).append(row)
+        self._rows_by_doctor.setdefault(doctor, array("I")).append(row)
+        entry = (_moment(ordinal, minute) << _ROW_BITS) | row
+        with self._schedule_lock:
+            self._entries.add(entry)
+            entries = self._entries_by_doctor.get(doctor)
+            if entries is None:
+                entries = self._entries_by_doctor[doctor] = SortedList()
+            entries.add(entry)
+            if status == _SCHEDULED:
+                insort(self._moments.setdefault(doctor, array("Q")), _moment(ordinal, minute))
+        if status == _SCHEDULED:
+            self._booked_rows[self._slot(doctor, ordinal, minute)] = row
+            self._active_patients[patient] = self._active_patients.get(patient, 0) + 1
+            self._active_doctors[doctor] = self._active_doctors.get(doctor, 0) + 1
+        appointment._observer = self.status_observer
+
+    def appointment_status_changed(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        if appointment.status == previous:
+            return False
+        row = self._rows[appointment.appointment_id]
+        if self._status_col[row] != _STATUS_CODES[previous]:
+            raise ValueError(f"Appointment {appointment.appointment_id} is no longer {previous.value}")
+        status = _STATUS_CODES[appointment.status]
+        self._status_col[row] = status
+        if previous == AppointmentStatus.SCHEDULED and status != _SCHEDULED:
+            patient, doctor = self._patient_col[row], self._doctor_col[row]
+            ordinal, minute = self._date_col[row], self._minute_col[row]
+            del self._booked_rows[self._slot(doctor, ordinal, minute)]
+            with self._schedule_lock:
+                moments = self._moments[doctor]
+                del moments[bisect_left(moments, _moment(ordinal, minute))]
+            self._active_patients[patient] -= 1
+            self._active_doctors[doctor] -= 1
+        return True
+
+    def appointment_columns(self) -> Tuple[List[str], array, List[str], array, array, array]:
+        """Copies of (patient IDs by code, patient codes, doctor IDs by code, doctor codes, date ordinals, status codes)."""
+        return (list(self._patient_codes.values), self._patient_col[:], list(self._doctor_codes.values),
+                self._doctor_col[:], self._date_col[:], self._status_col[:])
+
+    def appointments_by_patient(self, patient_id: str) -> List[Appointment]:
+        patient = self._patient_codes.codes.get(patient_id)
+        return [self._view(row) for row in self._rows_by_patient.get(patient, ())]
+
+    def appointments_by_doctor(self, doctor_id: str) -> List[Appointment]:
+        doctor = self._doctor_codes.codes.get(doctor_id)
+        return [self._view(row) for row in self._rows_by_doctor.get(doctor, ())]
+
+    def holds_slot(self, appointment: Appointment) -> bool:
+        row = self._rows.get(appointment.appointment_id)
+        return row is not None and self._status_col[row] == _SCHEDULED
+
+    def is_slot_booked(self, doctor_id: str, app_date: date, app_time: time) -> bool:
+        doctor = self._doctor_codes.codes.get(doctor_id)
+        if doctor is None or app_time.second or app_time.microsecond:
+            return False
+        return self._slot(doctor, app_date.toordinal(), app_time.hour * 60 + app_time.minute) in self._booked_rows
+
+    def booked_times(self, doctor_id: str, start_date: date, start_time: time) -> Iterator[Tuple[date, time]]:
+        # Round a start time with seconds up to the next minute
+        start = start_time.hour * 60 + start_time.minute + bool(start_time.second or start_time.microsecond)
+
+        def read(last: Optional[int]) -> array:
+            moments = self._moments.get(self._doctor_codes.codes.get(doctor_id), array("Q"))
+            if last is not None:
+                index = bisect_right(moments, last)
+            else:
+                index = bisect_left(moments, _moment(start_date.toordinal(), 0) + start)
+            return moments[index:index + self.READ_CHUNK]
+
+        for moment in self._read_in_chunks(read):
+            ordinal, minute = divmod(moment, 1 << _MINUTE_BITS)
+            yield date.fromordinal(ordinal), time(minute // 60, minute % 60)
+
+    def appointments_between(self, start: datetime, end: datetime,
+                             doctor_id: Optional[str] = None) -> Iterator[Appointment]:
+        high = _first_moment_from(end) << _ROW_BITS
+
+        def read(last: Optional[int]) -> list:
+            if doctor_id is None:
+                entries = self._entries
+            else:
+                entries = self._entries_by_doctor.get(self._doctor_codes.codes.get(doctor_id))
+                if entries is None:
+                    return []
+            low = _first_moment_from(start) << _ROW_BITS if last is None else last + 1
+            return list(islice(entries.irange(low, high), self.READ_CHUNK))
+
+        row_mask = (1 << _ROW_BITS) - 1
+        return (self._view(entry & row_mask) for entry in self._read_in_chunks(read))
+
+    def count_active_by_patient(self, patient_id: str) -> int:
+        return self._active_patients.get(self._patient_codes.codes.get(patient_id), 0)
+
+    def count_active_by_doctor(self, doctor_id: str) -> int:
+        return self._active_doctors.get(self._doctor_codes.codes.get(doctor_id), 0)
+
+    def check_invariants(self):
+        columns = (self._patient_col, self._doctor_col, self._date_col, self._minute_col, self._status_col,
+                   self._descriptions)
+        if any(len(column) != len(self._ids) for column in columns):
+            raise AssertionError("Appointment columns have different lengths")
+        if self._rows != {app_id: row for row, app_id in enumerate(self._ids)}:
+            raise AssertionError("Appointment row index does not match appointment IDs")
+        expected_by_patient: Dict[int, List[int]] = {}
+        expected_by_doctor: Dict[int, List[int]] = {}
+        expected_booked: Dict[int, int] = {}
+        expected_moments: Dict[int, List[int]] = {}
+        expected_active_patients: Dict[int, int] = {}
+        expected_active_doctors: Dict[int, int] = {}
+        expected_entries: Dict[int, List[int]] = {}
+        for row in range(len(self._ids)):
+            patient, doctor = self._patient_col[row], self._doctor_col[row]
+            expected_by_patient.setdefault(patient, []).append(row)
+            expected_by_doctor.setdefault(doctor, []).append(row)
+            entry = (_moment(self._date_col[row], self._minute_col[row]) << _ROW_BITS) | row
+            expected_entries.setdefault(doctor, []).append(entry)
+            if self._status_col[row] == _SCHEDULED:
+                ordinal, minute = self._date_col[row], self._minute_col[row]
+                slot = self._slot(doctor, ordinal, minute)
+                if slot in expected_booked:
+                    raise AssertionError(f"Doctor {self._doctor_codes.values[doctor]} is double-booked at "
+                                         f"{date.fromordinal(ordinal)} {time(minute // 60, minute % 60)}")
+                expected_booked[slot] = row
+                expected_moments.setdefault(doctor, []).append(_moment(ordinal, minute))
+                expected_active_patients[patient] = expected_active_patients.get(patient, 0) + 1
+                expected_active_doctors[doctor] = expected_active_doctors.get(doctor, 0) + 1
+        if {k: list(v) for k, v in self._rows_by_patient.items()} != expected_by_patient:
+            raise AssertionError("Patient appointment index does not match appointments")
+        if {k: list(v) for k, v in self._rows_by_doctor.items()} != expected_by_doctor:
+            raise AssertionError("Doctor appointment index does not match appointments")
+        if self._booked_rows != expected_booked:
+            raise AssertionError("Booked slot index does not match scheduled appointments")
+        if {k: list(v) for k, v in self._moments.items() if v} != {k: sorted(v) for k, v in expected_moments.items()}:
+            raise AssertionError("Doctor timelines do not match scheduled appointments")
+        if list(self._entries) != sorted(e for entries in expected_entries.values() for e in entries):
+            raise AssertionError("Appointment schedule does not match appointments")
+        if {k: list(v) for k, v in self._entries_by_doctor.items()} != {k: sorted(v) for k, v in expected_entries.items()}:
+            raise AssertionError("Doctor schedules do not match appointments")
+        if {k: v for k, v in self._active_patients.items() if v} != expected_active_patients:
+            raise AssertionError("Active appointment counts per patient do not match appointments")
+        if {k: v for k, v in self._active_doctors.items() if v} != expected_active_doctors:
+            raise AssertionError("Active appointment counts per doctor do not match appointments")
+        # The object-based appointment structures of the base class stay empty, so this only checks clinical records
+        super().check_invariants()
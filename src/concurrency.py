@@ -0,0 +1,124 @@
+import threading
+from contextlib import contextmanager
+from datetime import date, time
+from typing import Hashable, List, Optional
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate, Recurrence
+from src.repository import HospitalRepository
+from src.system import HospitalSystem
+
+class _Held:
+    __slots__ = ("_locks",)
+
+    def __init__(self, locks: List[threading.RLock]):
+        self._locks = locks
+
+    def __enter__(self):
+        acquired = 0
+        try:
+            for lock in self._locks:
+                lock.acquire()
+                acquired += 1
+        except BaseException:
+            for lock in reversed(self._locks[:acquired]):
+                lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        for lock in reversed(self._locks):
+            lock.release()
+
+class StripedLock:
+    """A fixed pool of reentrant locks; a key always maps to the same lock."""
+
+    def __init__(self, stripes: int = 64):
+        if stripes <= 0:
+            raise ValueError("Stripe count must be positive")
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def hold(self, *keys: Hashable) -> _Held:
+        # Acquiring in index order keeps threads that need several stripes from deadlocking
+        count = len(self._locks)
+        return _Held([self._locks[index] for index in sorted({hash(key) % count for key in keys})])
+
+class ConcurrentHospitalSystem(HospitalSystem):
+    """HospitalSystem safe to share between threads.
+
+    Writes lock the stripes of the patient, doctor and record IDs they touch, so bookings for
+    different doctors proceed without a global lock. get_* lookups take no locks.
+    """
+
+    def __init__(self, repository: Optional[HospitalRepository] = None, stripes: int = 64):
+        super().__init__(repository)
+        if not self._repository.supports_concurrent_reads:
+            raise ValueError(f"{type(self._repository).__name__} cannot be shared between threads")
+        self._locks = StripedLock(stripes)
+
+    def add_patient(self, patient: Patient):
+        with self._locks.hold(("patient", patient.patient_id)):
+            super().add_patient(patient)
+
+    def remove_patient(self, patient_id: str):
+        with self._locks.hold(("patient", patient_id)):
+            super().remove_patient(patient_id)
+
+    def add_doctor(self, doctor: Doctor):
+        with self._locks.hold(("doctor", doctor.doctor_id)):
+            super().add_doctor(doctor)
+
+    def remove_doctor(self, doctor_id: str):
+        with self._locks.hold(("doctor", doctor_id)):
+            super().remove_doctor(doctor_id)
+
+    def schedule_appointment(self, appointment_id: str, patient_id: str, doctor_id: str, app_date: date, app_time: time, description: str = "") -> Appointment:
+        with self._locks.hold(("appointment", appointment_id), ("patient", patient_id), ("doctor", doctor_id)):
+            return super().schedule_appointment(appointment_id, patient_id, doctor_id, app_date, app_time, description)
+
+    def schedule_series(self, id_prefix: str, patient_id: str, doctor_id: str, start_date: date, app_time: time,
+                        recurrence: Recurrence, description: str = "") -> List[Appointment]:
+        # The doctor's stripe is held from the conflict check until the last occurrence is booked
+        ids = [("appointment", f"{id_prefix}-{n}") for n in range(1, len(recurrence.dates(start_date)) + 1)]
+        with self._locks.hold(("patient", patient_id), ("doctor", doctor_id), *ids):
+            return super().schedule_series(id_prefix, patient_id, doctor_id, start_date, app_time, recurrence,
+                                           description)
+
+    def _restore_appointment(self, appointment: Appointment):
+        with self._locks.hold(("appointment", appointment.appointment_id), ("patient", appointment.patient_id),
+                              ("doctor", appointment.doctor_id)):
+            super()._restore_appointment(appointment)
+
+    def cancel_appointment(self, appointment_id: str):
+        with self._appointment_locks(appointment_id):
+            super().cancel_appointment(appointment_id)
+
+    def complete_appointment(self, appointment_id: str):
+        with self._appointment_locks(appointment_id):
+            super().complete_appointment(appointment_id)
+
+    def _on_status_change(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        # Also reached from Appointment.cancel()/complete() called directly by other threads
+        with self._locks.hold(("appointment", appointment.appointment_id), ("patient", appointment.patient_id),
+                              ("doctor", appointment.doctor_id)):
+            return super()._on_status_change(appointment, previous)
+
+    def add_anamnesis(self, anamnesis: Anamnesis):
+        with self._locks.hold(("appointment", anamnesis.appointment_id)):
+            super().add_anamnesis(anamnesis)
+
+    def add_exam_request(self, request: ExamRequest):
+        with self._locks.hold(("exam_request", request.request_id), ("appointment", request.appointment_id)):
+            super().add_exam_request(request)
+
+    def add_medical_certificate(self, certificate: MedicalCertificate):
+        with self._locks.hold(("certificate", certificate.certificate_id), ("appointment", certificate.appointment_id)):
+            super().add_medical_certificate(certificate)
+
+    @contextmanager
+    def _appointment_locks(self, appointment_id: str):
+        appointment = self.appointments.get(appointment_id)
+        if appointment is None:
+            # Let the unlocked call raise the usual "not found" error
+            yield
+            return
+        with self._locks.hold(("appointment", appointment_id), ("patient", appointment.patient_id),
+                              ("doctor", appointment.doctor_id)):
+            yield
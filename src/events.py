@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time as timer
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, List, Optional, Tuple
+
+class EventKind(Enum):
+    PATIENT_ADDED = "PatientAdded"
+    PATIENT_REMOVED = "PatientRemoved"
+    DOCTOR_ADDED = "DoctorAdded"
+    DOCTOR_REMOVED = "DoctorRemoved"
+    APPOINTMENT_SCHEDULED = "AppointmentScheduled"
+    APPOINTMENT_CANCELLED = "AppointmentCancelled"
+    APPOINTMENT_COMPLETED = "AppointmentCompleted"
+    ANAMNESIS_ADDED = "AnamnesisAdded"
+    EXAM_REQUESTED = "ExamRequested"
+    CERTIFICATE_ISSUED = "CertificateIssued"
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    kind: EventKind
+    # The record as it was when the event happened; removals carry just the ID
+    record: Any
+    timestamp: float
+
+class ChangeFeed:
+    """Bounded in-process feed of HospitalSystem changes.
+
+    Events get consecutive sequence numbers from 1 and are kept in a ring buffer of the last
+    capacity events. Publishing never waits for subscribers: one that falls more than capacity
+    events behind skips the overwritten events and counts them in its dropped total. A consumer
+    that remembers the last seq it handled can resume with subscribe(after=seq).
+    """
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._buffer: List[Optional[Event]] = [None] * capacity
+        self._next_seq = 1
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        # Threads blocked in Subscription.poll(); publish() only notifies when there are some
+        self._waiting = 0
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the latest event, 0 before the first."""
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        """Oldest sequence number still buffered."""
+        return max(1, self._next_seq - self.capacity)
+
+    def publish(self, kind: EventKind, record: Any) -> int:
+        with self._lock:
+            seq = self._next_seq
+            self._buffer[seq % self.capacity] = Event(seq, kind, record, timer.time())
+            self._next_seq = seq + 1
+            if self._waiting:
+                self._published.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, ready in waiters:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                # The subscriber's loop has been closed
+                pass
+        return seq
+
+    def read(self, after: int, limit: int = 100) -> List[Event]:
+        """Up to limit buffered events with seq greater than after, oldest first."""
+        with self._lock:
+            return self._read(after, limit)[0]
+
+    def _read(self, after: int, limit: int) -> Tuple[List[Event], int]:
+        # Called under the lock; also returns how many events after `after` were overwritten
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        first = max(1, self._next_seq - self.capacity)
+        start = max(after + 1, first)
+        end = min(self._next_seq, start + limit)
+        buffer, capacity = self._buffer, self.capacity
+        return [buffer[seq % capacity] for seq in range(start, end)], max(0, first - after - 1)
+
+    def subscribe(self, after: Optional[int] = None) -> "Subscription":
+        """A cursor for a consumer thread, starting after seq `after` (default: the latest event)."""
+        return Subscription(self, self.last_seq if after is None else after)
+
+    def subscribe_async(self, after: Optional[int] = None) -> "AsyncSubscription":
+        return AsyncSubscription(self, self.last_seq if after is None else after)
+
+class _Cursor:
+    def __init__(self, feed: ChangeFeed, after: int):
+        self.feed = feed
+        # seq of the last event handed out
+        self.position = after
+        # Events overwritten before this subscriber read them
+        self.dropped = 0
+
+    def _take(self, max_events: int) -> List[Event]:
+        events, skipped = self.feed._read(self.position, max_events)
+        self.dropped += skipped
+        if events:
+            self.position = events[-1].seq
+        return events
+
+class Subscription(_Cursor):
+    def poll(self, max_events: int = 100, timeout: Optional[float] = 0) -> List[Event]:
+        """The next batch of at most max_events, waiting up to timeout seconds (None: forever) for one."""
+        feed = self.feed
+        with feed._lock:
+            events = self._take(max_events)
+            if events or timeout == 0:
+                return events
+            feed._waiting += 1
+            try:
+                feed._published.wait_for(lambda: feed._next_seq - 1 > self.position, timeout)
+            finally:
+                feed._waiting -= 1
+            return self._take(max_events)
+
+class AsyncSubscription(_Cursor):
+    """Subscription for asyncio consumers; publishers in any thread wake the consumer's loop.
+
+    `async for batch in subscription` yields batches as they arrive.
+    """
+
+    async def poll(self, max_events: int = 100, timeout: Optional[float] = None) -> List[Event]:
+        feed = self.feed
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        with feed._lock:
+            events = self._take(max_events)
+            if events or timeout == 0:
+                return events
+            feed._async_waiters.append((loop, ready))
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with feed._lock:
+            if (loop, ready) in feed._async_waiters:
+                feed._async_waiters.remove((loop, ready))
+            return self._take(max_events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> List[Event]:
+        return await self.poll()
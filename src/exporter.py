@@ -0,0 +1,153 @@
+import csv
+import io
+import json
+import sys
+from dataclasses import fields
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from src.codec import to_dict
+from src.models import Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+from src.system import HospitalSystem
+
+FORMATS = ("csv", "jsonl", "arrow")
+
+KINDS = {
+    "appointments": Appointment,
+    "anamneses": Anamnesis,
+    "exam_requests": ExamRequest,
+    "medical_certificates": MedicalCertificate,
+}
+
+def columns(kind: str) -> List[str]:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown record kind {kind}")
+    return [f.name for f in fields(KINDS[kind]) if f.init]
+
+def iter_appointments(system: HospitalSystem, start: Optional[date] = None, end: Optional[date] = None,
+                      doctor_id: Optional[str] = None, status: Optional[AppointmentStatus] = None) -> Iterator[Appointment]:
+    """Appointments matching the filters; start and end are inclusive dates.
+
+    A date range is read from the time-ordered schedule, so only the window is visited; otherwise
+    appointments come in booking order.
+    """
+    # The repository indexes also cover doctors removed after their appointments were kept
+    source: Iterable[Appointment]
+    if start is not None or end is not None:
+        lower = datetime.combine(start, time()) if start is not None else datetime.min
+        upper = datetime.combine(end + timedelta(days=1), time()) if end is not None and end < date.max else datetime.max
+        source = system.repository.appointments_between(lower, upper, doctor_id) if lower <= upper else ()
+    elif doctor_id is not None:
+        source = system.repository.appointments_by_doctor(doctor_id)
+    else:
+        source = system.appointments.values()
+    for app in source:
+        if status is not None and app.status != status:
+            continue
+        yield app
+
+def iter_records(system: HospitalSystem, kind: str, start: Optional[date] = None, end: Optional[date] = None,
+                 doctor_id: Optional[str] = None, status: Optional[AppointmentStatus] = None) -> Iterator[Any]:
+    """Yield records one at a time; clinical records are filtered by their appointment."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown record kind {kind}")
+    filtered = any(value is not None for value in (start, end, doctor_id, status))
+    if kind == "appointments":
+        yield from iter_appointments(system, start, end, doctor_id, status)
+    elif not filtered:
+        yield from getattr(system, kind).values()
+    else:
+        for app in iter_appointments(system, start, end, doctor_id, status):
+            if kind == "anamneses":
+                anamnesis = system.get_anamnesis(app.appointment_id)
+                if anamnesis is not None:
+                    yield anamnesis
+            elif kind == "exam_requests":
+                yield from system.get_exam_requests_by_appointment(app.appointment_id)
+            else:
+                yield from system.get_medical_certificates_by_appointment(app.appointment_id)
+
+def iter_columnar_batches(records: Iterable[Any], names: List[str], batch_size: int = 65_536) -> Iterator[Dict[str, list]]:
+    """Group records into {column: values} batches, the layout pyarrow.RecordBatch.from_pydict accepts."""
+    batch: Dict[str, list] = {name: [] for name in names}
+    size = 0
+    for record in records:
+        row = to_dict(record)
+        for name in names:
+            batch[name].append(row[name])
+        size += 1
+        if size >= batch_size:
+            yield batch
+            batch = {name: [] for name in names}
+            size = 0
+    if size:
+        yield batch
+
+def write_csv(records: Iterable[Any], names: List[str], output, chunk_size: int = 4096) -> int:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    count = 0
+    for record in records:
+        row = to_dict(record)
+        writer.writerow([row[name] for name in names])
+        count += 1
+        if count % chunk_size == 0:
+            output.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    output.write(buffer.getvalue())
+    return count
+
+def write_jsonl(records: Iterable[Any], output, chunk_size: int = 4096) -> int:
+    lines = []
+    count = 0
+    for record in records:
+        lines.append(json.dumps(to_dict(record), ensure_ascii=False))
+        count += 1
+        if len(lines) >= chunk_size:
+            output.write("\n".join(lines) + "\n")
+            lines.clear()
+    if lines:
+        output.write("\n".join(lines) + "\n")
+    return count
+
+def write_arrow(records: Iterable[Any], kind: str, output, batch_size: int = 65_536) -> int:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("The arrow format requires the pyarrow package")
+    # Dates, times and statuses are exported in their text form, as in CSV and JSONL
+    schema = pa.schema([(f.name, pa.int64() if f.type is int else pa.string()) for f in fields(KINDS[kind]) if f.init])
+    names = schema.names
+    count = 0
+    with pa.ipc.new_stream(output, schema) as writer:
+        for batch in iter_columnar_batches(records, names, batch_size):
+            writer.write_batch(pa.RecordBatch.from_pydict(batch, schema=schema))
+            count += len(batch[names[0]])
+    return count
+
+def export(system: HospitalSystem, kind: str, output, fmt: str = "csv", start: Optional[date] = None,
+           end: Optional[date] = None, doctor_id: Optional[str] = None, status: Optional[AppointmentStatus] = None,
+           chunk_size: int = 4096) -> int:
+    """Stream records to output (a text stream, or a binary one for arrow) and return how many were written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt}")
+    names = columns(kind)
+    records = iter_records(system, kind, start, end, doctor_id, status)
+    if fmt == "csv":
+        return write_csv(records, names, output, chunk_size)
+    if fmt == "jsonl":
+        return write_jsonl(records, output, chunk_size)
+    return write_arrow(records, kind, output)
+
+def export_file(system: HospitalSystem, kind: str, path: str, fmt: str = "csv", **filters) -> int:
+    if path == "-":
+        output = sys.stdout.buffer if fmt == "arrow" else sys.stdout
+        count = export(system, kind, output, fmt, **filters)
+        output.flush()
+        return count
+    if fmt == "arrow":
+        with open(path, "wb", buffering=1 << 20) as f:
+            return export(system, kind, f, fmt, **filters)
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        return export(system, kind, f, fmt, **filters)
@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from src.codec import from_dict
+from src.models import Patient, Doctor, Appointment, BulkImportError, RowError
+from src.system import HospitalSystem
+
+FORMATS = ("csv", "jsonl")
+
+# kind -> (record class, HospitalSystem bulk method)
+KINDS = {
+    "patients": (Patient, "bulk_add_patients"),
+    "doctors": (Doctor, "bulk_add_doctors"),
+    "appointments": (Appointment, "bulk_schedule"),
+}
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    applied: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "json":
+        extension = "jsonl"
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot tell the format of {path}; use one of: {', '.join(FORMATS)}")
+    return extension
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown format {fmt}")
+
+def import_stream(system: HospitalSystem, kind: str, stream: TextIO, fmt: str, batch_size: int = 10_000,
+                  atomic: bool = False) -> ImportReport:
+    """Import rows in batches of batch_size so memory use does not grow with the file.
+
+    Row numbers in the report count data rows from 1. With atomic=True each batch is applied
+    entirely or not at all; earlier batches stay applied.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown record kind {kind}")
+    if batch_size <= 0:
+        raise ValueError("Batch size must be positive")
+    cls, method = KINDS[kind]
+    bulk = getattr(system, method)
+    report = ImportReport()
+    rows = read_rows(stream, fmt)
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return report
+        first_row = report.rows + 1
+        report.rows += len(chunk)
+
+        records, row_numbers, parse_errors = [], [], []
+        for offset, data in enumerate(chunk):
+            try:
+                records.append(from_dict(cls, data))
+                row_numbers.append(first_row + offset)
+            except (TypeError, ValueError) as e:
+                parse_errors.append(RowError(first_row + offset, str(e)))
+
+        if atomic and parse_errors:
+            report.errors.extend(parse_errors)
+            continue
+        try:
+            result = bulk(records, atomic=atomic)
+        except BulkImportError as e:
+            result_errors, applied = e.errors, 0
+        else:
+            result_errors, applied = result.errors, result.applied
+        report.applied += applied
+        batch_errors = parse_errors + [RowError(row_numbers[err.row], err.message) for err in result_errors]
+        report.errors.extend(sorted(batch_errors, key=lambda err: err.row))
+
+def import_file(system: HospitalSystem, kind: str, path: str, fmt: Optional[str] = None, batch_size: int = 10_000,
+                atomic: bool = False, stdin: Optional[TextIO] = None) -> ImportReport:
+    if path == "-":
+        if fmt is None:
+            raise ValueError("--format is required when reading from stdin")
+        return import_stream(system, kind, stdin or sys.stdin, fmt, batch_size, atomic)
+    fmt = fmt or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as stream:
+        return import_stream(system, kind, stream, fmt, batch_size, atomic)
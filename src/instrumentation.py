@@ -0,0 +1,191 @@
+import functools
+import inspect
+import json
+import threading
+import time as timer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Like HdrHistogram, each power of two is split into 2**SUB_BITS equal buckets, so a
+# bucket's bounds are within about 6% of each other at every scale
+SUB_BITS = 4
+_SUB = 1 << SUB_BITS
+
+def bucket_index(value: int) -> int:
+    if value < _SUB:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return ((shift + 1) << SUB_BITS) + (value >> shift) - _SUB
+
+def bucket_upper_bound(index: int) -> int:
+    """Largest value that falls in the bucket."""
+    if index < _SUB:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    top = (index & (_SUB - 1)) + _SUB
+    return ((top + 1) << shift) - 1
+
+class Histogram:
+    """Counts of non-negative integer values in log-linear buckets."""
+
+    def __init__(self):
+        # Count per bucket index, grown as larger values arrive
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        index = bucket_index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound of the bucket holding the value at this rank (0 with no values)."""
+        if not 0 <= fraction <= 1:
+            raise ValueError("Percentile must be between 0 and 1")
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max)
+        return 0
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """(upper bound, count) of every non-empty bucket, in order."""
+        return [(bucket_upper_bound(index), count) for index, count in enumerate(self.counts) if count]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count, "sum": self.total, "max": self.max,
+            "p50": self.percentile(0.5), "p90": self.percentile(0.9), "p99": self.percentile(0.99),
+            "p999": self.percentile(0.999), "buckets": [list(bucket) for bucket in self.buckets()],
+        }
+
+class MethodStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        # Nanoseconds per call
+        self.latency = Histogram()
+        # Records read per call, for methods that report it
+        self.scanned = Histogram()
+
+    def record_call(self, elapsed_ns: int, failed: bool):
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+            self.latency.record(elapsed_ns)
+
+    def record_scanned(self, count: int):
+        with self._lock:
+            self.scanned.record(count)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "latency_ns": self.latency.to_dict(),
+                "scanned": self.scanned.to_dict()}
+
+class Instrumentation:
+    """Per-method call counts, latency histograms and records scanned."""
+
+    def __init__(self):
+        self._stats: Dict[str, MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def method(self, name: str) -> MethodStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, MethodStats())
+        return stats
+
+    def record_call(self, name: str, elapsed_ns: int, failed: bool = False):
+        self.method(name).record_call(elapsed_ns, failed)
+
+    def record_scanned(self, name: str, count: int):
+        self.method(name).record_scanned(count)
+
+    def counted(self, name: str, items: Iterable) -> Iterator:
+        """Pass items through, recording how many were read once the caller stops."""
+        count = 0
+        try:
+            for item in items:
+                count += 1
+                yield item
+        finally:
+            self.record_scanned(name, count)
+
+    def reset(self):
+        # Wrapped methods hold on to their MethodStats, so those are emptied in place
+        for stats in list(self._stats.values()):
+            with stats._lock:
+                stats.calls = stats.errors = 0
+                stats.latency = Histogram()
+                stats.scanned = Histogram()
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Stats of every method called (or that reported a scan) so far, by name."""
+        stats = {name: self._stats[name].to_dict() for name in sorted(list(self._stats))}
+        return {name: s for name, s in stats.items() if s["calls"] or s["scanned"]["count"]}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix: str = "hospital") -> str:
+        """Prometheus text exposition format, with latencies in seconds."""
+        stats = self.to_dict()
+        lines = [
+            f"# HELP {prefix}_method_calls_total Calls per HospitalSystem method.",
+            f"# TYPE {prefix}_method_calls_total counter",
+        ]
+        lines += [f'{prefix}_method_calls_total{{method="{name}"}} {s["calls"]}' for name, s in stats.items()]
+        lines += [
+            f"# HELP {prefix}_method_errors_total Calls that raised an exception.",
+            f"# TYPE {prefix}_method_errors_total counter",
+        ]
+        lines += [f'{prefix}_method_errors_total{{method="{name}"}} {s["errors"]}' for name, s in stats.items()]
+        for metric, key, unit, help_text in (
+            ("method_duration_seconds", "latency_ns", 1e-9, "Time spent per call."),
+            ("method_records_scanned", "scanned", 1, "Records read per call."),
+        ):
+            lines += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} histogram"]
+            for name, s in stats.items():
+                histogram = s[key]
+                if not histogram["count"]:
+                    continue
+                cumulative = 0
+                for upper, count in histogram["buckets"]:
+                    cumulative += count
+                    lines.append(f'{prefix}_{metric}_bucket{{method="{name}",le="{upper * unit:g}"}} {cumulative}')
+                lines.append(f'{prefix}_{metric}_bucket{{method="{name}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'{prefix}_{metric}_sum{{method="{name}"}} {histogram["sum"] * unit:g}')
+                lines.append(f'{prefix}_{metric}_count{{method="{name}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+def public_methods(cls: type) -> List[str]:
+    return sorted(name for name, member in inspect.getmembers(cls, inspect.isfunction) if not name.startswith("_"))
+
+def timed(name: str, method: Callable, metrics: Instrumentation) -> Callable:
+    clock = timer.perf_counter_ns
+    record = metrics.method(name).record_call
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException:
+            record(clock() - start, True)
+            raise
+        record(clock() - start, False)
+        return result
+
+    return wrapper
@@ -4,8 +4,15 @@ import os
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from datetime import datetime
-from src.models import Patient, Doctor, Anamnesis, ExamRequest, MedicalCertificate
+import argparse
+import asyncio
+import cProfile
+from datetime import date, datetime
+from src import batch, exporter, importer, server
+from src.models import Patient, Doctor, Anamnesis, ExamRequest, MedicalCertificate, AppointmentStatus
+from src.columnar import ColumnarRepository
+from src.persistence import DurableHospitalSystem, SyncPolicy
+from src.repository import SqliteRepository
 from src.system import HospitalSystem
 
 def print_menu():
@@ -20,9 +27,130 @@ def print_menu():
     print("8. Exit")
     print("----------------------------------")
 
-def main():
-    system = HospitalSystem()
-    
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hospital Management System")
+    parser.add_argument("--data-dir", help="Directory for the operation log; state is kept in memory only if omitted")
+    parser.add_argument("--sqlite", help="Keep records in this SQLite database file instead of memory")
+    parser.add_argument("--compact", action="store_true",
+                        help="Store appointments in compact columns to save memory (times kept to the minute)")
+    parser.add_argument("--sync", choices=[p.value for p in SyncPolicy], default=SyncPolicy.BATCH.value,
+                        help="When the operation log is fsynced to disk")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Write a cProfile trace of the session to FILE (for pstats, snakeviz or flameprof)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Record per-method calls and latencies, written on exit as JSON (.json) or Prometheus text")
+    commands = parser.add_subparsers(dest="command")
+
+    import_parser = commands.add_parser("import", help="Bulk import records from a CSV or JSONL file")
+    import_parser.add_argument("kind", choices=sorted(importer.KINDS))
+    import_parser.add_argument("file", help="Path to the file, or - for stdin")
+    import_parser.add_argument("--format", choices=importer.FORMATS, help="Defaults to the file extension")
+    import_parser.add_argument("--batch-size", type=int, default=10_000)
+    import_parser.add_argument("--atomic", action="store_true", help="Apply each batch entirely or not at all")
+
+    export_parser = commands.add_parser("export", help="Stream appointments or clinical records to a file")
+    export_parser.add_argument("kind", choices=sorted(exporter.KINDS))
+    export_parser.add_argument("--output", default="-", help="Path to write to, or - for stdout (default)")
+    export_parser.add_argument("--format", choices=exporter.FORMATS, default="csv")
+    export_parser.add_argument("--from", dest="start", type=date.fromisoformat, help="First appointment date (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Last appointment date (YYYY-MM-DD)")
+    export_parser.add_argument("--doctor", help="Only appointments of this doctor ID")
+    export_parser.add_argument("--status", choices=[s.value for s in AppointmentStatus])
+
+    batch_parser = commands.add_parser("batch", help="Run line-delimited JSON commands from a file or stdin")
+    batch_parser.add_argument("file", nargs="?", default="-", help="Path to the commands, or - for stdin (default)")
+    batch_parser.add_argument("--output", default="-", help="Where to write one JSON result per command (default stdout)")
+
+    serve_parser = commands.add_parser("serve", help="Serve the system over HTTP/JSON")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    return parser.parse_args(argv)
+
+def open_system(args) -> HospitalSystem:
+    if args.data_dir and args.sqlite:
+        raise ValueError("--data-dir and --sqlite cannot be combined")
+    if args.sqlite and args.compact:
+        raise ValueError("--compact only applies to in-memory storage")
+    repository = ColumnarRepository() if args.compact else None
+    if args.data_dir:
+        return DurableHospitalSystem(args.data_dir, SyncPolicy(args.sync), repository=repository)
+    if args.sqlite:
+        return HospitalSystem(SqliteRepository(args.sqlite))
+    return HospitalSystem(repository)
+
+def run_import(system: HospitalSystem, args) -> int:
+    report = importer.import_file(system, args.kind, args.file, args.format, args.batch_size, args.atomic)
+    for error in report.errors:
+        print(f"row {error.row}: {error.message}", file=sys.stderr)
+    print(f"Imported {report.applied} of {report.rows} {args.kind}.")
+    return 1 if report.errors else 0
+
+def run_export(system: HospitalSystem, args) -> int:
+    status = AppointmentStatus(args.status) if args.status else None
+    count = exporter.export_file(system, args.kind, args.output, args.format, start=args.start, end=args.end,
+                                 doctor_id=args.doctor, status=status)
+    print(f"Exported {count} {args.kind}.", file=sys.stderr)
+    return 0
+
+def run_batch(system: HospitalSystem, args) -> int:
+    report = batch.run_batch_file(system, args.file, args.output)
+    print(f"Ran {report.commands} commands, {report.failed} failed.", file=sys.stderr)
+    return 1 if report.failed else 0
+
+def run_server(system: HospitalSystem, args) -> int:
+    print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(system, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def write_metrics(system: HospitalSystem, path: str):
+    metrics = system.instrumentation
+    text = metrics.to_json() if path.endswith(".json") else metrics.to_prometheus()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.profile:
+        return run(args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(run, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+
+def run(args) -> int:
+    try:
+        system = open_system(args)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+    if args.metrics:
+        system.enable_instrumentation()
+
+    try:
+        if args.command == "import":
+            return run_import(system, args)
+        if args.command == "export":
+            return run_export(system, args)
+        if args.command == "batch":
+            return run_batch(system, args)
+        if args.command == "serve":
+            return run_server(system, args)
+        run_menu(system)
+        return 0
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+    finally:
+        system.close()
+        if args.metrics:
+            write_metrics(system, args.metrics)
+
+def run_menu(system: HospitalSystem):
     while True:
         print_menu()
         choice = input("Choose an option: ")
@@ -109,4 +237,4 @@ def main():
             print(f"Unexpected error: {e}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
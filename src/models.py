@@ -1,13 +1,18 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from datetime import date, time
+from datetime import date, time, timedelta
+from typing import List, Optional
+
+# Records use __slots__ where dataclasses support it (Python 3.10+) to drop the per-instance __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 class AppointmentStatus(Enum):
     SCHEDULED = "Scheduled"
     COMPLETED = "Completed"
     CANCELLED = "Cancelled"
 
-@dataclass
+@dataclass(**_SLOTS)
 class Patient:
     patient_id: str
     name: str
@@ -26,7 +31,7 @@ class Patient:
         if self.has_insurance and not self.insurance_name:
             raise ValueError("Insurance name cannot be empty if patient has insurance")
 
-@dataclass
+@dataclass(**_SLOTS)
 class Doctor:
     doctor_id: str
     name: str
@@ -40,7 +45,7 @@ class Doctor:
         if not self.specialty:
             raise ValueError("Specialty cannot be empty")
 
-@dataclass
+@dataclass(**_SLOTS)
 class Anamnesis:
     appointment_id: str
     symptoms: str
@@ -52,7 +57,7 @@ class Anamnesis:
         if not self.symptoms:
              raise ValueError("Symptoms cannot be empty")
 
-@dataclass
+@dataclass(**_SLOTS)
 class ExamRequest:
     request_id: str
     appointment_id: str
@@ -67,7 +72,7 @@ class ExamRequest:
         if not self.exam_name:
              raise ValueError("Exam name cannot be empty")
 
-@dataclass
+@dataclass(**_SLOTS)
 class MedicalCertificate:
     certificate_id: str
     appointment_id: str
@@ -82,8 +87,14 @@ class MedicalCertificate:
         if self.days <= 0:
              raise ValueError("Days must be positive")
 
-@dataclass
-class Appointment:
+class _Observed:
+    # Set by the repository holding the appointment so status changes made directly on the
+    # object reach the system's indexes. Not a dataclass field, so asdict(), copies and pickles
+    # never carry it.
+    __slots__ = ("_observer",)
+
+@dataclass(**_SLOTS)
+class Appointment(_Observed):
     appointment_id: str
     patient_id: str
     doctor_id: str
@@ -95,9 +106,107 @@ class Appointment:
     def cancel(self):
         if self.status == AppointmentStatus.COMPLETED:
             raise ValueError("Cannot cancel a completed appointment")
-        self.status = AppointmentStatus.CANCELLED
+        self._set_status(AppointmentStatus.CANCELLED)
 
     def complete(self):
         if self.status == AppointmentStatus.CANCELLED:
             raise ValueError("Cannot complete a cancelled appointment")
-        self.status = AppointmentStatus.COMPLETED
+        self._set_status(AppointmentStatus.COMPLETED)
+
+    def detached(self) -> "Appointment":
+        """A copy as of now, not attached to any repository."""
+        return Appointment(self.appointment_id, self.patient_id, self.doctor_id, self.date, self.time, self.status,
+                           self.description)
+
+    def _set_status(self, status: AppointmentStatus):
+        previous = self.status
+        self.status = status
+        observer = getattr(self, "_observer", None)
+        if observer is not None:
+            try:
+                observer(self, previous)
+            except Exception:
+                self.status = previous
+                raise
+
+    def __getstate__(self):
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def __setstate__(self, state):
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
+@dataclass
+class AppointmentBundle:
+    appointment: Appointment
+    anamnesis: Optional[Anamnesis]
+    exam_requests: List[ExamRequest]
+    medical_certificates: List[MedicalCertificate]
+
+@dataclass
+class PatientHistory:
+    patient: Patient
+    # Every appointment of the patient with its clinical records, oldest first
+    visits: List[AppointmentBundle]
+
+@dataclass(frozen=True)
+class FreeSlot:
+    doctor_id: str
+    date: date
+    time: time
+
+@dataclass(frozen=True)
+class Recurrence:
+    """Every interval_days days from the first date, for count occurrences or up to until (inclusive)."""
+    interval_days: int = 7
+    count: Optional[int] = None
+    until: Optional[date] = None
+
+    def __post_init__(self):
+        if self.interval_days <= 0:
+            raise ValueError("Recurrence interval must be positive")
+        if (self.count is None) == (self.until is None):
+            raise ValueError("Recurrence needs either a count or an end date")
+        if self.count is not None and self.count <= 0:
+            raise ValueError("Recurrence count must be positive")
+
+    @classmethod
+    def weekly(cls, count: Optional[int] = None, until: Optional[date] = None) -> "Recurrence":
+        return cls(7, count, until)
+
+    def dates(self, start: date) -> List[date]:
+        step = timedelta(days=self.interval_days)
+        if self.count is not None:
+            return [start + step * n for n in range(self.count)]
+        if self.until < start:
+            raise ValueError("Recurrence end date must not be before the start date")
+        return [start + step * n for n in range((self.until - start).days // self.interval_days + 1)]
+
+@dataclass
+class RowError:
+    row: int
+    message: str
+
+@dataclass
+class BulkResult:
+    applied: int
+    errors: List[RowError] = field(default_factory=list)
+
+class BulkImportError(ValueError):
+    def __init__(self, errors: List[RowError]):
+        self.errors = errors
+        first = errors[0]
+        super().__init__(f"{len(errors)} row(s) failed validation; row {first.row}: {first.message}")
+
+    def __reduce__(self):
+        return type(self), (self.errors,)
+
+class SeriesConflictError(ValueError):
+    def __init__(self, conflicts: List[date]):
+        # Every date on which the doctor is already booked, in order
+        self.conflicts = conflicts
+        super().__init__(f"Doctor is not available on {len(conflicts)} date(s): "
+                         + ", ".join(day.isoformat() for day in conflicts))
+
+    def __reduce__(self):
+        return type(self), (self.conflicts,)
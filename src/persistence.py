@@ -0,0 +1,338 @@
+import json
+import os
+import struct
+import threading
+import time as timer
+import zlib
+from contextlib import contextmanager
+from datetime import date, time
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.codec import encode_value, from_dict, to_dict
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate, Recurrence
+from src.repository import HospitalRepository
+from src.snapshot import latest_snapshot, list_snapshots, load_snapshot, snapshot_name, write_snapshot
+from src.system import HospitalSystem
+
+LOG_FILE = "journal.log"
+
+# Every record is framed as: payload length (uint32), CRC32 of payload (uint32), JSON payload
+_HEADER = struct.Struct("<II")
+
+class SyncPolicy(Enum):
+    ALWAYS = "always"  # fsync after every record
+    BATCH = "batch"    # group commit: one fsync per batch_size records or batch_interval seconds
+    NEVER = "never"    # leave flushing to disk to the operating system
+
+def _decode_record(payload: bytes, checksum: int) -> Optional[Dict[str, Any]]:
+    if zlib.crc32(payload) != checksum:
+        return None
+    try:
+        record = json.loads(payload)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and "seq" in record else None
+
+def _has_record(data: bytes) -> bool:
+    """True if an intact record starts anywhere in data."""
+    for start in range(len(data) - _HEADER.size + 1):
+        length, checksum = _HEADER.unpack_from(data, start)
+        end = start + _HEADER.size + length
+        if end <= len(data) and _decode_record(data[start + _HEADER.size:end], checksum) is not None:
+            return True
+    return False
+
+def read_log(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (end offset, record) for every intact record.
+
+    A damaged record at the end of the log is a write torn by a crash, and reading stops there.
+    A damaged record with intact records after it is corruption, and raises ValueError rather
+    than silently dropping everything that follows.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        offset = 0
+        while True:
+            header = f.read(_HEADER.size)
+            if not header:
+                return
+            record = None
+            if len(header) == _HEADER.size:
+                length, checksum = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) == length:
+                    record = _decode_record(payload, checksum)
+            if record is None:
+                f.seek(offset + 1)
+                if _has_record(f.read()):
+                    raise ValueError(f"{path} is corrupt at offset {offset}; intact records follow")
+                return
+            offset += _HEADER.size + length
+            yield offset, record
+
+class WriteAheadLog:
+    def __init__(self, path: str, sync_policy: SyncPolicy = SyncPolicy.BATCH, batch_size: int = 64,
+                 batch_interval: float = 0.01, offset: int = 0, next_seq: int = 1):
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+        self.path = path
+        self.sync_policy = SyncPolicy(sync_policy)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.next_seq = next_seq
+        self._file = open(path, "ab")
+        # Drop a torn tail left by a crash so new records follow the last intact one
+        self._file.truncate(offset)
+        self._pending = 0
+        self._last_sync = timer.monotonic()
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        if self.sync_policy == SyncPolicy.BATCH:
+            # Syncs the tail of a burst once batch_interval has passed, even if no record follows it
+            self._wakeup = threading.Condition(self._lock)
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    def append(self, op: str, args: Dict[str, Any]) -> int:
+        with self._lock:
+            if self._file is None:
+                raise ValueError("Log is closed")
+            seq = self.next_seq
+            payload = json.dumps({"seq": seq, "op": op, "args": args}, separators=(",", ":")).encode("utf-8")
+            self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload)))
+            self._file.write(payload)
+            self._file.flush()
+            self.next_seq += 1
+            self._pending += 1
+
+            if self.sync_policy == SyncPolicy.ALWAYS:
+                self._sync()
+            elif self.sync_policy == SyncPolicy.BATCH:
+                if self._pending >= self.batch_size or timer.monotonic() - self._last_sync >= self.batch_interval:
+                    self._sync()
+                elif self._pending == 1:
+                    self._wakeup.notify()
+            return seq
+
+    def _flush_loop(self):
+        with self._lock:
+            while self._file is not None:
+                if not self._pending:
+                    self._wakeup.wait()
+                    continue
+                remaining = self._last_sync + self.batch_interval - timer.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                else:
+                    self._sync()
+
+    def reset(self):
+        # Everything logged so far is covered by a snapshot
+        with self._lock:
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._pending = 0
+            self._last_sync = timer.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._file is None or not self._pending:
+            return
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = timer.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            if self._flusher is not None:
+                self._wakeup.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+
+class DurableHospitalSystem(HospitalSystem):
+    def __init__(self, directory: str, sync_policy: SyncPolicy = SyncPolicy.BATCH, batch_size: int = 64,
+                 batch_interval: float = 0.01, snapshot_every: Optional[int] = None,
+                 repository: Optional[HospitalRepository] = None):
+        super().__init__(repository)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self._log: Optional[WriteAheadLog] = None
+        self._since_snapshot = 0
+
+        last_seq = 0
+        snapshot = latest_snapshot(directory)
+        if snapshot is not None:
+            last_seq = load_snapshot(self, snapshot[1])
+
+        # Only the log tail written after the snapshot needs replaying
+        path = os.path.join(directory, LOG_FILE)
+        offset = 0
+        for offset, record in read_log(path):
+            if record["seq"] > last_seq:
+                self._replay(record)
+                last_seq = record["seq"]
+                self._since_snapshot += 1
+        self._log = WriteAheadLog(path, sync_policy, batch_size, batch_interval, offset, last_seq + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sync(self):
+        self._log.sync()
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+        super().close()
+
+    def snapshot(self) -> str:
+        self._log.sync()
+        seq = self._log.next_seq - 1
+        path = os.path.join(self.directory, snapshot_name(seq))
+        write_snapshot(self, path, seq)
+        self._log.reset()
+        self._since_snapshot = 0
+        for old_seq, old_path in list_snapshots(self.directory):
+            if old_seq < seq:
+                os.remove(old_path)
+        return path
+
+    @contextmanager
+    def _journaled(self, op: str, args: Dict[str, Any]):
+        """Write the record, then apply the change in the with block.
+
+        Callers check the change first, so it applies once its record is written, and a failed write
+        leaves everything as it was.
+        """
+        # Nothing is journaled while the log itself is being replayed
+        if self._log is None:
+            yield
+            return
+        self._log.append(op, args)
+        yield
+        self._since_snapshot += 1
+        if self.snapshot_every is not None and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def _replay(self, record: Dict[str, Any]):
+        op, args = record["op"], record["args"]
+        if op == "add_patient":
+            super().add_patient(from_dict(Patient, args))
+        elif op == "remove_patient":
+            super().remove_patient(args["patient_id"])
+        elif op == "add_doctor":
+            super().add_doctor(from_dict(Doctor, args))
+        elif op == "remove_doctor":
+            super().remove_doctor(args["doctor_id"])
+        elif op == "schedule_appointment":
+            super().schedule_appointment(args["appointment_id"], args["patient_id"], args["doctor_id"],
+                                         date.fromisoformat(args["date"]), time.fromisoformat(args["time"]),
+                                         args["description"])
+        elif op == "schedule_series":
+            until = args["until"]
+            recurrence = Recurrence(args["interval_days"], args["count"], None if until is None else date.fromisoformat(until))
+            super().schedule_series(args["id_prefix"], args["patient_id"], args["doctor_id"],
+                                    date.fromisoformat(args["start_date"]), time.fromisoformat(args["time"]),
+                                    recurrence, args["description"])
+        elif op == "import_appointment":
+            super()._import_appointment(from_dict(Appointment, args))
+        elif op == "set_status":
+            appointment = self.appointments[args["appointment_id"]]
+            if AppointmentStatus(args["status"]) == AppointmentStatus.CANCELLED:
+                appointment.cancel()
+            else:
+                appointment.complete()
+        elif op == "add_anamnesis":
+            super().add_anamnesis(from_dict(Anamnesis, args))
+        elif op == "add_exam_request":
+            super().add_exam_request(from_dict(ExamRequest, args))
+        elif op == "add_medical_certificate":
+            super().add_medical_certificate(from_dict(MedicalCertificate, args))
+        else:
+            raise ValueError(f"Unknown log operation {op}")
+
+    def add_patient(self, patient: Patient):
+        self._check_new_patient(patient)
+        with self._journaled("add_patient", to_dict(patient)):
+            super().add_patient(patient)
+
+    def remove_patient(self, patient_id: str):
+        self._check_removable_patient(patient_id)
+        with self._journaled("remove_patient", {"patient_id": patient_id}):
+            super().remove_patient(patient_id)
+
+    def add_doctor(self, doctor: Doctor):
+        self._check_new_doctor(doctor)
+        with self._journaled("add_doctor", to_dict(doctor)):
+            super().add_doctor(doctor)
+
+    def remove_doctor(self, doctor_id: str):
+        self._check_removable_doctor(doctor_id)
+        with self._journaled("remove_doctor", {"doctor_id": doctor_id}):
+            super().remove_doctor(doctor_id)
+
+    def schedule_appointment(self, appointment_id: str, patient_id: str, doctor_id: str, app_date: date, app_time: time, description: str = "") -> Appointment:
+        self._check_booking(Appointment(appointment_id, patient_id, doctor_id, app_date, app_time,
+                                        AppointmentStatus.SCHEDULED, description))
+        with self._journaled("schedule_appointment", {
+            "appointment_id": appointment_id, "patient_id": patient_id, "doctor_id": doctor_id,
+            "date": encode_value(app_date), "time": encode_value(app_time), "description": description,
+        }):
+            return super().schedule_appointment(appointment_id, patient_id, doctor_id, app_date, app_time, description)
+
+    def schedule_series(self, id_prefix: str, patient_id: str, doctor_id: str, start_date: date, app_time: time,
+                        recurrence: Recurrence, description: str = "") -> List[Appointment]:
+        self._check_series(id_prefix, patient_id, doctor_id, start_date, app_time, recurrence, description)
+        # One record for the whole series, so recovery never finds half of it
+        with self._journaled("schedule_series", {
+            "id_prefix": id_prefix, "patient_id": patient_id, "doctor_id": doctor_id,
+            "start_date": encode_value(start_date), "time": encode_value(app_time),
+            "interval_days": recurrence.interval_days, "count": recurrence.count,
+            "until": encode_value(recurrence.until), "description": description,
+        }):
+            return super().schedule_series(id_prefix, patient_id, doctor_id, start_date, app_time, recurrence,
+                                           description)
+
+    def _import_appointment(self, appointment: Appointment):
+        self._check_new_appointment(appointment.appointment_id)
+        with self._journaled("import_appointment", to_dict(appointment)):
+            super()._import_appointment(appointment)
+
+    def _on_status_change(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        # Covers cancel_appointment/complete_appointment and direct Appointment.cancel()/complete() calls.
+        # A repeated or stale change is ignored or refused by the repository, so it is not journaled
+        if appointment.status == previous or (previous == AppointmentStatus.SCHEDULED
+                                              and not self._repository.holds_slot(appointment)):
+            return super()._on_status_change(appointment, previous)
+        with self._journaled("set_status", {"appointment_id": appointment.appointment_id,
+                                            "status": appointment.status.value}):
+            return super()._on_status_change(appointment, previous)
+
+    def add_anamnesis(self, anamnesis: Anamnesis):
+        self._check_anamnesis(anamnesis)
+        with self._journaled("add_anamnesis", to_dict(anamnesis)):
+            super().add_anamnesis(anamnesis)
+
+    def add_exam_request(self, request: ExamRequest):
+        self._check_exam_request(request)
+        with self._journaled("add_exam_request", to_dict(request)):
+            super().add_exam_request(request)
+
+    def add_medical_certificate(self, certificate: MedicalCertificate):
+        self._check_certificate(certificate)
+        with self._journaled("add_medical_certificate", to_dict(certificate)):
+            super().add_medical_certificate(certificate)
@@ -0,0 +1,716 @@
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right, insort
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from collections.abc import ItemsView, Mapping, ValuesView
+from itertools import islice
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, Iterator, List, Mapping as MappingType, Optional, Tuple
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+from src.sortedlist import SortedList
+
+StatusObserver = Callable[[Appointment, AppointmentStatus], None]
+
+class HospitalRepository(ABC):
+    """Storage behind HospitalSystem. Validation and error reporting stay in HospitalSystem."""
+
+    # Whether reads may run without locks while other threads write (see ConcurrentHospitalSystem)
+    supports_concurrent_reads = False
+
+    def __init__(self):
+        # Attached to every Appointment handed out so direct status changes reach the system
+        self.status_observer: Optional[StatusObserver] = None
+
+    # Read-only views keyed by record ID
+    @property
+    @abstractmethod
+    def patients(self) -> MappingType[str, Patient]: ...
+
+    @property
+    @abstractmethod
+    def doctors(self) -> MappingType[str, Doctor]: ...
+
+    @property
+    @abstractmethod
+    def appointments(self) -> MappingType[str, Appointment]: ...
+
+    @property
+    @abstractmethod
+    def anamneses(self) -> MappingType[str, Anamnesis]: ...
+
+    @property
+    @abstractmethod
+    def exam_requests(self) -> MappingType[str, ExamRequest]: ...
+
+    @property
+    @abstractmethod
+    def medical_certificates(self) -> MappingType[str, MedicalCertificate]: ...
+
+    @abstractmethod
+    def add_patient(self, patient: Patient): ...
+
+    @abstractmethod
+    def remove_patient(self, patient_id: str): ...
+
+    @abstractmethod
+    def add_doctor(self, doctor: Doctor): ...
+
+    @abstractmethod
+    def remove_doctor(self, doctor_id: str): ...
+
+    @abstractmethod
+    def add_appointment(self, appointment: Appointment): ...
+
+    def validate_appointment(self, appointment: Appointment):
+        """Raise ValueError if this backend cannot store appointment, before anything is written."""
+
+    @abstractmethod
+    def appointment_status_changed(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        """Record a status change; False if it was already recorded, so a repeated notification is ignored."""
+
+    def holds_slot(self, appointment: Appointment) -> bool:
+        """Whether appointment is still recorded as SCHEDULED, whatever the status of this copy."""
+        stored = self.appointments.get(appointment.appointment_id)
+        return stored is not None and stored.status == AppointmentStatus.SCHEDULED
+
+    @abstractmethod
+    def appointments_by_patient(self, patient_id: str) -> List[Appointment]: ...
+
+    @abstractmethod
+    def appointments_by_doctor(self, doctor_id: str) -> List[Appointment]: ...
+
+    @abstractmethod
+    def is_slot_booked(self, doctor_id: str, app_date: date, app_time: time) -> bool: ...
+
+    @abstractmethod
+    def booked_times(self, doctor_id: str, start_date: date, start_time: time) -> Iterator[Tuple[date, time]]:
+        """(date, time) of the doctor's SCHEDULED appointments from the given moment on, in order."""
+
+    def booked_slots(self, doctor_id: str, slots: List[Tuple[date, time]]) -> List[Tuple[date, time]]:
+        """The given (date, time) slots at which the doctor has a SCHEDULED appointment, in the given order."""
+        return [slot for slot in slots if self.is_slot_booked(doctor_id, *slot)]
+
+    @abstractmethod
+    def appointments_between(self, start: datetime, end: datetime,
+                             doctor_id: Optional[str] = None) -> Iterator[Appointment]:
+        """Appointments of any status from start (inclusive) to end (exclusive), lazily in time order.
+
+        Appointments at the same moment come in booking order.
+        """
+
+    @abstractmethod
+    def count_active_by_patient(self, patient_id: str) -> int: ...
+
+    @abstractmethod
+    def count_active_by_doctor(self, doctor_id: str) -> int: ...
+
+    @abstractmethod
+    def add_anamnesis(self, anamnesis: Anamnesis): ...
+
+    @abstractmethod
+    def add_exam_request(self, request: ExamRequest): ...
+
+    @abstractmethod
+    def exam_requests_by_appointment(self, appointment_id: str) -> List[ExamRequest]: ...
+
+    @abstractmethod
+    def add_medical_certificate(self, certificate: MedicalCertificate): ...
+
+    @abstractmethod
+    def certificates_by_appointment(self, appointment_id: str) -> List[MedicalCertificate]: ...
+
+    @contextmanager
+    def batch(self):
+        # Groups several writes; backends with transactions commit them together
+        yield
+
+    def on_commit(self, action: Callable[[], None]):
+        """Run action once the writes made so far are committed; a batch that rolls back drops it."""
+        action()
+
+    def check_invariants(self):
+        pass
+
+    def close(self):
+        pass
+
+class InMemoryRepository(HospitalRepository):
+    # Single dict and list operations are atomic under the GIL
+    supports_concurrent_reads = True
+    # Items read per schedule lock hold by the lazy range iterators
+    READ_CHUNK = 256
+
+    def __init__(self):
+        super().__init__()
+        self._patients: Dict[str, Patient] = {}
+        self._doctors: Dict[str, Doctor] = {}
+        self._appointments: Dict[str, Appointment] = {}
+        self._anamneses: Dict[str, Anamnesis] = {}
+        self._exam_requests: Dict[str, ExamRequest] = {}
+        self._medical_certificates: Dict[str, MedicalCertificate] = {}
+        # Secondary indexes: entity ID -> {appointment ID: Appointment}
+        self._appointments_by_patient: Dict[str, Dict[str, Appointment]] = {}
+        self._appointments_by_doctor: Dict[str, Dict[str, Appointment]] = {}
+        # Occupied slots of SCHEDULED appointments: (doctor ID, date, time) -> appointment ID
+        self._booked_slots: Dict[Tuple[str, date, time], str] = {}
+        # Sorted (date, time) of SCHEDULED appointments per doctor
+        self._timelines: Dict[str, List[Tuple[date, time]]] = {}
+        # (date, time, booking number, appointment) of every appointment, overall and per doctor
+        self._schedule = SortedList()
+        self._schedules_by_doctor: Dict[str, SortedList] = {}
+        self._bookings = 0
+        # Sorted list inserts are not atomic, and bookings for different doctors may run in parallel
+        self._schedule_lock = threading.Lock()
+        # Number of SCHEDULED appointments per patient / doctor
+        self._active_by_patient: Dict[str, int] = {}
+        self._active_by_doctor: Dict[str, int] = {}
+        # Clinical records per appointment ID
+        self._exam_requests_by_appointment: Dict[str, List[ExamRequest]] = {}
+        self._certificates_by_appointment: Dict[str, List[MedicalCertificate]] = {}
+
+    @property
+    def patients(self) -> Dict[str, Patient]:
+        return self._patients
+
+    @property
+    def doctors(self) -> Dict[str, Doctor]:
+        return self._doctors
+
+    @property
+    def appointments(self) -> Dict[str, Appointment]:
+        return self._appointments
+
+    @property
+    def anamneses(self) -> Dict[str, Anamnesis]:
+        return self._anamneses
+
+    @property
+    def exam_requests(self) -> Dict[str, ExamRequest]:
+        return self._exam_requests
+
+    @property
+    def medical_certificates(self) -> Dict[str, MedicalCertificate]:
+        return self._medical_certificates
+
+    def add_patient(self, patient: Patient):
+        self._patients[patient.patient_id] = patient
+
+    def remove_patient(self, patient_id: str):
+        del self._patients[patient_id]
+
+    def add_doctor(self, doctor: Doctor):
+        self._doctors[doctor.doctor_id] = doctor
+
+    def remove_doctor(self, doctor_id: str):
+        del self._doctors[doctor_id]
+
+    def add_appointment(self, appointment: Appointment):
+        scheduled = appointment.status == AppointmentStatus.SCHEDULED
+        with self._schedule_lock:
+            # The booking number breaks ties between appointments at the same moment
+            entry = (appointment.date, appointment.time, self._bookings, appointment)
+            schedule = self._schedules_by_doctor.get(appointment.doctor_id)
+            if schedule is None:
+                schedule = SortedList()
+            timeline = self._timelines.get(appointment.doctor_id, [])
+            # Sorted inserts compare dates and times and may raise, so they run before anything else
+            # is touched and are undone if a later one fails
+            added = []
+            try:
+                for target in (self._schedule, schedule):
+                    target.add(entry)
+                    added.append(target)
+                if scheduled:
+                    insort(timeline, (appointment.date, appointment.time))
+            except Exception:
+                for target in added:
+                    target.remove(entry)
+                raise
+            self._bookings += 1
+            self._schedules_by_doctor[appointment.doctor_id] = schedule
+            if scheduled:
+                self._timelines[appointment.doctor_id] = timeline
+        self._appointments[appointment.appointment_id] = appointment
+        self._appointments_by_patient.setdefault(appointment.patient_id, {})[appointment.appointment_id] = appointment
+        self._appointments_by_doctor.setdefault(appointment.doctor_id, {})[appointment.appointment_id] = appointment
+        if scheduled:
+            self._booked_slots[_slot_key(appointment)] = appointment.appointment_id
+            self._active_by_patient[appointment.patient_id] = self._active_by_patient.get(appointment.patient_id, 0) + 1
+            self._active_by_doctor[appointment.doctor_id] = self._active_by_doctor.get(appointment.doctor_id, 0) + 1
+        appointment._observer = self.status_observer
+
+    def appointment_status_changed(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        if appointment.status == previous:
+            return False
+        if previous == AppointmentStatus.SCHEDULED:
+            key = _slot_key(appointment)
+            # Only the change that actually frees the slot counts; a repeated notification finds it free
+            if self._booked_slots.get(key) != appointment.appointment_id:
+                return False
+            del self._booked_slots[key]
+            with self._schedule_lock:
+                timeline = self._timelines[appointment.doctor_id]
+                del timeline[bisect_left(timeline, (appointment.date, appointment.time))]
+            self._active_by_patient[appointment.patient_id] -= 1
+            self._active_by_doctor[appointment.doctor_id] -= 1
+        return True
+
+    def holds_slot(self, appointment: Appointment) -> bool:
+        # The stored appointment is the notifying copy itself, so the slot tells whether it was freed
+        return self._booked_slots.get(_slot_key(appointment)) == appointment.appointment_id
+
+    def appointments_by_patient(self, patient_id: str) -> List[Appointment]:
+        return list(self._appointments_by_patient.get(patient_id, {}).values())
+
+    def appointments_by_doctor(self, doctor_id: str) -> List[Appointment]:
+        return list(self._appointments_by_doctor.get(doctor_id, {}).values())
+
+    def is_slot_booked(self, doctor_id: str, app_date: date, app_time: time) -> bool:
+        return (doctor_id, app_date, app_time) in self._booked_slots
+
+    def _read_in_chunks(self, read: Callable[[Any], list]) -> Iterator:
+        """Lazily stream a sorted index that other threads may be writing.
+
+        read(last) returns up to READ_CHUNK items following last, or from the start of the scan
+        when last is None. It runs under the schedule lock, so no chunk is read mid-insert, and
+        each chunk resumes after the last item however the index shifted in between.
+        """
+        last = None
+        while True:
+            with self._schedule_lock:
+                chunk = read(last)
+            yield from chunk
+            if len(chunk) < self.READ_CHUNK:
+                return
+            last = chunk[-1]
+
+    def booked_times(self, doctor_id: str, start_date: date, start_time: time) -> Iterator[Tuple[date, time]]:
+        def read(last: Optional[Tuple[date, time]]) -> list:
+            timeline = self._timelines.get(doctor_id, [])
+            index = bisect_left(timeline, (start_date, start_time)) if last is None else bisect_right(timeline, last)
+            return timeline[index:index + self.READ_CHUNK]
+
+        return self._read_in_chunks(read)
+
+    def appointments_between(self, start: datetime, end: datetime,
+                             doctor_id: Optional[str] = None) -> Iterator[Appointment]:
+        # Bare (date, time) bounds sort before every entry at that moment
+        high = (end.date(), end.time())
+
+        def read(last: Optional[tuple]) -> list:
+            schedule = self._schedule if doctor_id is None else self._schedules_by_doctor.get(doctor_id)
+            if schedule is None:
+                return []
+            # Booking numbers are unique, so the entry after the last one starts past its number
+            low = (start.date(), start.time()) if last is None else (last[0], last[1], last[2] + 1)
+            return list(islice(schedule.irange(low, high), self.READ_CHUNK))
+
+        return (entry[3] for entry in self._read_in_chunks(read))
+
+    def count_active_by_patient(self, patient_id: str) -> int:
+        return self._active_by_patient.get(patient_id, 0)
+
+    def count_active_by_doctor(self, doctor_id: str) -> int:
+        return self._active_by_doctor.get(doctor_id, 0)
+
+    def add_anamnesis(self, anamnesis: Anamnesis):
+        self._anamneses[anamnesis.appointment_id] = anamnesis
+
+    def add_exam_request(self, request: ExamRequest):
+        self._exam_requests[request.request_id] = request
+        self._exam_requests_by_appointment.setdefault(request.appointment_id, []).append(request)
+
+    def exam_requests_by_appointment(self, appointment_id: str) -> List[ExamRequest]:
+        return list(self._exam_requests_by_appointment.get(appointment_id, ()))
+
+    def add_medical_certificate(self, certificate: MedicalCertificate):
+        self._medical_certificates[certificate.certificate_id] = certificate
+        self._certificates_by_appointment.setdefault(certificate.appointment_id, []).append(certificate)
+
+    def certificates_by_appointment(self, appointment_id: str) -> List[MedicalCertificate]:
+        return list(self._certificates_by_appointment.get(appointment_id, ()))
+
+    def check_invariants(self):
+        expected_by_patient: Dict[str, Dict[str, Appointment]] = {}
+        expected_by_doctor: Dict[str, Dict[str, Appointment]] = {}
+        expected_slots: Dict[Tuple[str, date, time], str] = {}
+        expected_active_by_patient: Dict[str, int] = {}
+        expected_active_by_doctor: Dict[str, int] = {}
+        for app_id, app in self._appointments.items():
+            if app.appointment_id != app_id:
+                raise AssertionError(f"Appointment stored under {app_id} has ID {app.appointment_id}")
+            expected_by_patient.setdefault(app.patient_id, {})[app_id] = app
+            expected_by_doctor.setdefault(app.doctor_id, {})[app_id] = app
+            if app.status == AppointmentStatus.SCHEDULED:
+                key = _slot_key(app)
+                if key in expected_slots:
+                    raise AssertionError(f"Doctor {app.doctor_id} is double-booked at {app.date} {app.time}")
+                expected_slots[key] = app_id
+                expected_active_by_patient[app.patient_id] = expected_active_by_patient.get(app.patient_id, 0) + 1
+                expected_active_by_doctor[app.doctor_id] = expected_active_by_doctor.get(app.doctor_id, 0) + 1
+        if not _same_index(self._appointments_by_patient, expected_by_patient):
+            raise AssertionError("Patient appointment index does not match appointments")
+        if not _same_index(self._appointments_by_doctor, expected_by_doctor):
+            raise AssertionError("Doctor appointment index does not match appointments")
+        if self._booked_slots != expected_slots:
+            raise AssertionError("Booked slot index does not match scheduled appointments")
+        expected_timelines: Dict[str, List[Tuple[date, time]]] = {}
+        for doctor_id, app_date, app_time in expected_slots:
+            expected_timelines.setdefault(doctor_id, []).append((app_date, app_time))
+        if {k: v for k, v in self._timelines.items() if v} != {k: sorted(v) for k, v in expected_timelines.items()}:
+            raise AssertionError("Doctor timelines do not match scheduled appointments")
+        schedule = list(self._schedule)
+        if (len(schedule) != len(self._appointments)
+                or any(self._appointments.get(entry[3].appointment_id) is not entry[3] for entry in schedule)
+                or any(entry[:2] != (entry[3].date, entry[3].time) for entry in schedule)):
+            raise AssertionError("Appointment schedule does not match appointments")
+        expected_schedules: Dict[str, list] = {}
+        for entry in schedule:
+            expected_schedules.setdefault(entry[3].doctor_id, []).append(entry)
+        if {k: list(v) for k, v in self._schedules_by_doctor.items()} != expected_schedules:
+            raise AssertionError("Doctor schedules do not match appointments")
+        if {k: v for k, v in self._active_by_patient.items() if v} != expected_active_by_patient:
+            raise AssertionError("Active appointment counts per patient do not match appointments")
+        if {k: v for k, v in self._active_by_doctor.items() if v} != expected_active_by_doctor:
+            raise AssertionError("Active appointment counts per doctor do not match appointments")
+        expected_exams: Dict[str, List[ExamRequest]] = {}
+        for req in self._exam_requests.values():
+            expected_exams.setdefault(req.appointment_id, []).append(req)
+        if self._exam_requests_by_appointment != expected_exams:
+            raise AssertionError("Exam request index does not match exam requests")
+        expected_certificates: Dict[str, List[MedicalCertificate]] = {}
+        for cert in self._medical_certificates.values():
+            expected_certificates.setdefault(cert.appointment_id, []).append(cert)
+        if self._certificates_by_appointment != expected_certificates:
+            raise AssertionError("Medical certificate index does not match medical certificates")
+
+def _slot_key(appointment: Appointment) -> Tuple[str, date, time]:
+    return (appointment.doctor_id, appointment.date, appointment.time)
+
+def _same_index(actual: Dict[str, Dict[str, Appointment]], expected: Dict[str, Dict[str, Appointment]]) -> bool:
+    actual = {key: bucket for key, bucket in actual.items() if bucket}
+    if actual.keys() != expected.keys():
+        return False
+    for key, bucket in expected.items():
+        if list(actual[key]) != list(bucket):
+            return False
+        if any(actual[key][app_id] is not app for app_id, app in bucket.items()):
+            return False
+    return True
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    gender TEXT NOT NULL,
+    has_insurance INTEGER NOT NULL,
+    insurance_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS doctors (
+    doctor_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    specialty TEXT NOT NULL
+);
+-- Appointments outlive removed patients and doctors, so those IDs carry no foreign key
+CREATE TABLE IF NOT EXISTS appointments (
+    appointment_id TEXT PRIMARY KEY,
+    patient_id TEXT NOT NULL,
+    doctor_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments (patient_id);
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor ON appointments (doctor_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_slot ON appointments (doctor_id, date, time) WHERE status = 'Scheduled';
+CREATE INDEX IF NOT EXISTS idx_appointments_patient_active ON appointments (patient_id) WHERE status = 'Scheduled';
+CREATE INDEX IF NOT EXISTS idx_appointments_time ON appointments (date, time);
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_time ON appointments (doctor_id, date, time);
+CREATE TABLE IF NOT EXISTS anamneses (
+    appointment_id TEXT PRIMARY KEY REFERENCES appointments (appointment_id),
+    symptoms TEXT NOT NULL,
+    diagnosis TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exam_requests (
+    request_id TEXT PRIMARY KEY,
+    appointment_id TEXT NOT NULL REFERENCES appointments (appointment_id),
+    exam_name TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exam_requests_appointment ON exam_requests (appointment_id);
+CREATE TABLE IF NOT EXISTS medical_certificates (
+    certificate_id TEXT PRIMARY KEY,
+    appointment_id TEXT NOT NULL REFERENCES appointments (appointment_id),
+    days INTEGER NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_medical_certificates_appointment ON medical_certificates (appointment_id);
+"""
+
+_APPOINTMENT_COLUMNS = "appointment_id, patient_id, doctor_id, date, time, status, description"
+
+# Two parameters per slot, well under SQLite's limit of 999 in older versions
+_SLOTS_PER_QUERY = 400
+
+class _SqliteTable(Mapping):
+    """Read-only mapping over one table; rows are turned into model objects on access."""
+
+    def __init__(self, repository: "SqliteRepository", table: str, key: str, columns: str, decode: Callable):
+        self._repository = repository
+        self._key = key
+        self._decode = decode
+        self._get_sql = f"SELECT {columns} FROM {table} WHERE {key} = ?"
+        self._contains_sql = f"SELECT 1 FROM {table} WHERE {key} = ?"
+        self._keys_sql = f"SELECT {key} FROM {table} ORDER BY rowid"
+        self._rows_sql = f"SELECT {columns} FROM {table} ORDER BY rowid"
+        self._len_sql = f"SELECT COUNT(*) FROM {table}"
+
+    def __getitem__(self, key: str):
+        row = self._repository._conn.execute(self._get_sql, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._decode(row)
+
+    def __contains__(self, key) -> bool:
+        return self._repository._conn.execute(self._contains_sql, (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._repository._conn.execute(self._keys_sql))
+
+    def __len__(self) -> int:
+        return self._repository._conn.execute(self._len_sql).fetchone()[0]
+
+    def values(self) -> ValuesView:
+        return _SqliteValues(self)
+
+    def items(self) -> ItemsView:
+        return _SqliteItems(self)
+
+    def _iter_values(self) -> Iterator:
+        return (self._decode(row) for row in self._repository._conn.execute(self._rows_sql))
+
+class _SqliteValues(ValuesView):
+    # One query streaming every row instead of a lookup per key
+    def __iter__(self):
+        return self._mapping._iter_values()
+
+class _SqliteItems(ItemsView):
+    def __iter__(self):
+        # Key columns are named after the model attribute holding the ID
+        for value in self._mapping._iter_values():
+            yield getattr(value, self._mapping._key), value
+
+class SqliteRepository(HospitalRepository):
+    def __init__(self, path: str = ":memory:"):
+        super().__init__()
+        # Autocommit; statements are compiled once and reused from the statement cache
+        self._conn = sqlite3.connect(path, isolation_level=None, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+        # Actions waiting for the open batch to commit
+        self._committed: List[Callable[[], None]] = []
+
+        self._patients = _SqliteTable(self, "patients", "patient_id",
+                                      "patient_id, name, age, gender, has_insurance, insurance_name", _decode_patient)
+        self._doctors = _SqliteTable(self, "doctors", "doctor_id", "doctor_id, name, specialty",
+                                     lambda row: Doctor(*row))
+        self._appointments = _SqliteTable(self, "appointments", "appointment_id", _APPOINTMENT_COLUMNS,
+                                          self._decode_appointment)
+        self._anamneses = _SqliteTable(self, "anamneses", "appointment_id", "appointment_id, symptoms, diagnosis",
+                                       lambda row: Anamnesis(*row))
+        self._exam_requests = _SqliteTable(self, "exam_requests", "request_id",
+                                           "request_id, appointment_id, exam_name, description",
+                                           lambda row: ExamRequest(*row))
+        self._medical_certificates = _SqliteTable(self, "medical_certificates", "certificate_id",
+                                                  "certificate_id, appointment_id, days, description",
+                                                  lambda row: MedicalCertificate(*row))
+
+    @property
+    def patients(self) -> MappingType[str, Patient]:
+        return self._patients
+
+    @property
+    def doctors(self) -> MappingType[str, Doctor]:
+        return self._doctors
+
+    @property
+    def appointments(self) -> MappingType[str, Appointment]:
+        return self._appointments
+
+    @property
+    def anamneses(self) -> MappingType[str, Anamnesis]:
+        return self._anamneses
+
+    @property
+    def exam_requests(self) -> MappingType[str, ExamRequest]:
+        return self._exam_requests
+
+    @property
+    def medical_certificates(self) -> MappingType[str, MedicalCertificate]:
+        return self._medical_certificates
+
+    def _decode_appointment(self, row) -> Appointment:
+        appointment = Appointment(row[0], row[1], row[2], date.fromisoformat(row[3]), time.fromisoformat(row[4]),
+                                  AppointmentStatus(row[5]), row[6])
+        appointment._observer = self.status_observer
+        return appointment
+
+    def add_patient(self, patient: Patient):
+        self._conn.execute(
+            "INSERT INTO patients (patient_id, name, age, gender, has_insurance, insurance_name) VALUES (?, ?, ?, ?, ?, ?)",
+            (patient.patient_id, patient.name, patient.age, patient.gender, patient.has_insurance, patient.insurance_name))
+
+    def remove_patient(self, patient_id: str):
+        self._conn.execute("DELETE FROM patients WHERE patient_id = ?", (patient_id,))
+
+    def add_doctor(self, doctor: Doctor):
+        self._conn.execute("INSERT INTO doctors (doctor_id, name, specialty) VALUES (?, ?, ?)",
+                           (doctor.doctor_id, doctor.name, doctor.specialty))
+
+    def remove_doctor(self, doctor_id: str):
+        self._conn.execute("DELETE FROM doctors WHERE doctor_id = ?", (doctor_id,))
+
+    def add_appointment(self, appointment: Appointment):
+        self._conn.execute(
+            f"INSERT INTO appointments ({_APPOINTMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (appointment.appointment_id, appointment.patient_id, appointment.doctor_id, appointment.date.isoformat(),
+             appointment.time.isoformat(), appointment.status.value, appointment.description))
+        appointment._observer = self.status_observer
+
+    def appointment_status_changed(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        if appointment.status == previous:
+            return False
+        # Another copy of this row may have changed it first
+        cursor = self._conn.execute("UPDATE appointments SET status = ? WHERE appointment_id = ? AND status = ?",
+                                    (appointment.status.value, appointment.appointment_id, previous.value))
+        if cursor.rowcount != 1:
+            raise ValueError(f"Appointment {appointment.appointment_id} is no longer {previous.value}")
+        return True
+
+    def appointments_by_patient(self, patient_id: str) -> List[Appointment]:
+        rows = self._conn.execute(
+            f"SELECT {_APPOINTMENT_COLUMNS} FROM appointments WHERE patient_id = ? ORDER BY rowid", (patient_id,))
+        return [self._decode_appointment(row) for row in rows]
+
+    def appointments_by_doctor(self, doctor_id: str) -> List[Appointment]:
+        rows = self._conn.execute(
+            f"SELECT {_APPOINTMENT_COLUMNS} FROM appointments WHERE doctor_id = ? ORDER BY rowid", (doctor_id,))
+        return [self._decode_appointment(row) for row in rows]
+
+    def is_slot_booked(self, doctor_id: str, app_date: date, app_time: time) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM appointments WHERE doctor_id = ? AND date = ? AND time = ? AND status = 'Scheduled'",
+            (doctor_id, app_date.isoformat(), app_time.isoformat())).fetchone()
+        return row is not None
+
+    def booked_times(self, doctor_id: str, start_date: date, start_time: time) -> Iterator[Tuple[date, time]]:
+        day, moment = start_date.isoformat(), start_time.isoformat()
+        # Served in order by the partial slot index
+        rows = self._conn.execute(
+            "SELECT date, time FROM appointments WHERE doctor_id = ? AND status = 'Scheduled' "
+            "AND (date > ? OR (date = ? AND time >= ?)) ORDER BY date, time", (doctor_id, day, day, moment))
+        return ((date.fromisoformat(d), time.fromisoformat(t)) for d, t in rows)
+
+    def booked_slots(self, doctor_id: str, slots: List[Tuple[date, time]]) -> List[Tuple[date, time]]:
+        # One statement per chunk probes the partial slot index for every slot
+        keys = [(day.isoformat(), moment.isoformat()) for day, moment in slots]
+        booked = set()
+        for offset in range(0, len(keys), _SLOTS_PER_QUERY):
+            chunk = keys[offset:offset + _SLOTS_PER_QUERY]
+            rows = self._conn.execute(
+                f"SELECT a.date, a.time FROM (VALUES {', '.join(['(?, ?)'] * len(chunk))}) AS s JOIN appointments AS a "
+                "ON a.doctor_id = ? AND a.date = s.column1 AND a.time = s.column2 AND a.status = 'Scheduled'",
+                tuple(value for key in chunk for value in key) + (doctor_id,))
+            booked.update(rows)
+        return [slot for slot, key in zip(slots, keys) if key in booked]
+
+    def appointments_between(self, start: datetime, end: datetime,
+                             doctor_id: Optional[str] = None) -> Iterator[Appointment]:
+        # ISO dates and times sort as text; the cursor streams rows in index order
+        bounds = (start.date().isoformat(), start.time().isoformat(), end.date().isoformat(), end.time().isoformat())
+        if doctor_id is None:
+            rows = self._conn.execute(
+                f"SELECT {_APPOINTMENT_COLUMNS} FROM appointments WHERE (date, time) >= (?, ?) AND (date, time) < (?, ?) "
+                "ORDER BY date, time, rowid", bounds)
+        else:
+            rows = self._conn.execute(
+                f"SELECT {_APPOINTMENT_COLUMNS} FROM appointments WHERE doctor_id = ? "
+                "AND (date, time) >= (?, ?) AND (date, time) < (?, ?) ORDER BY date, time, rowid", (doctor_id,) + bounds)
+        return (self._decode_appointment(row) for row in rows)
+
+    def count_active_by_patient(self, patient_id: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM appointments WHERE patient_id = ? AND status = 'Scheduled'", (patient_id,)).fetchone()[0]
+
+    def count_active_by_doctor(self, doctor_id: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM appointments WHERE doctor_id = ? AND status = 'Scheduled'", (doctor_id,)).fetchone()[0]
+
+    def add_anamnesis(self, anamnesis: Anamnesis):
+        self._conn.execute("INSERT INTO anamneses (appointment_id, symptoms, diagnosis) VALUES (?, ?, ?)",
+                           (anamnesis.appointment_id, anamnesis.symptoms, anamnesis.diagnosis))
+
+    def add_exam_request(self, request: ExamRequest):
+        self._conn.execute(
+            "INSERT INTO exam_requests (request_id, appointment_id, exam_name, description) VALUES (?, ?, ?, ?)",
+            (request.request_id, request.appointment_id, request.exam_name, request.description))
+
+    def exam_requests_by_appointment(self, appointment_id: str) -> List[ExamRequest]:
+        rows = self._conn.execute(
+            "SELECT request_id, appointment_id, exam_name, description FROM exam_requests WHERE appointment_id = ? ORDER BY rowid",
+            (appointment_id,))
+        return [ExamRequest(*row) for row in rows]
+
+    def add_medical_certificate(self, certificate: MedicalCertificate):
+        self._conn.execute(
+            "INSERT INTO medical_certificates (certificate_id, appointment_id, days, description) VALUES (?, ?, ?, ?)",
+            (certificate.certificate_id, certificate.appointment_id, certificate.days, certificate.description))
+
+    def certificates_by_appointment(self, appointment_id: str) -> List[MedicalCertificate]:
+        rows = self._conn.execute(
+            "SELECT certificate_id, appointment_id, days, description FROM medical_certificates WHERE appointment_id = ? ORDER BY rowid",
+            (appointment_id,))
+        return [MedicalCertificate(*row) for row in rows]
+
+    @contextmanager
+    def batch(self):
+        if self._conn.in_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            self._committed.clear()
+            raise
+        try:
+            self._conn.execute("COMMIT")
+        finally:
+            actions, self._committed = self._committed, []
+        for action in actions:
+            action()
+
+    def on_commit(self, action: Callable[[], None]):
+        if self._conn.in_transaction:
+            self._committed.append(action)
+        else:
+            action()
+
+    def check_invariants(self):
+        result = self._conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise AssertionError(f"SQLite integrity check failed: {result}")
+        if self._conn.execute("PRAGMA foreign_key_check").fetchone() is not None:
+            raise AssertionError("Clinical records reference missing appointments")
+
+    def close(self):
+        self._conn.close()
+
+def _decode_patient(row) -> Patient:
+    return Patient(row[0], row[1], row[2], row[3], bool(row[4]), row[5])
@@ -0,0 +1,247 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from itertools import takewhile
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from src.sortedlist import SortedList
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Common Portuguese words that carry no meaning on their own in clinical notes
+STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para pela pelo por que se sem um uma
+""".split())
+
+def fold(text: str) -> str:
+    """Lowercase text and strip accents, so "Pressão" and "pressao" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def tokenize(text: str) -> List[str]:
+    return [word for word in _WORD.findall(fold(text)) if word not in STOPWORDS]
+
+class TextIndex:
+    """Inverted index from terms to the documents (appointment IDs) whose text contains them."""
+
+    def __init__(self):
+        # term -> {document: occurrences of the term in it}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._documents: Set[str] = set()
+        # Records of different appointments are added from several threads at once
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, document: str, text: str):
+        """Add text to a document; a document can receive text several times."""
+        terms = tokenize(text)
+        with self._lock:
+            self._documents.add(document)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                postings[document] = postings.get(document, 0) + 1
+
+    def search(self, query: str, match_all: bool = True, limit: Optional[int] = None) -> List[str]:
+        """Documents matching all (or any) query terms, best first.
+
+        Scores are tf-idf: each matched term adds its occurrences in the document times
+        log(1 + documents / documents containing the term). Ties are ordered by document ID.
+        """
+        if limit is not None and limit <= 0:
+            raise ValueError("Limit must be positive")
+        terms = set(tokenize(query))
+        with self._lock:
+            return self._search(terms, match_all, limit)
+
+    def _search(self, terms: Set[str], match_all: bool, limit: Optional[int]) -> List[str]:
+        postings = [self._postings.get(term, {}) for term in terms]
+        if not postings or (match_all and not all(postings)):
+            return []
+
+        total = len(self._documents)
+        weighted = [(p, math.log(1 + total / len(p))) for p in postings if p]
+        scores: Dict[str, float] = {}
+        if len(weighted) == 1:
+            p, w = weighted[0]
+            scores = {doc: occurrences * w for doc, occurrences in p.items()}
+        elif match_all:
+            weighted.sort(key=lambda item: len(item[0]))
+            matches = weighted[0][0].keys()
+            for p, _ in weighted[1:]:
+                matches = matches & p.keys()
+            for doc in matches:
+                scores[doc] = sum(p[doc] * w for p, w in weighted)
+        else:
+            for p, w in weighted:
+                for doc, occurrences in p.items():
+                    scores[doc] = scores.get(doc, 0.0) + occurrences * w
+
+        ranked = [(-score, doc) for doc, score in scores.items()]
+        if limit is None:
+            ranked.sort()
+        else:
+            ranked = heapq.nsmallest(limit, ranked)
+        return [doc for _, doc in ranked]
+
+def _starting_with(values: SortedList, prefix: str) -> Iterator[str]:
+    return takewhile(lambda value: value.startswith(prefix), values.irange(prefix))
+
+def _deletions(word: str) -> Set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    if len(a) < len(b):
+        return a[start:] == b[start + 1:]
+    if a[start + 1:] == b[start + 1:]:
+        return True
+    return (start + 1 < len(a) and a[start] == b[start + 1] and a[start + 1] == b[start]
+            and a[start + 2:] == b[start + 2:])
+
+class NameIndex:
+    """Finds people by ID prefix or by words of their name, tolerating one typo per word.
+
+    Name words are stored once each with the IDs of everyone sharing them, so the sorted
+    word list stays small even with millions of entries; IDs go in their own sorted list.
+    """
+
+    # Words shorter than this must match exactly or as a prefix
+    MIN_FUZZY_LENGTH = 4
+
+    def __init__(self):
+        self._ids = SortedList()
+        self._folded_ids: Dict[str, List[str]] = {}
+        # word -> IDs with that word in their name, in insertion order
+        self._owners: Dict[str, Dict[str, None]] = {}
+        self._words = SortedList()
+        # word with one letter deleted -> words it came from
+        self._variants: Dict[str, Set[str]] = {}
+        self._names: Dict[str, List[str]] = {}
+        # Word entries are shared between people, so changes for different keys still conflict
+        self._lock = threading.Lock()
+
+    def add(self, key: str, name: str):
+        with self._lock:
+            self._add(key, name)
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def _add(self, key: str, name: str):
+        folded_id = fold(key)
+        self._ids.add(folded_id)
+        self._folded_ids.setdefault(folded_id, []).append(key)
+        words = _WORD.findall(fold(name))
+        self._names[key] = words
+        for word in set(words):
+            owners = self._owners.get(word)
+            if owners is None:
+                owners = self._owners[word] = {}
+                self._words.add(word)
+                for variant in _deletions(word):
+                    self._variants.setdefault(variant, set()).add(word)
+            owners[key] = None
+
+    def _remove(self, key: str):
+        words = self._names.pop(key, None)
+        if words is None:
+            return
+        folded_id = fold(key)
+        keys = self._folded_ids[folded_id]
+        keys.remove(key)
+        if not keys:
+            del self._folded_ids[folded_id]
+            self._ids.remove(folded_id)
+        for word in set(words):
+            owners = self._owners[word]
+            del owners[key]
+            if not owners:
+                del self._owners[word]
+                self._words.remove(word)
+                for variant in _deletions(word):
+                    variants = self._variants[variant]
+                    variants.discard(word)
+                    if not variants:
+                        del self._variants[variant]
+
+    def _similar_words(self, word: str) -> List[str]:
+        if len(word) < self.MIN_FUZZY_LENGTH:
+            return []
+        candidates: Set[str] = set()
+        for variant in _deletions(word) | {word}:
+            if variant in self._owners:
+                candidates.add(variant)
+            candidates.update(self._variants.get(variant, ()))
+        return sorted(w for w in candidates if w != word and _within_one_edit(word, w))
+
+    def _matches(self, query_word: str, words: List[str]) -> bool:
+        if any(w.startswith(query_word) for w in words):
+            return True
+        return len(query_word) >= self.MIN_FUZZY_LENGTH and any(_within_one_edit(query_word, w) for w in words)
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Keys best matching query, at most limit of them.
+
+        Order: exact ID, ID prefix, names containing every query word, then names where every
+        query word starts (or is one typo away from) a word of the name. In that last group,
+        names matching the rarest query word exactly come before prefix and then typo matches.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        folded = fold(query).strip()
+        words = _WORD.findall(folded)
+        if not words:
+            return []
+        with self._lock:
+            return self._search(folded, words, limit)
+
+    def _search(self, folded: str, words: List[str], limit: int) -> List[str]:
+        found: Dict[str, None] = {}
+
+        def take(keys: Iterable[str]) -> bool:
+            for key in keys:
+                found[key] = None
+                if len(found) >= limit:
+                    return True
+            return False
+
+        if take(self._folded_ids.get(folded, ())):
+            return list(found)
+        for folded_id in _starting_with(self._ids, folded):
+            if take(self._folded_ids[folded_id]):
+                return list(found)
+
+        # Probe with the rarest word (the longest if none is a whole name word), then check the
+        # other words against each candidate's name
+        probe = min(words, key=lambda w: (len(self._owners.get(w, ())) or len(self._names) + 1, -len(w)))
+        others = list(words)
+        others.remove(probe)
+        exact_others = [self._owners.get(w) for w in others]
+        if probe in self._owners and others and all(exact_others):
+            # Names containing every query word as a whole word come first
+            if take(k for k in self._owners[probe] if all(k in owners for owners in exact_others)):
+                return list(found)
+        prefixed = (w for w in _starting_with(self._words, probe) if w != probe)
+        for tier in ([probe] if probe in self._owners else [], prefixed, self._similar_words(probe)):
+            for word in tier:
+                keys = self._owners[word]
+                if others:
+                    keys = (k for k in keys if all(self._matches(w, self._names[k]) for w in others))
+                if take(keys):
+                    return list(found)
+        return list(found)
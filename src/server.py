@@ -0,0 +1,314 @@
+import asyncio
+import json
+from datetime import date, timedelta
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from src.codec import from_dict, to_dict
+from src.models import Patient, Doctor, Appointment, Anamnesis, ExamRequest, MedicalCertificate
+from src.system import HospitalSystem
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]], headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return data
+
+    def record(self, cls: type) -> Any:
+        try:
+            return from_dict(cls, self.json())
+        except (TypeError, ValueError) as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+
+    def param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.query.get(name)
+        return values[-1] if values else default
+
+# A handler returns (status, JSON payload or None)
+Response = Tuple[HTTPStatus, Any]
+Handler = Callable[..., Response]
+
+def error_status(message: str) -> HTTPStatus:
+    # HospitalSystem reports every rejection as ValueError; the message tells which kind it is
+    if message.endswith("not found"):
+        return HTTPStatus.NOT_FOUND
+    return HTTPStatus.CONFLICT
+
+class HospitalApi:
+    """Maps HTTP routes to HospitalSystem calls."""
+
+    def __init__(self, system: HospitalSystem):
+        self.system = system
+        # (method, path segments) where "*" captures one segment
+        self._routes: List[Tuple[str, Tuple[str, ...], Handler]] = [
+            ("POST", ("patients",), self.add_patient),
+            ("GET", ("patients", "*"), self.get_patient),
+            ("DELETE", ("patients", "*"), self.remove_patient),
+            ("GET", ("patients", "*", "appointments"), self.get_appointments_by_patient),
+            ("POST", ("doctors",), self.add_doctor),
+            ("GET", ("doctors",), self.get_doctors),
+            ("GET", ("doctors", "*"), self.get_doctor),
+            ("DELETE", ("doctors", "*"), self.remove_doctor),
+            ("GET", ("doctors", "*", "appointments"), self.get_appointments_by_doctor),
+            ("GET", ("free-slots",), self.find_free_slots),
+            ("POST", ("appointments",), self.schedule_appointment),
+            ("GET", ("appointments", "*"), self.get_appointment),
+            ("GET", ("appointments", "*", "bundle"), self.get_appointment_bundle),
+            ("POST", ("appointments", "*", "cancel"), self.cancel_appointment),
+            ("POST", ("appointments", "*", "complete"), self.complete_appointment),
+            ("POST", ("anamneses",), self.add_anamnesis),
+            ("GET", ("appointments", "*", "anamnesis"), self.get_anamnesis),
+            ("POST", ("exam-requests",), self.add_exam_request),
+            ("GET", ("appointments", "*", "exam-requests"), self.get_exam_requests),
+            ("POST", ("certificates",), self.add_medical_certificate),
+            ("GET", ("appointments", "*", "certificates"), self.get_medical_certificates),
+        ]
+
+    def handle(self, request: Request) -> Response:
+        segments = tuple(unquote(part) for part in request.path.strip("/").split("/") if part)
+        allowed = False
+        for method, pattern, handler in self._routes:
+            if len(pattern) != len(segments):
+                continue
+            if any(p != "*" and p != s for p, s in zip(pattern, segments)):
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            args = [s for p, s in zip(pattern, segments) if p == "*"]
+            try:
+                return handler(request, *args)
+            except HttpError as e:
+                return e.status, {"error": str(e)}
+            except ValueError as e:
+                return error_status(str(e)), {"error": str(e)}
+            except Exception:
+                # A bug must not take down the connection and every request pipelined behind it
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Method {request.method} not allowed"}
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {request.path}"}
+
+    def add_patient(self, request: Request) -> Response:
+        patient = request.record(Patient)
+        self.system.add_patient(patient)
+        return HTTPStatus.CREATED, to_dict(patient)
+
+    def get_patient(self, request: Request, patient_id: str) -> Response:
+        patient = self.system.get_patient(patient_id)
+        if patient is None:
+            raise ValueError(f"Patient with ID {patient_id} not found")
+        return HTTPStatus.OK, to_dict(patient)
+
+    def remove_patient(self, request: Request, patient_id: str) -> Response:
+        self.system.remove_patient(patient_id)
+        return HTTPStatus.NO_CONTENT, None
+
+    def get_appointments_by_patient(self, request: Request, patient_id: str) -> Response:
+        return HTTPStatus.OK, [to_dict(app) for app in self.system.get_appointments_by_patient(patient_id)]
+
+    def add_doctor(self, request: Request) -> Response:
+        doctor = request.record(Doctor)
+        self.system.add_doctor(doctor)
+        return HTTPStatus.CREATED, to_dict(doctor)
+
+    def get_doctors(self, request: Request) -> Response:
+        specialty = request.param("specialty")
+        doctors = self.system.get_doctors_by_specialty(specialty) if specialty is not None else self.system.doctors.values()
+        return HTTPStatus.OK, [to_dict(doctor) for doctor in doctors]
+
+    def get_doctor(self, request: Request, doctor_id: str) -> Response:
+        doctor = self.system.get_doctor(doctor_id)
+        if doctor is None:
+            raise ValueError(f"Doctor with ID {doctor_id} not found")
+        return HTTPStatus.OK, to_dict(doctor)
+
+    def remove_doctor(self, request: Request, doctor_id: str) -> Response:
+        self.system.remove_doctor(doctor_id)
+        return HTTPStatus.NO_CONTENT, None
+
+    def get_appointments_by_doctor(self, request: Request, doctor_id: str) -> Response:
+        return HTTPStatus.OK, [to_dict(app) for app in self.system.get_appointments_by_doctor(doctor_id)]
+
+    def find_free_slots(self, request: Request) -> Response:
+        try:
+            start = date.fromisoformat(request.param("from", ""))
+            end = date.fromisoformat(request.param("to", request.param("from", "")))
+            minutes = int(request.param("minutes", "30"))
+            count = int(request.param("count", "10"))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Expected from/to dates (YYYY-MM-DD) and integer minutes/count")
+        try:
+            slots = self.system.find_free_slots(start, end, doctor_id=request.param("doctor"),
+                                                specialty=request.param("specialty"),
+                                                slot_length=timedelta(minutes=minutes), count=count)
+        except ValueError as e:
+            if str(e).endswith("not found"):
+                raise
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        return HTTPStatus.OK, [to_dict(slot) for slot in slots]
+
+    def schedule_appointment(self, request: Request) -> Response:
+        app = request.record(Appointment)
+        appointment = self.system.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id,
+                                                       app.date, app.time, app.description)
+        return HTTPStatus.CREATED, to_dict(appointment)
+
+    def get_appointment(self, request: Request, appointment_id: str) -> Response:
+        appointment = self.system.get_appointment(appointment_id)
+        if appointment is None:
+            raise ValueError(f"Appointment with ID {appointment_id} not found")
+        return HTTPStatus.OK, to_dict(appointment)
+
+    def get_appointment_bundle(self, request: Request, appointment_id: str) -> Response:
+        bundle = self.system.get_appointment_bundle(appointment_id)
+        return HTTPStatus.OK, {
+            "appointment": to_dict(bundle.appointment),
+            "anamnesis": to_dict(bundle.anamnesis) if bundle.anamnesis is not None else None,
+            "exam_requests": [to_dict(r) for r in bundle.exam_requests],
+            "medical_certificates": [to_dict(c) for c in bundle.medical_certificates],
+        }
+
+    def cancel_appointment(self, request: Request, appointment_id: str) -> Response:
+        self.system.cancel_appointment(appointment_id)
+        return HTTPStatus.OK, to_dict(self.system.get_appointment(appointment_id))
+
+    def complete_appointment(self, request: Request, appointment_id: str) -> Response:
+        self.system.complete_appointment(appointment_id)
+        return HTTPStatus.OK, to_dict(self.system.get_appointment(appointment_id))
+
+    def add_anamnesis(self, request: Request) -> Response:
+        anamnesis = request.record(Anamnesis)
+        self.system.add_anamnesis(anamnesis)
+        return HTTPStatus.CREATED, to_dict(anamnesis)
+
+    def get_anamnesis(self, request: Request, appointment_id: str) -> Response:
+        anamnesis = self.system.get_anamnesis(appointment_id)
+        if anamnesis is None:
+            raise ValueError(f"Anamnesis for appointment {appointment_id} not found")
+        return HTTPStatus.OK, to_dict(anamnesis)
+
+    def add_exam_request(self, request: Request) -> Response:
+        exam_request = request.record(ExamRequest)
+        self.system.add_exam_request(exam_request)
+        return HTTPStatus.CREATED, to_dict(exam_request)
+
+    def get_exam_requests(self, request: Request, appointment_id: str) -> Response:
+        return HTTPStatus.OK, [to_dict(r) for r in self.system.get_exam_requests_by_appointment(appointment_id)]
+
+    def add_medical_certificate(self, request: Request) -> Response:
+        certificate = request.record(MedicalCertificate)
+        self.system.add_medical_certificate(certificate)
+        return HTTPStatus.CREATED, to_dict(certificate)
+
+    def get_medical_certificates(self, request: Request, appointment_id: str) -> Response:
+        return HTTPStatus.OK, [to_dict(c) for c in self.system.get_medical_certificates_by_appointment(appointment_id)]
+
+def encode_response(status: HTTPStatus, payload: Any, keep_alive: bool) -> bytes:
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Length: {len(body)}\r\n"
+    if body:
+        head += "Content-Type: application/json\r\n"
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return (head + "\r\n").encode("ascii") + body
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request, or return None once the client has closed the connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    headers[":version"] = version
+
+    if "transfer-encoding" in headers:
+        raise HttpError(HTTPStatus.NOT_IMPLEMENTED, "Chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Incomplete request body")
+
+    url = urlsplit(target)
+    return Request(method, url.path, parse_qs(url.query), headers, body)
+
+def wants_keep_alive(request: Request) -> bool:
+    connection = request.headers.get("connection", "").lower()
+    if request.headers[":version"] == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+async def serve_connection(api: HospitalApi, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except HttpError as e:
+                writer.write(encode_response(e.status, {"error": str(e)}, keep_alive=False))
+                break
+            if request is None:
+                break
+            keep_alive = wants_keep_alive(request)
+            status, payload = api.handle(request)
+            writer.write(encode_response(status, payload, keep_alive))
+            # Returns at once unless the client is slow to read, so pipelined requests are not held up
+            await writer.drain()
+            if not keep_alive:
+                break
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def start_server(system: HospitalSystem, host: str = "127.0.0.1", port: int = 8080,
+                       backlog: int = 4096) -> asyncio.AbstractServer:
+    api = HospitalApi(system)
+    return await asyncio.start_server(lambda r, w: serve_connection(api, r, w), host, port,
+                                      backlog=backlog, limit=MAX_HEADER_BYTES)
+
+async def serve(system: HospitalSystem, host: str = "127.0.0.1", port: int = 8080):
+    server = await start_server(system, host, port)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,311 @@
+import hashlib
+import heapq
+import multiprocessing
+import os
+from bisect import bisect_right
+from datetime import date, time, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from src.models import (Patient, Doctor, Appointment, AppointmentBundle, Anamnesis, ExamRequest, MedicalCertificate,
+                        BulkResult, FreeSlot, Recurrence, RowError)
+from src.system import HospitalSystem
+
+def _point(label: str) -> int:
+    # A stable hash, unlike hash(), which differs between processes
+    return int.from_bytes(hashlib.blake2b(label.encode("utf-8"), digest_size=8).digest(), "big")
+
+class HashRing:
+    """Consistent hashing of keys onto shards.
+
+    Each shard owns many points on a ring of 64-bit hashes and a key goes to the shard owning
+    the first point at or after the key's hash, so adding a shard only moves about
+    1 / (shards + 1) of the keys.
+    """
+
+    def __init__(self, shards: int, replicas: int = 64):
+        if shards <= 0:
+            raise ValueError("Shard count must be positive")
+        self.shards = shards
+        self.replicas = replicas
+        ring = sorted((_point(f"shard-{shard}-{replica}"), shard)
+                      for shard in range(shards) for replica in range(replicas))
+        self._points = [point for point, _ in ring]
+        self._owners = [shard for _, shard in ring]
+
+    def shard_for(self, key: str) -> int:
+        index = bisect_right(self._points, _point(key))
+        return self._owners[index % len(self._owners)]
+
+def _detach(value: Any) -> Any:
+    """A copy safe to pickle: worker appointments point back at the worker's system."""
+    if isinstance(value, Appointment):
+        return value.detached()
+    if isinstance(value, list):
+        return [_detach(item) for item in value]
+    return value
+
+# (row, appointment ID, patient ID, doctor ID, date, time, description); plain tuples pickle much faster
+_Row = Tuple[int, str, str, str, date, time, str]
+
+def _schedule_rows(system: HospitalSystem, rows: List[_Row]) -> List[RowError]:
+    errors = []
+    with system.repository.batch():
+        for row, *fields in rows:
+            try:
+                system.schedule_appointment(*fields)
+            except ValueError as e:
+                errors.append(RowError(row, str(e)))
+    return errors
+
+def _worker(connection):
+    system = HospitalSystem()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        op, payload = message
+        try:
+            if op == "call":
+                method, args, kwargs = payload
+                result = _detach(getattr(system, method)(*args, **kwargs))
+            else:
+                result = _schedule_rows(system, payload)
+        except Exception as e:
+            # ValueErrors travel whole so subclasses keep their details, such as SeriesConflictError.conflicts
+            connection.send(("error", type(e).__name__, str(e), e if isinstance(e, ValueError) else None))
+        else:
+            connection.send(("ok", result))
+    system.close()
+    connection.close()
+
+class ShardedHospitalSystem:
+    """HospitalSystem front spreading doctors and their appointments over worker processes.
+
+    Doctors are assigned to shards by consistent hashing of doctor_id and each appointment lives
+    on its doctor's shard. Patients are copied to every shard so any shard can validate a booking.
+    The front remembers which shard holds each appointment, so cancel / complete and the
+    appointment's clinical records go straight there, and gathers per-patient queries from all
+    shards. One front must not be shared between threads; schedule_many() books on all shards
+    in parallel.
+    """
+
+    def __init__(self, shards: Optional[int] = None, replicas: int = 64):
+        self._ring = HashRing(shards if shards is not None else (os.cpu_count() or 1), replicas)
+        self._connections = []
+        self._processes = []
+        for _ in range(self._ring.shards):
+            ours, theirs = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(theirs,), daemon=True)
+            process.start()
+            theirs.close()
+            self._connections.append(ours)
+            self._processes.append(process)
+        # appointment ID -> shard
+        self._appointment_shards: Dict[str, int] = {}
+        # Exam request and certificate IDs are unique across shards, so the front keeps them too
+        self._exam_request_ids: Set[str] = set()
+        self._certificate_ids: Set[str] = set()
+
+    @property
+    def shards(self) -> int:
+        return self._ring.shards
+
+    def shard_of(self, doctor_id: str) -> int:
+        # Hashed on every call; caching would keep every ID ever looked up, unknown ones included
+        return self._ring.shard_for(doctor_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, shard: int, op: str, payload: Any):
+        self._connections[shard].send((op, payload))
+
+    def _receive(self, shard: int) -> Any:
+        reply = self._connections[shard].recv()
+        if reply[0] == "ok":
+            return reply[1]
+        _, name, message, value_error = reply
+        if value_error is not None:
+            raise value_error
+        raise RuntimeError(f"Shard {shard} failed with {name}: {message}")
+
+    def _call(self, shard: int, method: str, *args, **kwargs) -> Any:
+        self._send(shard, "call", (method, args, kwargs))
+        return self._receive(shard)
+
+    def _scatter(self, method: str, *args, **kwargs) -> List[Any]:
+        """Run a method on every shard at once; results in shard order."""
+        for shard in range(self.shards):
+            self._send(shard, "call", (method, args, kwargs))
+        # Collect every reply before raising so the pipes stay in step
+        results, error = [], None
+        for shard in range(self.shards):
+            try:
+                results.append(self._receive(shard))
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def add_patient(self, patient: Patient):
+        self._scatter("add_patient", patient)
+
+    def get_patient(self, patient_id: str) -> Optional[Patient]:
+        return self._call(0, "get_patient", patient_id)
+
+    def remove_patient(self, patient_id: str):
+        if self.get_patient(patient_id) is None:
+            raise ValueError(f"Patient with ID {patient_id} not found")
+        if self.count_active_appointments_by_patient(patient_id):
+            raise ValueError("Cannot remove patient with active appointments")
+        self._scatter("remove_patient", patient_id)
+
+    def add_doctor(self, doctor: Doctor):
+        self._call(self.shard_of(doctor.doctor_id), "add_doctor", doctor)
+
+    def get_doctor(self, doctor_id: str) -> Optional[Doctor]:
+        return self._call(self.shard_of(doctor_id), "get_doctor", doctor_id)
+
+    def remove_doctor(self, doctor_id: str):
+        self._call(self.shard_of(doctor_id), "remove_doctor", doctor_id)
+
+    def get_doctors_by_specialty(self, specialty: str) -> List[Doctor]:
+        return [doctor for doctors in self._scatter("get_doctors_by_specialty", specialty) for doctor in doctors]
+
+    def schedule_appointment(self, appointment_id: str, patient_id: str, doctor_id: str, app_date: date, app_time: time,
+                             description: str = "") -> Appointment:
+        # Shards only know their own appointments, so IDs are checked here
+        if appointment_id in self._appointment_shards:
+            raise ValueError(f"Appointment with ID {appointment_id} already exists")
+        shard = self.shard_of(doctor_id)
+        appointment = self._call(shard, "schedule_appointment", appointment_id, patient_id, doctor_id, app_date,
+                                 app_time, description)
+        self._appointment_shards[appointment_id] = shard
+        return appointment
+
+    def schedule_series(self, id_prefix: str, patient_id: str, doctor_id: str, start_date: date, app_time: time,
+                        recurrence: Recurrence, description: str = "") -> List[Appointment]:
+        for n in range(1, len(recurrence.dates(start_date)) + 1):
+            if f"{id_prefix}-{n}" in self._appointment_shards:
+                raise ValueError(f"Appointment with ID {id_prefix}-{n} already exists")
+        shard = self.shard_of(doctor_id)
+        appointments = self._call(shard, "schedule_series", id_prefix, patient_id, doctor_id, start_date, app_time,
+                                  recurrence, description)
+        for appointment in appointments:
+            self._appointment_shards[appointment.appointment_id] = shard
+        return appointments
+
+    def schedule_many(self, appointments: Iterable[Appointment]) -> BulkResult:
+        """Book appointments on all shards in parallel; rows that fail are reported, the others kept."""
+        rows: List[List[_Row]] = [[] for _ in range(self.shards)]
+        errors: List[RowError] = []
+        seen = set()
+        for row, app in enumerate(appointments):
+            if app.appointment_id in seen or app.appointment_id in self._appointment_shards:
+                errors.append(RowError(row, f"Appointment with ID {app.appointment_id} already exists"))
+                continue
+            seen.add(app.appointment_id)
+            rows[self.shard_of(app.doctor_id)].append(
+                (row, app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time, app.description))
+        for shard, batch in enumerate(rows):
+            self._send(shard, "schedule_rows", batch)
+        applied = 0
+        for shard, batch in enumerate(rows):
+            failed = self._receive(shard)
+            rejected = {error.row for error in failed}
+            for row, appointment_id, *_ in batch:
+                if row not in rejected:
+                    self._appointment_shards[appointment_id] = shard
+            applied += len(batch) - len(failed)
+            errors.extend(failed)
+        errors.sort(key=lambda error: error.row)
+        return BulkResult(applied, errors)
+
+    def _shard_of_appointment(self, appointment_id: str) -> int:
+        shard = self._appointment_shards.get(appointment_id)
+        if shard is None:
+            raise ValueError(f"Appointment with ID {appointment_id} not found")
+        return shard
+
+    def cancel_appointment(self, appointment_id: str):
+        self._call(self._shard_of_appointment(appointment_id), "cancel_appointment", appointment_id)
+
+    def complete_appointment(self, appointment_id: str):
+        self._call(self._shard_of_appointment(appointment_id), "complete_appointment", appointment_id)
+
+    def get_appointment(self, appointment_id: str) -> Optional[Appointment]:
+        shard = self._appointment_shards.get(appointment_id)
+        return None if shard is None else self._call(shard, "get_appointment", appointment_id)
+
+    def get_appointments_by_patient(self, patient_id: str) -> List[Appointment]:
+        """Appointments from every shard, merged by date and time."""
+        per_shard = self._scatter("get_appointments_by_patient", patient_id)
+        return sorted((app for apps in per_shard for app in apps), key=lambda app: (app.date, app.time))
+
+    def get_appointments_by_doctor(self, doctor_id: str) -> List[Appointment]:
+        return self._call(self.shard_of(doctor_id), "get_appointments_by_doctor", doctor_id)
+
+    def count_active_appointments_by_patient(self, patient_id: str) -> int:
+        return sum(self._scatter("count_active_appointments_by_patient", patient_id))
+
+    def count_active_appointments_by_doctor(self, doctor_id: str) -> int:
+        return self._call(self.shard_of(doctor_id), "count_active_appointments_by_doctor", doctor_id)
+
+    def find_free_slots(self, start_date: date, end_date: date, doctor_id: Optional[str] = None,
+                        specialty: Optional[str] = None, slot_length: timedelta = timedelta(minutes=30),
+                        count: int = 10, day_start: time = time(8, 0), day_end: time = time(18, 0)) -> List[FreeSlot]:
+        args = (start_date, end_date, doctor_id, specialty, slot_length, count, day_start, day_end)
+        if doctor_id is not None:
+            return self._call(self.shard_of(doctor_id), "find_free_slots", *args)
+        # Each shard returns its earliest slots, so the overall earliest are among them
+        per_shard = self._scatter("find_free_slots", *args)
+        merged = heapq.merge(*per_shard, key=lambda slot: (slot.date, slot.time, slot.doctor_id))
+        return list(islice(merged, count))
+
+    def add_anamnesis(self, anamnesis: Anamnesis):
+        self._call(self._shard_of_appointment(anamnesis.appointment_id), "add_anamnesis", anamnesis)
+
+    def get_anamnesis(self, appointment_id: str) -> Optional[Anamnesis]:
+        shard = self._appointment_shards.get(appointment_id)
+        return None if shard is None else self._call(shard, "get_anamnesis", appointment_id)
+
+    def add_exam_request(self, request: ExamRequest):
+        if request.request_id in self._exam_request_ids:
+            raise ValueError(f"Exam request with ID {request.request_id} already exists")
+        self._call(self._shard_of_appointment(request.appointment_id), "add_exam_request", request)
+        self._exam_request_ids.add(request.request_id)
+
+    def get_exam_requests_by_appointment(self, appointment_id: str) -> List[ExamRequest]:
+        shard = self._appointment_shards.get(appointment_id)
+        return [] if shard is None else self._call(shard, "get_exam_requests_by_appointment", appointment_id)
+
+    def add_medical_certificate(self, certificate: MedicalCertificate):
+        if certificate.certificate_id in self._certificate_ids:
+            raise ValueError(f"Certificate with ID {certificate.certificate_id} already exists")
+        self._call(self._shard_of_appointment(certificate.appointment_id), "add_medical_certificate", certificate)
+        self._certificate_ids.add(certificate.certificate_id)
+
+    def get_medical_certificates_by_appointment(self, appointment_id: str) -> List[MedicalCertificate]:
+        shard = self._appointment_shards.get(appointment_id)
+        return [] if shard is None else self._call(shard, "get_medical_certificates_by_appointment", appointment_id)
+
+    def get_appointment_bundle(self, appointment_id: str) -> AppointmentBundle:
+        return self._call(self._shard_of_appointment(appointment_id), "get_appointment_bundle", appointment_id)
+
+    def check_invariants(self):
+        self._scatter("check_invariants")
+
+    def close(self):
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process, connection in zip(self._processes, self._connections):
+            process.join()
+            connection.close()
+        self._connections, self._processes = [], []
@@ -0,0 +1,181 @@
+import gc
+import mmap
+import os
+import struct
+from datetime import date, time
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+from src.system import HospitalSystem
+
+MAGIC = b"HMSNAP01"
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".bin"
+
+# magic, sequence number of the last operation log record included
+_HEADER = struct.Struct("<8sQ")
+_COUNT = struct.Struct("<Q")
+
+_STATUS_CODES = {status: code for code, status in enumerate(AppointmentStatus)}
+_STATUSES = list(AppointmentStatus)
+
+class _Layout:
+    """Fixed-width fields followed by the byte lengths of the record's UTF-8 strings, then the strings."""
+
+    def __init__(self, fixed: str, strings: int):
+        self.fixed = len(fixed)
+        self.struct = struct.Struct("<" + fixed + "I" * strings)
+
+    def pack(self, fixed: Tuple, strings: Tuple[str, ...]) -> bytes:
+        encoded = [value.encode("utf-8") for value in strings]
+        return self.struct.pack(*fixed, *map(len, encoded)) + b"".join(encoded)
+
+    def unpack(self, buffer, offset: int) -> Tuple[Tuple, List[str], int]:
+        values = self.struct.unpack_from(buffer, offset)
+        offset += self.struct.size
+        strings = []
+        for length in values[self.fixed:]:
+            end = offset + length
+            strings.append(str(buffer[offset:end], "utf-8"))
+            offset = end
+        return values, strings, offset
+
+# age, has_insurance | patient_id, name, gender, insurance_name
+_PATIENT = _Layout("i?", 4)
+# doctor_id, name, specialty
+_DOCTOR = _Layout("", 3)
+# date as proleptic ordinal, time as microseconds since midnight, status code
+# | appointment_id, patient_id, doctor_id, description
+_APPOINTMENT = _Layout("IQB", 4)
+# appointment_id, symptoms, diagnosis
+_ANAMNESIS = _Layout("", 3)
+# request_id, appointment_id, exam_name, description
+_EXAM_REQUEST = _Layout("", 4)
+# days | certificate_id, appointment_id, description
+_CERTIFICATE = _Layout("i", 3)
+
+def snapshot_name(seq: int) -> str:
+    return f"{SNAPSHOT_PREFIX}{seq:020d}{SNAPSHOT_SUFFIX}"
+
+def list_snapshots(directory: str) -> List[Tuple[int, str]]:
+    snapshots = []
+    for name in os.listdir(directory):
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+            seq = name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)]
+            if seq.isdigit():
+                snapshots.append((int(seq), os.path.join(directory, name)))
+    return sorted(snapshots)
+
+def latest_snapshot(directory: str) -> Optional[Tuple[int, str]]:
+    snapshots = list_snapshots(directory)
+    return snapshots[-1] if snapshots else None
+
+def _pack_time(value: time) -> int:
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+def _unpack_time(value: int) -> time:
+    seconds, microsecond = divmod(value, 1_000_000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return time(hour, minute, second, microsecond)
+
+def _write_section(f: BinaryIO, records, layout: _Layout, encode):
+    f.write(_COUNT.pack(len(records)))
+    chunk = []
+    for record in records.values():
+        fixed, strings = encode(record)
+        chunk.append(layout.pack(fixed, strings))
+        if len(chunk) >= 4096:
+            f.write(b"".join(chunk))
+            chunk.clear()
+    f.write(b"".join(chunk))
+
+def write_snapshot(system: HospitalSystem, path: str, seq: int):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, seq))
+        _write_section(f, system.patients, _PATIENT, lambda p: (
+            (p.age, p.has_insurance), (p.patient_id, p.name, p.gender, p.insurance_name)))
+        _write_section(f, system.doctors, _DOCTOR, lambda d: (
+            (), (d.doctor_id, d.name, d.specialty)))
+        _write_section(f, system.appointments, _APPOINTMENT, lambda a: (
+            (a.date.toordinal(), _pack_time(a.time), _STATUS_CODES[a.status]),
+            (a.appointment_id, a.patient_id, a.doctor_id, a.description)))
+        _write_section(f, system.anamneses, _ANAMNESIS, lambda an: (
+            (), (an.appointment_id, an.symptoms, an.diagnosis)))
+        _write_section(f, system.exam_requests, _EXAM_REQUEST, lambda r: (
+            (), (r.request_id, r.appointment_id, r.exam_name, r.description)))
+        _write_section(f, system.medical_certificates, _CERTIFICATE, lambda c: (
+            (c.days,), (c.certificate_id, c.appointment_id, c.description)))
+        f.flush()
+        os.fsync(f.fileno())
+    # Readers only ever see a complete snapshot
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(path) or ".")
+
+def _read_count(buffer, offset: int) -> Tuple[int, int]:
+    return _COUNT.unpack_from(buffer, offset)[0], offset + _COUNT.size
+
+def load_snapshot(system: HospitalSystem, path: str) -> int:
+    # Loading allocates millions of acyclic objects; repeated cyclic GC passes would dominate
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_snapshot(system, path)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def _load_snapshot(system: HospitalSystem, path: str) -> int:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        magic, seq = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        offset = _HEADER.size
+        # Appointments repeat patient and doctor IDs; share one string object per ID
+        ids: Dict[str, str] = {}
+
+        count, offset = _read_count(buffer, offset)
+        for _ in range(count):
+            (age, has_insurance, *_), (patient_id, name, gender, insurance_name), offset = _PATIENT.unpack(buffer, offset)
+            patient_id = ids.setdefault(patient_id, patient_id)
+            HospitalSystem.add_patient(system, Patient(patient_id, name, age, gender, has_insurance, insurance_name))
+
+        count, offset = _read_count(buffer, offset)
+        for _ in range(count):
+            _, (doctor_id, name, specialty), offset = _DOCTOR.unpack(buffer, offset)
+            doctor_id = ids.setdefault(doctor_id, doctor_id)
+            HospitalSystem.add_doctor(system, Doctor(doctor_id, name, specialty))
+
+        count, offset = _read_count(buffer, offset)
+        for _ in range(count):
+            (ordinal, packed_time, status, *_), (appointment_id, patient_id, doctor_id, description), offset = _APPOINTMENT.unpack(buffer, offset)
+            system._restore_appointment(Appointment(
+                appointment_id, ids.setdefault(patient_id, patient_id), ids.setdefault(doctor_id, doctor_id),
+                date.fromordinal(ordinal), _unpack_time(packed_time), _STATUSES[status], description,
+            ))
+
+        count, offset = _read_count(buffer, offset)
+        for _ in range(count):
+            _, (appointment_id, symptoms, diagnosis), offset = _ANAMNESIS.unpack(buffer, offset)
+            HospitalSystem.add_anamnesis(system, Anamnesis(appointment_id, symptoms, diagnosis))
+
+        count, offset = _read_count(buffer, offset)
+        for _ in range(count):
+            _, (request_id, appointment_id, exam_name, description), offset = _EXAM_REQUEST.unpack(buffer, offset)
+            HospitalSystem.add_exam_request(system, ExamRequest(request_id, appointment_id, exam_name, description))
+
+        count, offset = _read_count(buffer, offset)
+        for _ in range(count):
+            (days, *_), (certificate_id, appointment_id, description), offset = _CERTIFICATE.unpack(buffer, offset)
+            HospitalSystem.add_medical_certificate(system, MedicalCertificate(certificate_id, appointment_id, days, description))
+    return seq
+
+def _fsync_directory(directory: str):
+    # Directories cannot be opened for fsync on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,74 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Iterator, List, Optional
+
+class SortedList:
+    """Sorted list of unique values split into blocks, so inserts and removals move one small block."""
+
+    _LOAD = 512
+
+    def __init__(self):
+        self._blocks: List[List[Any]] = []
+        # Last (largest) value of each block
+        self._maxes: List[Any] = []
+
+    def __len__(self) -> int:
+        return sum(len(block) for block in self._blocks)
+
+    def __iter__(self) -> Iterator:
+        for block in self._blocks:
+            yield from block
+
+    def add(self, value):
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            return
+        if value > self._maxes[-1]:
+            # Appending past the end is the common case for time-ordered keys
+            index = len(self._blocks) - 1
+            block = self._blocks[index]
+            block.append(value)
+        else:
+            index = bisect_left(self._maxes, value)
+            block = self._blocks[index]
+            position = bisect_left(block, value)
+            if block[position] == value:
+                return
+            block.insert(position, value)
+        self._maxes[index] = block[-1]
+        if len(block) > 2 * self._LOAD:
+            self._blocks[index:index + 1] = [block[:self._LOAD], block[self._LOAD:]]
+            self._maxes[index:index + 1] = [block[self._LOAD - 1], block[-1]]
+
+    def remove(self, value):
+        index = bisect_left(self._maxes, value)
+        if index == len(self._blocks):
+            return
+        block = self._blocks[index]
+        position = bisect_left(block, value)
+        if position == len(block) or block[position] != value:
+            return
+        del block[position]
+        if block:
+            self._maxes[index] = block[-1]
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+
+    def irange(self, minimum, maximum: Optional[Any] = None) -> Iterator:
+        """Values v with minimum <= v < maximum (or every value from minimum on), in order.
+
+        Values are produced lazily, so the cost follows the number taken rather than the list size.
+        """
+        index = bisect_left(self._maxes, minimum)
+        if index == len(self._blocks):
+            return
+        position = bisect_left(self._blocks[index], minimum)
+        while index < len(self._blocks):
+            for value in islice(self._blocks[index], position, None):
+                if maximum is not None and not value < maximum:
+                    return
+                yield value
+            index += 1
+            position = 0
@@ -1,79 +1,297 @@
-from typing import List, Optional
-from datetime import date, time
-from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+import heapq
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate, AppointmentBundle, PatientHistory, BulkImportError, BulkResult, FreeSlot, Recurrence, RowError, SeriesConflictError
+from src.aggregates import AppointmentCounters, AppointmentCounts
+from src.availability import iter_free_slots
+from src.cache import CacheStats, LRUCache
+from src.events import ChangeFeed, EventKind
+from src.instrumentation import Instrumentation, public_methods, timed
+from src.repository import HospitalRepository, InMemoryRepository
+from src.search import NameIndex, TextIndex
+
+_STATUS_EVENTS = {
+    AppointmentStatus.SCHEDULED: EventKind.APPOINTMENT_SCHEDULED,
+    AppointmentStatus.CANCELLED: EventKind.APPOINTMENT_CANCELLED,
+    AppointmentStatus.COMPLETED: EventKind.APPOINTMENT_COMPLETED,
+}
+
+# Methods left alone by enable_instrumentation
+_UNTIMED = {"enable_instrumentation", "disable_instrumentation", "enable_change_feed", "disable_change_feed"}
 
 class HospitalSystem:
-    def __init__(self):
-        self.patients = {}
-        self.doctors = {}
-        self.appointments = {}
-        self.anamneses = {}
-        self.exam_requests = {}
-        self.medical_certificates = {}
+    # Patient histories kept by get_patient_history
+    HISTORY_CACHE_SIZE = 1024
+
+    def __init__(self, repository: Optional[HospitalRepository] = None):
+        self._metrics: Optional[Instrumentation] = None
+        self._feed: Optional[ChangeFeed] = None
+        self._histories: LRUCache[PatientHistory] = LRUCache(self.HISTORY_CACHE_SIZE)
+        self._repository = repository if repository is not None else InMemoryRepository()
+        self._repository.status_observer = self._on_status_change
+        # Materialized per doctor / specialty / day / status counts; existing records are counted once here
+        self._counters = AppointmentCounters()
+        for appointment in self._repository.appointments.values():
+            self._count_appointment(appointment)
+        self._patient_names = NameIndex()
+        for patient in self._repository.patients.values():
+            self._patient_names.add(patient.patient_id, patient.name)
+        # Symptoms, diagnoses and exam requests by appointment ID
+        self._clinical_text = TextIndex()
+        for anamnesis in self._repository.anamneses.values():
+            self._index_anamnesis(anamnesis)
+        for request in self._repository.exam_requests.values():
+            self._index_exam_request(request)
+
+    @property
+    def repository(self) -> HospitalRepository:
+        return self._repository
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        return self._metrics
+
+    def enable_instrumentation(self, metrics: Optional[Instrumentation] = None) -> Instrumentation:
+        """Record calls, latencies and records scanned for every public method from now on.
+
+        Methods are wrapped on this instance only while enabled, so a system that never
+        enables instrumentation runs the plain methods.
+        """
+        if self._metrics is not None:
+            raise ValueError("Instrumentation is already enabled")
+        self._metrics = metrics if metrics is not None else Instrumentation()
+        for name in public_methods(type(self)):
+            if name not in _UNTIMED:
+                setattr(self, name, timed(name, getattr(self, name), self._metrics))
+        return self._metrics
+
+    def disable_instrumentation(self):
+        for name in public_methods(type(self)):
+            self.__dict__.pop(name, None)
+        self._metrics = None
+
+    @property
+    def change_feed(self) -> Optional[ChangeFeed]:
+        return self._feed
+
+    def enable_change_feed(self, feed: Optional[ChangeFeed] = None) -> ChangeFeed:
+        """Publish an event for every change from now on; changes already made are not replayed."""
+        if self._feed is not None:
+            raise ValueError("Change feed is already enabled")
+        self._feed = feed if feed is not None else ChangeFeed()
+        return self._feed
+
+    def disable_change_feed(self):
+        self._feed = None
+
+    def _publish(self, kind: EventKind, record):
+        feed = self._feed
+        if feed is not None:
+            if isinstance(record, Appointment):
+                # Appointments change status later, so subscribers get a copy as of now
+                record = record.detached()
+            # Inside a batch the event waits for the commit, so a rollback never reaches subscribers
+            self._repository.on_commit(lambda: feed.publish(kind, record))
+
+    @property
+    def patients(self) -> Mapping[str, Patient]:
+        return self._repository.patients
+
+    @property
+    def doctors(self) -> Mapping[str, Doctor]:
+        return self._repository.doctors
+
+    @property
+    def appointments(self) -> Mapping[str, Appointment]:
+        return self._repository.appointments
+
+    @property
+    def anamneses(self) -> Mapping[str, Anamnesis]:
+        return self._repository.anamneses
+
+    @property
+    def exam_requests(self) -> Mapping[str, ExamRequest]:
+        return self._repository.exam_requests
+
+    @property
+    def medical_certificates(self) -> Mapping[str, MedicalCertificate]:
+        return self._repository.medical_certificates
 
     def add_patient(self, patient: Patient):
+        self._check_new_patient(patient)
+        self._repository.add_patient(patient)
+        self._patient_names.add(patient.patient_id, patient.name)
+        self._publish(EventKind.PATIENT_ADDED, patient)
+
+    def _check_new_patient(self, patient: Patient):
+        # The _check_* methods raise what the matching change would, without changing anything
         if patient.patient_id in self.patients:
             raise ValueError(f"Patient with ID {patient.patient_id} already exists")
-        self.patients[patient.patient_id] = patient
 
     def get_patient(self, patient_id: str) -> Optional[Patient]:
         return self.patients.get(patient_id)
 
     def remove_patient(self, patient_id: str):
+        self._check_removable_patient(patient_id)
+        self._repository.remove_patient(patient_id)
+        self._patient_names.remove(patient_id)
+        self._histories.invalidate(patient_id)
+        self._publish(EventKind.PATIENT_REMOVED, patient_id)
+
+    def _check_removable_patient(self, patient_id: str):
         if patient_id not in self.patients:
             raise ValueError(f"Patient with ID {patient_id} not found")
         # Check for active appointments
-        for app in self.appointments.values():
-            if app.patient_id == patient_id and app.status == AppointmentStatus.SCHEDULED:
-                raise ValueError("Cannot remove patient with active appointments")
-        del self.patients[patient_id]
+        if self._repository.count_active_by_patient(patient_id):
+            raise ValueError("Cannot remove patient with active appointments")
+
+    def search_patients(self, query: str, limit: int = 10) -> List[Patient]:
+        """Patients whose ID starts with query, or whose name has words starting with each query word.
+
+        Case and accents are ignored and words of four or more letters may contain one typo.
+        """
+        return [self.patients[patient_id] for patient_id in self._patient_names.search(query, limit)]
 
     def add_doctor(self, doctor: Doctor):
+        self._check_new_doctor(doctor)
+        self._repository.add_doctor(doctor)
+        self._repository.on_commit(lambda: self._counters.set_specialty(doctor.doctor_id, doctor.specialty))
+        self._publish(EventKind.DOCTOR_ADDED, doctor)
+
+    def _check_new_doctor(self, doctor: Doctor):
         if doctor.doctor_id in self.doctors:
             raise ValueError(f"Doctor with ID {doctor.doctor_id} already exists")
-        self.doctors[doctor.doctor_id] = doctor
 
     def get_doctor(self, doctor_id: str) -> Optional[Doctor]:
         return self.doctors.get(doctor_id)
 
     def remove_doctor(self, doctor_id: str):
+        self._check_removable_doctor(doctor_id)
+        self._repository.remove_doctor(doctor_id)
+        self._repository.on_commit(lambda: self._counters.set_specialty(doctor_id, None))
+        self._publish(EventKind.DOCTOR_REMOVED, doctor_id)
+
+    def _check_removable_doctor(self, doctor_id: str):
         if doctor_id not in self.doctors:
             raise ValueError(f"Doctor with ID {doctor_id} not found")
         # Check for active appointments
-        for app in self.appointments.values():
-            if app.doctor_id == doctor_id and app.status == AppointmentStatus.SCHEDULED:
-                raise ValueError("Cannot remove doctor with active appointments")
-        del self.doctors[doctor_id]
+        if self._repository.count_active_by_doctor(doctor_id):
+            raise ValueError("Cannot remove doctor with active appointments")
 
     def schedule_appointment(self, appointment_id: str, patient_id: str, doctor_id: str, app_date: date, app_time: time, description: str = "") -> Appointment:
+        appointment = Appointment(appointment_id, patient_id, doctor_id, app_date, app_time, AppointmentStatus.SCHEDULED, description)
+        self._check_booking(appointment)
+        return self._book(appointment)
+
+    def _check_booking(self, appointment: Appointment):
+        self._check_new_appointment(appointment.appointment_id)
+        if appointment.patient_id not in self.patients:
+            raise ValueError(f"Patient with ID {appointment.patient_id} not found")
+        if appointment.doctor_id not in self.doctors:
+            raise ValueError(f"Doctor with ID {appointment.doctor_id} not found")
+        
+        self._repository.validate_appointment(appointment)
+        # Check doctor availability
+        if self._repository.is_slot_booked(appointment.doctor_id, appointment.date, appointment.time):
+            raise ValueError("Doctor is not available at this time")
+
+    def _check_new_appointment(self, appointment_id: str):
         if appointment_id in self.appointments:
             raise ValueError(f"Appointment with ID {appointment_id} already exists")
+
+    def schedule_series(self, id_prefix: str, patient_id: str, doctor_id: str, start_date: date, app_time: time,
+                        recurrence: Recurrence, description: str = "") -> List[Appointment]:
+        """Book every occurrence of a recurring appointment, or none of them.
+
+        Occurrence n (counting from 1) gets the ID "{id_prefix}-{n}". If the doctor is already booked
+        at any occurrence, SeriesConflictError lists all those dates and nothing is booked.
+        """
+        appointments = self._check_series(id_prefix, patient_id, doctor_id, start_date, app_time, recurrence,
+                                          description)
+        with self._repository.batch():
+            return [self._book(appointment) for appointment in appointments]
+
+    def _check_series(self, id_prefix: str, patient_id: str, doctor_id: str, start_date: date, app_time: time,
+                      recurrence: Recurrence, description: str) -> List[Appointment]:
+        """The series' appointments, once the whole series is known to fit."""
+        dates = recurrence.dates(start_date)
+        ids = [f"{id_prefix}-{n}" for n in range(1, len(dates) + 1)]
+        for appointment_id in ids:
+            self._check_new_appointment(appointment_id)
         if patient_id not in self.patients:
             raise ValueError(f"Patient with ID {patient_id} not found")
         if doctor_id not in self.doctors:
             raise ValueError(f"Doctor with ID {doctor_id} not found")
-        
-        # Check doctor availability
-        for app in self.appointments.values():
-            if (app.doctor_id == doctor_id and 
-                app.date == app_date and 
-                app.time == app_time and 
-                app.status == AppointmentStatus.SCHEDULED):
-                raise ValueError("Doctor is not available at this time")
 
-        appointment = Appointment(appointment_id, patient_id, doctor_id, app_date, app_time, AppointmentStatus.SCHEDULED, description)
-        self.appointments[appointment_id] = appointment
+        appointments = [Appointment(appointment_id, patient_id, doctor_id, day, app_time, AppointmentStatus.SCHEDULED,
+                                    description) for appointment_id, day in zip(ids, dates)]
+        for appointment in appointments:
+            self._repository.validate_appointment(appointment)
+        conflicts = self._repository.booked_slots(doctor_id, [(day, app_time) for day in dates])
+        if conflicts:
+            raise SeriesConflictError([day for day, _ in conflicts])
+        return appointments
+
+    def _book(self, appointment: Appointment) -> Appointment:
+        self._repository.add_appointment(appointment)
+        self._count_appointment(appointment)
+        self._histories.invalidate(appointment.patient_id)
+        self._publish(EventKind.APPOINTMENT_SCHEDULED, appointment)
         return appointment
 
+    def _restore_appointment(self, appointment: Appointment):
+        # Loads persisted state as-is, so no availability or foreign key checks
+        self._check_new_appointment(appointment.appointment_id)
+        self._repository.add_appointment(appointment)
+        self._count_appointment(appointment)
+        self._histories.invalidate(appointment.patient_id)
+
+    def _import_appointment(self, appointment: Appointment):
+        # A cancelled or completed appointment from bulk_schedule, added with its status
+        self._restore_appointment(appointment)
+        self._publish(_STATUS_EVENTS[appointment.status], appointment)
+
+    def _count_appointment(self, appointment: Appointment):
+        doctor = self.doctors.get(appointment.doctor_id)
+        specialty, status = doctor.specialty if doctor is not None else None, appointment.status
+        # Counted once committed, so a batch that rolls back leaves the counters alone
+        self._repository.on_commit(lambda: self._counters.add(appointment, specialty, status))
+
+    def _on_status_change(self, appointment: Appointment, previous: AppointmentStatus) -> bool:
+        # A repeated or stale notification must not move the counters or reach subscribers twice
+        if not self._repository.appointment_status_changed(appointment, previous):
+            return False
+        status = appointment.status
+        self._repository.on_commit(lambda: self._counters.move(appointment, previous, status))
+        self._histories.invalidate(appointment.patient_id)
+        self._publish(_STATUS_EVENTS[appointment.status], appointment)
+        return True
+
+    def get_appointment_counts(self, doctor_id: Optional[str] = None, specialty: Optional[str] = None,
+                               day: Optional[date] = None) -> Dict[AppointmentStatus, int]:
+        return self._counters.by_status(doctor_id, specialty, day)
+
+    def appointment_counts_snapshot(self) -> AppointmentCounts:
+        return self._counters.snapshot()
+
+    def count_active_appointments_by_patient(self, patient_id: str) -> int:
+        return self._repository.count_active_by_patient(patient_id)
+
+    def count_active_appointments_by_doctor(self, doctor_id: str) -> int:
+        return self._repository.count_active_by_doctor(doctor_id)
+
     def cancel_appointment(self, appointment_id: str):
-        if appointment_id not in self.appointments:
+        appointment = self.appointments.get(appointment_id)
+        if appointment is None:
             raise ValueError(f"Appointment with ID {appointment_id} not found")
-        self.appointments[appointment_id].cancel()
+        appointment.cancel()
 
     def complete_appointment(self, appointment_id: str):
-        if appointment_id not in self.appointments:
+        appointment = self.appointments.get(appointment_id)
+        if appointment is None:
             raise ValueError(f"Appointment with ID {appointment_id} not found")
-        self.appointments[appointment_id].complete()
+        appointment.complete()
 
     def get_appointment(self, appointment_id: str) -> Optional[Appointment]:
         return self.appointments.get(appointment_id)
@@ -81,43 +299,253 @@ class HospitalSystem:
     def get_appointments_by_patient(self, patient_id: str) -> List[Appointment]:
         if patient_id not in self.patients:
             raise ValueError(f"Patient with ID {patient_id} not found")
-        return [app for app in self.appointments.values() if app.patient_id == patient_id]
+        appointments = self._repository.appointments_by_patient(patient_id)
+        if self._metrics is not None:
+            self._metrics.record_scanned("get_appointments_by_patient", len(appointments))
+        return appointments
 
     def get_appointments_by_doctor(self, doctor_id: str) -> List[Appointment]:
         if doctor_id not in self.doctors:
             raise ValueError(f"Doctor with ID {doctor_id} not found")
-        return [app for app in self.appointments.values() if app.doctor_id == doctor_id]
+        appointments = self._repository.appointments_by_doctor(doctor_id)
+        if self._metrics is not None:
+            self._metrics.record_scanned("get_appointments_by_doctor", len(appointments))
+        return appointments
+
+    def get_appointments_between(self, start: date, end: date, doctor_id: Optional[str] = None,
+                                 status: Optional[AppointmentStatus] = None) -> Iterator[Appointment]:
+        """Appointments from start (inclusive) to end (exclusive) in time order, produced lazily.
+
+        start and end are datetimes, or dates standing for their midnight, so one day's agenda is
+        get_appointments_between(day, day + timedelta(days=1)).
+        """
+        start, end = _as_datetime(start), _as_datetime(end)
+        if start > end:
+            raise ValueError("Start must not be after end")
+        if doctor_id is not None and doctor_id not in self.doctors:
+            raise ValueError(f"Doctor with ID {doctor_id} not found")
+        appointments = self._repository.appointments_between(start, end, doctor_id)
+        if self._metrics is not None:
+            appointments = self._metrics.counted("get_appointments_between", appointments)
+        if status is not None:
+            appointments = (appointment for appointment in appointments if appointment.status == status)
+        return appointments
+
+    def get_doctors_by_specialty(self, specialty: str) -> List[Doctor]:
+        if self._metrics is not None:
+            self._metrics.record_scanned("get_doctors_by_specialty", len(self.doctors))
+        return [doctor for doctor in self.doctors.values() if doctor.specialty == specialty]
+
+    def find_free_slots(self, start_date: date, end_date: date, doctor_id: Optional[str] = None,
+                        specialty: Optional[str] = None, slot_length: timedelta = timedelta(minutes=30),
+                        count: int = 10, day_start: time = time(8, 0), day_end: time = time(18, 0)) -> List[FreeSlot]:
+        if (doctor_id is None) == (specialty is None):
+            raise ValueError("Provide either a doctor ID or a specialty")
+        if slot_length <= timedelta(0):
+            raise ValueError("Slot length must be positive")
+        if count <= 0:
+            raise ValueError("Count must be positive")
+        if day_start >= day_end:
+            raise ValueError("Working day must start before it ends")
+        if start_date > end_date:
+            raise ValueError("Start date must not be after end date")
+
+        if doctor_id is not None:
+            if doctor_id not in self.doctors:
+                raise ValueError(f"Doctor with ID {doctor_id} not found")
+            doctor_ids = [doctor_id]
+        else:
+            doctor_ids = [doctor.doctor_id for doctor in self.get_doctors_by_specialty(specialty)]
+
+        searches = [
+            iter_free_slots(d_id, self._repository.booked_times(d_id, start_date, day_start),
+                            start_date, end_date, slot_length, day_start, day_end)
+            for d_id in doctor_ids
+        ]
+        # Earliest slots first across doctors
+        merged = heapq.merge(*searches, key=lambda slot: (slot.date, slot.time, slot.doctor_id))
+        return list(islice(merged, count))
 
     def add_anamnesis(self, anamnesis: Anamnesis):
+        self._check_anamnesis(anamnesis)
+        self._repository.add_anamnesis(anamnesis)
+        self._index_anamnesis(anamnesis)
+        self._invalidate_history_of(anamnesis.appointment_id)
+        self._publish(EventKind.ANAMNESIS_ADDED, anamnesis)
+
+    def _check_anamnesis(self, anamnesis: Anamnesis):
         if anamnesis.appointment_id not in self.appointments:
              raise ValueError(f"Appointment with ID {anamnesis.appointment_id} not found")
         
         if anamnesis.appointment_id in self.anamneses:
              raise ValueError(f"Anamnesis for appointment {anamnesis.appointment_id} already exists")
-        
-        self.anamneses[anamnesis.appointment_id] = anamnesis
 
     def get_anamnesis(self, appointment_id: str) -> Optional[Anamnesis]:
         return self.anamneses.get(appointment_id)
 
     def add_exam_request(self, request: ExamRequest):
+        self._check_exam_request(request)
+        self._repository.add_exam_request(request)
+        self._index_exam_request(request)
+        self._invalidate_history_of(request.appointment_id)
+        self._publish(EventKind.EXAM_REQUESTED, request)
+
+    def _check_exam_request(self, request: ExamRequest):
         if request.request_id in self.exam_requests:
              raise ValueError(f"Exam request with ID {request.request_id} already exists")
         if request.appointment_id not in self.appointments:
              raise ValueError(f"Appointment with ID {request.appointment_id} not found")
-        
-        self.exam_requests[request.request_id] = request
+
+    def _index_anamnesis(self, anamnesis: Anamnesis):
+        self._clinical_text.add(anamnesis.appointment_id, f"{anamnesis.symptoms} {anamnesis.diagnosis}")
+
+    def _index_exam_request(self, request: ExamRequest):
+        self._clinical_text.add(request.appointment_id, f"{request.exam_name} {request.description}")
+
+    def search_clinical_text(self, query: str, match_all: bool = True, limit: Optional[int] = None) -> List[str]:
+        """IDs of appointments whose anamnesis or exam requests mention the query terms, best match first.
+
+        Matching ignores case and accents; with match_all=False any one term is enough.
+        """
+        return self._clinical_text.search(query, match_all, limit)
 
     def get_exam_requests_by_appointment(self, appointment_id: str) -> List[ExamRequest]:
-        return [req for req in self.exam_requests.values() if req.appointment_id == appointment_id]
+        return self._repository.exam_requests_by_appointment(appointment_id)
 
     def add_medical_certificate(self, certificate: MedicalCertificate):
+        self._check_certificate(certificate)
+        self._repository.add_medical_certificate(certificate)
+        self._invalidate_history_of(certificate.appointment_id)
+        self._publish(EventKind.CERTIFICATE_ISSUED, certificate)
+
+    def _check_certificate(self, certificate: MedicalCertificate):
         if certificate.certificate_id in self.medical_certificates:
              raise ValueError(f"Certificate with ID {certificate.certificate_id} already exists")
         if certificate.appointment_id not in self.appointments:
              raise ValueError(f"Appointment with ID {certificate.appointment_id} not found")
-        
-        self.medical_certificates[certificate.certificate_id] = certificate
 
     def get_medical_certificates_by_appointment(self, appointment_id: str) -> List[MedicalCertificate]:
-        return [cert for cert in self.medical_certificates.values() if cert.appointment_id == appointment_id]
+        return self._repository.certificates_by_appointment(appointment_id)
+
+    def get_appointment_bundle(self, appointment_id: str) -> AppointmentBundle:
+        appointment = self.appointments.get(appointment_id)
+        if appointment is None:
+            raise ValueError(f"Appointment with ID {appointment_id} not found")
+        return AppointmentBundle(
+            appointment,
+            self.anamneses.get(appointment_id),
+            self.get_exam_requests_by_appointment(appointment_id),
+            self.get_medical_certificates_by_appointment(appointment_id),
+        )
+
+    def get_patient_history(self, patient_id: str) -> PatientHistory:
+        """The patient's appointments with their clinical records, oldest first.
+
+        Served from an LRU cache of the last HISTORY_CACHE_SIZE patients viewed, which every
+        change to the patient's appointments or records invalidates. Treat the result as read-only.
+        """
+        # Removing a patient invalidates their entry, so only misses need to check the patient exists
+        return self._histories.get(patient_id, lambda: self._load_history(patient_id))
+
+    def _load_history(self, patient_id: str) -> PatientHistory:
+        patient = self.patients.get(patient_id)
+        if patient is None:
+            raise ValueError(f"Patient with ID {patient_id} not found")
+        appointments = sorted(self._repository.appointments_by_patient(patient_id), key=lambda app: (app.date, app.time))
+        anamneses = self.anamneses
+        visits = [AppointmentBundle(app, anamneses.get(app.appointment_id),
+                                    self._repository.exam_requests_by_appointment(app.appointment_id),
+                                    self._repository.certificates_by_appointment(app.appointment_id))
+                  for app in appointments]
+        return PatientHistory(patient, visits)
+
+    def _invalidate_history_of(self, appointment_id: str):
+        appointment = self.appointments.get(appointment_id)
+        if appointment is not None:
+            self._histories.invalidate(appointment.patient_id)
+
+    def history_cache_stats(self) -> CacheStats:
+        return self._histories.stats()
+
+    def bulk_add_patients(self, patients: Iterable[Patient], atomic: bool = True) -> BulkResult:
+        seen: Set[str] = set()
+        valid, errors = [], []
+        for row, patient in enumerate(patients):
+            if patient.patient_id in seen or patient.patient_id in self.patients:
+                errors.append(RowError(row, f"Patient with ID {patient.patient_id} already exists"))
+                continue
+            seen.add(patient.patient_id)
+            valid.append(patient)
+        return self._apply_bulk(valid, errors, atomic, self.add_patient)
+
+    def bulk_add_doctors(self, doctors: Iterable[Doctor], atomic: bool = True) -> BulkResult:
+        seen: Set[str] = set()
+        valid, errors = [], []
+        for row, doctor in enumerate(doctors):
+            if doctor.doctor_id in seen or doctor.doctor_id in self.doctors:
+                errors.append(RowError(row, f"Doctor with ID {doctor.doctor_id} already exists"))
+                continue
+            seen.add(doctor.doctor_id)
+            valid.append(doctor)
+        return self._apply_bulk(valid, errors, atomic, self.add_doctor)
+
+    def bulk_schedule(self, appointments: Iterable[Appointment], atomic: bool = True) -> BulkResult:
+        seen: Set[str] = set()
+        booked: Set[Tuple[str, date, time]] = set()
+        valid, errors = [], []
+        for row, app in enumerate(appointments):
+            slot = (app.doctor_id, app.date, app.time)
+            # Cancelled and completed appointments keep their status and hold no slot
+            scheduled = app.status == AppointmentStatus.SCHEDULED
+            if app.appointment_id in seen or app.appointment_id in self.appointments:
+                message = f"Appointment with ID {app.appointment_id} already exists"
+            elif app.patient_id not in self.patients:
+                message = f"Patient with ID {app.patient_id} not found"
+            elif app.doctor_id not in self.doctors:
+                message = f"Doctor with ID {app.doctor_id} not found"
+            else:
+                # Rows the repository would reject must fail here, before an atomic batch writes anything
+                message = _storage_error(self._repository, app)
+                if message is None and scheduled and (slot in booked or self._repository.is_slot_booked(*slot)):
+                    message = "Doctor is not available at this time"
+            if message is not None:
+                errors.append(RowError(row, message))
+                continue
+            seen.add(app.appointment_id)
+            if scheduled:
+                booked.add(slot)
+            valid.append(app)
+        return self._apply_bulk(valid, errors, atomic, self._schedule_row)
+
+    def _schedule_row(self, app: Appointment):
+        if app.status == AppointmentStatus.SCHEDULED:
+            self.schedule_appointment(app.appointment_id, app.patient_id, app.doctor_id, app.date, app.time,
+                                      app.description)
+        else:
+            self._import_appointment(app.detached())
+
+    def _apply_bulk(self, rows: list, errors: List[RowError], atomic: bool, apply: Callable) -> BulkResult:
+        if errors and atomic:
+            raise BulkImportError(errors)
+        with self._repository.batch():
+            for row in rows:
+                apply(row)
+        return BulkResult(len(rows), errors)
+
+    def check_invariants(self):
+        if self._metrics is not None:
+            self._metrics.record_scanned("check_invariants", len(self.appointments))
+        self._repository.check_invariants()
+
+    def close(self):
+        self._repository.close()
+
+def _storage_error(repository: HospitalRepository, appointment: Appointment) -> Optional[str]:
+    try:
+        repository.validate_appointment(appointment)
+    except ValueError as e:
+        return str(e)
+    return None
+
+def _as_datetime(value: date) -> datetime:
+    return value if isinstance(value, datetime) else datetime.combine(value, time())
@@ -0,0 +1,182 @@
+import os
+import random
+import pytest
+from datetime import date, time
+from src.columnar import ColumnarRepository
+from src.models import Patient, Doctor, AppointmentStatus
+from src.events import EventKind
+from src.persistence import DurableHospitalSystem, LOG_FILE, read_log
+from src.repository import InMemoryRepository, SqliteRepository
+from src.system import HospitalSystem
+
+REPOSITORIES = {"memory": InMemoryRepository, "sqlite": SqliteRepository, "columnar": ColumnarRepository}
+SPECIALTIES = ["Cardiology", "Surgery"]
+
+def recompute(system, doctor_id=None, specialty=None, day=None):
+    counts = {status: 0 for status in AppointmentStatus}
+    for app in system.appointments.values():
+        if doctor_id is not None and app.doctor_id != doctor_id:
+            continue
+        if specialty is not None and system.get_doctor(app.doctor_id).specialty != specialty:
+            continue
+        if day is not None and app.date != day:
+            continue
+        counts[app.status] += 1
+    return counts
+
+def populate(system, seed=7, operations=400):
+    rng = random.Random(seed)
+    for i in range(5):
+        system.add_patient(Patient(f"p{i}", f"Patient {i}", 30, "F"))
+    for i in range(4):
+        system.add_doctor(Doctor(f"d{i}", f"Doctor {i}", SPECIALTIES[i % 2]))
+    booked = []
+    for n in range(operations):
+        choice = rng.random()
+        try:
+            if choice < 0.6 or not booked:
+                system.schedule_appointment(f"a{n}", f"p{rng.randrange(5)}", f"d{rng.randrange(4)}",
+                                            date(2025, 1, 1 + rng.randrange(3)), time(8 + rng.randrange(4), 0))
+                booked.append(f"a{n}")
+            elif choice < 0.8:
+                system.cancel_appointment(rng.choice(booked))
+            else:
+                system.get_appointment(rng.choice(booked)).complete()
+        except ValueError:
+            pass
+
+def assert_matches(system):
+    for doctor_id in ["d0", "d1", "d2", "d3", "d9"]:
+        for day in [None, date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)]:
+            assert system.get_appointment_counts(doctor_id=doctor_id, day=day) == recompute(system, doctor_id, day=day)
+    for specialty in SPECIALTIES:
+        for day in [None, date(2025, 1, 2)]:
+            assert system.get_appointment_counts(specialty=specialty, day=day) == recompute(system, specialty=specialty, day=day)
+    assert system.get_appointment_counts() == recompute(system)
+    assert system.get_appointment_counts(day=date(2025, 1, 3)) == recompute(system, day=date(2025, 1, 3))
+
+@pytest.mark.parametrize("kind", sorted(REPOSITORIES))
+def test_counters_match_recomputation(kind):
+    system = HospitalSystem(REPOSITORIES[kind]())
+    populate(system)
+    assert_matches(system)
+    assert sum(system.get_appointment_counts().values()) == len(system.appointments)
+    system.close()
+
+def test_snapshot_is_frozen():
+    system = HospitalSystem()
+    populate(system, operations=50)
+    snapshot = system.appointment_counts_snapshot()
+    before = snapshot.by_status("d0")
+    system.schedule_appointment("new", "p0", "d0", date(2025, 2, 1), time(8, 0))
+    assert snapshot.by_status("d0") == before
+    assert snapshot.count(day=date(2025, 2, 1)) == 0
+    assert system.appointment_counts_snapshot().count("d0", day=date(2025, 2, 1), status=AppointmentStatus.SCHEDULED) == 1
+    assert system.appointment_counts_snapshot().version == snapshot.version + 1
+
+def test_counts_require_single_grouping():
+    with pytest.raises(ValueError, match="Provide either a doctor ID or a specialty"):
+        HospitalSystem().get_appointment_counts(doctor_id="d1", specialty="Surgery")
+
+def test_rejected_status_change_is_not_counted():
+    system = HospitalSystem(SqliteRepository())
+    populate(system, operations=0)
+    system.schedule_appointment("a1", "p0", "d0", date(2025, 1, 1), time(8, 0))
+    stale = system.get_appointment("a1")
+    system.cancel_appointment("a1")
+    with pytest.raises(ValueError):
+        stale.complete()
+    assert system.get_appointment_counts("d0")[AppointmentStatus.CANCELLED] == 1
+    assert system.get_appointment_counts("d0")[AppointmentStatus.COMPLETED] == 0
+    system.close()
+
+def test_repeated_status_notification_is_applied_once(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        populate(system, operations=0)
+        system.schedule_appointment("a1", "p0", "d0", date(2025, 1, 1), time(8, 0))
+        subscription = system.enable_change_feed().subscribe()
+        system.get_patient_history("p0")
+        app = system.get_appointment("a1")
+        app.cancel()
+        system.repository.status_observer(app, AppointmentStatus.SCHEDULED)
+        app.cancel()
+
+        assert system.get_appointment_counts("d0")[AppointmentStatus.CANCELLED] == 1
+        assert system.get_appointment_counts("d0")[AppointmentStatus.SCHEDULED] == 0
+        assert [event.kind for event in subscription.poll()] == [EventKind.APPOINTMENT_CANCELLED]
+        assert system.history_cache_stats().invalidations == 1
+        assert_matches(system)
+    records = [record for _, record in read_log(os.path.join(str(tmp_path), LOG_FILE))]
+    assert [r["op"] for r in records].count("set_status") == 1
+
+def test_counters_rebuilt_on_reopen(tmp_path):
+    path = os.path.join(str(tmp_path), "hospital.db")
+    system = HospitalSystem(SqliteRepository(path))
+    populate(system)
+    expected = recompute(system, specialty="Surgery")
+    system.close()
+    reopened = HospitalSystem(SqliteRepository(path))
+    assert reopened.get_appointment_counts(specialty="Surgery") == expected
+    assert_matches(reopened)
+    reopened.close()
+
+def test_counters_follow_batch_commit_and_rollback():
+    system = HospitalSystem(SqliteRepository())
+    populate(system, operations=50)
+    before = system.appointment_counts_snapshot()
+    with pytest.raises(ValueError):
+        with system.repository.batch():
+            system.schedule_appointment("new", "p0", "d0", date(2025, 2, 1), time(8, 0))
+            system.cancel_appointment("new")
+            system.schedule_appointment("new", "p0", "d0", date(2025, 2, 1), time(8, 0))
+    assert system.appointment_counts_snapshot().version == before.version
+    assert_matches(system)
+
+    with system.repository.batch():
+        system.schedule_appointment("new", "p0", "d0", date(2025, 2, 1), time(8, 0))
+        system.cancel_appointment("new")
+    assert system.get_appointment_counts("d0", day=date(2025, 2, 1))[AppointmentStatus.CANCELLED] == 1
+    assert_matches(system)
+    system.close()
+
+def open_system(tmp_path, backend):
+    if backend == "sqlite":
+        return HospitalSystem(SqliteRepository(os.path.join(str(tmp_path), "hospital.db")))
+    return DurableHospitalSystem(str(tmp_path))
+
+@pytest.mark.parametrize("backend", ["sqlite", "log", "snapshot"])
+def test_removed_doctor_counts_match_after_restart(tmp_path, backend):
+    system = open_system(tmp_path, backend)
+    system.add_patient(Patient("p0", "Patient", 30, "F"))
+    system.add_doctor(Doctor("d0", "Doctor 0", "Cardiology"))
+    system.add_doctor(Doctor("d1", "Doctor 1", "Cardiology"))
+    system.schedule_appointment("a0", "p0", "d0", date(2025, 1, 1), time(8, 0))
+    system.schedule_appointment("a1", "p0", "d1", date(2025, 1, 1), time(8, 0))
+    system.complete_appointment("a0")
+    system.cancel_appointment("a1")
+    system.remove_doctor("d0")
+    # Back with another specialty, bringing the old appointment along
+    system.remove_doctor("d1")
+    system.add_doctor(Doctor("d1", "Doctor 1", "Surgery"))
+    if backend == "snapshot":
+        system.snapshot()
+    live = system.appointment_counts_snapshot()
+    system.close()
+
+    reopened = open_system(tmp_path, backend)
+    assert live.by_status(specialty="Cardiology")[AppointmentStatus.COMPLETED] == 0
+    assert live.by_status(specialty="Surgery")[AppointmentStatus.CANCELLED] == 1
+    for specialty in SPECIALTIES:
+        assert reopened.get_appointment_counts(specialty=specialty) == live.by_status(specialty=specialty)
+    for doctor_id in ["d0", "d1"]:
+        assert reopened.get_appointment_counts(doctor_id) == live.by_status(doctor_id)
+    reopened.close()
+
+def test_counters_recovered_from_log(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        populate(system, operations=100)
+        system.snapshot()
+        system.schedule_appointment("late", "p0", "d0", date(2025, 3, 1), time(8, 0))
+        system.complete_appointment("late")
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert_matches(recovered)
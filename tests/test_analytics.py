@@ -0,0 +1,77 @@
+import pytest
+from datetime import date, time
+from src import analytics
+from src.analytics import UNINSURED, build_columns
+from src.columnar import ColumnarRepository
+from src.models import Patient, Doctor
+from src.repository import InMemoryRepository
+from src.system import HospitalSystem
+
+BACKENDS = ["python"] + (["numpy"] if analytics.np is not None else [])
+
+@pytest.fixture(params=["memory", "columnar"])
+def system(request):
+    system = HospitalSystem(InMemoryRepository() if request.param == "memory" else ColumnarRepository())
+    system.add_patient(Patient("p1", "John", 34, "M", True, "HealthPlus"))
+    system.add_patient(Patient("p2", "Jane", 8, "F"))
+    system.add_patient(Patient("p3", "Ana", 39, "F", True, "HealthPlus"))
+    system.add_patient(Patient("p4", "Rui", 71, "M", True, "Vida"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.add_doctor(Doctor("d2", "Dr. Grey", "Surgery"))
+    system.add_doctor(Doctor("d3", "Dr. Who", "Surgery"))
+    day1, day2 = date(2025, 1, 1), date(2025, 1, 2)
+    system.schedule_appointment("a1", "p1", "d1", day1, time(8, 0))
+    system.schedule_appointment("a2", "p2", "d1", day1, time(9, 0))
+    system.schedule_appointment("a3", "p3", "d1", day2, time(8, 0))
+    system.schedule_appointment("a4", "p1", "d2", day1, time(8, 0))
+    system.schedule_appointment("a5", "p4", "d2", day2, time(8, 0))
+    system.schedule_appointment("a6", "p4", "d3", day2, time(9, 0))
+    system.complete_appointment("a1")
+    system.cancel_appointment("a2")
+    system.complete_appointment("a3")
+    system.cancel_appointment("a4")
+    system.cancel_appointment("a6")
+    # Appointments of a removed doctor drop out of the specialty rates only
+    system.remove_doctor("d3")
+    return system
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_appointments_per_doctor_per_day(system, backend):
+    assert analytics.appointments_per_doctor_per_day(build_columns(system), backend) == {
+        ("d1", date(2025, 1, 1)): 2, ("d1", date(2025, 1, 2)): 1,
+        ("d2", date(2025, 1, 1)): 1, ("d2", date(2025, 1, 2)): 1,
+        ("d3", date(2025, 1, 2)): 1,
+    }
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cancellation_rate_by_specialty(system, backend):
+    assert analytics.cancellation_rate_by_specialty(build_columns(system), backend) == {
+        "Diagnostic": pytest.approx(1 / 3), "Surgery": 0.5,
+    }
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_completion_rate_by_insurer(system, backend):
+    assert analytics.completion_rate_by_insurer(build_columns(system), backend) == {
+        "HealthPlus": pytest.approx(2 / 3), UNINSURED: 0.0, "Vida": 0.0,
+    }
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_age_band_distribution(system, backend):
+    columns = build_columns(system)
+    assert analytics.age_band_distribution(columns, backend=backend) == {"0-9": 1, "30-39": 2, "70-79": 1}
+    assert analytics.age_band_distribution(columns, 50, backend) == {"0-49": 3, "50-99": 1}
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_system(backend):
+    columns = build_columns(HospitalSystem())
+    assert analytics.appointments_per_doctor_per_day(columns, backend) == {}
+    assert analytics.cancellation_rate_by_specialty(columns, backend) == {}
+    assert analytics.completion_rate_by_insurer(columns, backend) == {}
+    assert analytics.age_band_distribution(columns, backend=backend) == {}
+
+def test_invalid_arguments(system):
+    columns = build_columns(system)
+    with pytest.raises(ValueError, match="Unknown backend"):
+        analytics.cancellation_rate_by_specialty(columns, "fortran")
+    with pytest.raises(ValueError, match="Band width must be positive"):
+        analytics.age_band_distribution(columns, 0)
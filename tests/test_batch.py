@@ -0,0 +1,113 @@
+import io
+import json
+from src.batch import run_batch
+from src.main import main
+from src.models import AppointmentStatus
+from src.system import HospitalSystem
+
+def commands(*items):
+    return io.StringIO("".join(json.dumps(item) + "\n" for item in items))
+
+def results(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_batch_runs_commands_and_reports_each():
+    system = HospitalSystem()
+    output = io.StringIO()
+    report = run_batch(system, commands(
+        {"op": "add_patient", "args": {"patient_id": "p1", "name": "John", "age": 30, "gender": "M"}},
+        {"op": "add_doctor", "args": {"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}},
+        {"op": "schedule_appointment", "id": "book",
+         "args": {"appointment_id": "a1", "patient_id": "p1", "doctor_id": "d1", "date": "2025-01-01", "time": "10:00"}},
+        {"op": "complete_appointment", "args": {"appointment_id": "a1"}},
+        {"op": "get_appointments_by_patient", "args": {"patient_id": "p1"}},
+    ), output)
+
+    assert (report.commands, report.failed) == (5, 0)
+    lines = results(output)
+    assert [line["line"] for line in lines] == [1, 2, 3, 4, 5]
+    assert lines[0] == {"ok": True, "result": None, "line": 1}
+    assert lines[2]["id"] == "book"
+    assert lines[2]["result"]["status"] == "Scheduled"
+    assert lines[3]["result"]["status"] == "Completed"
+    assert [a["appointment_id"] for a in lines[4]["result"]] == ["a1"]
+    assert system.get_appointment("a1").status == AppointmentStatus.COMPLETED
+
+def test_batch_schedules_series():
+    system = HospitalSystem()
+    output = io.StringIO()
+    series = {"id_prefix": "s", "patient_id": "p1", "doctor_id": "d1", "start_date": "2025-01-06", "time": "09:00"}
+    report = run_batch(system, commands(
+        {"op": "add_patient", "args": {"patient_id": "p1", "name": "John", "age": 30, "gender": "M"}},
+        {"op": "add_doctor", "args": {"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}},
+        {"op": "schedule_series", "args": dict(series, count=3)},
+        {"op": "schedule_series", "args": dict(series, id_prefix="t", interval_days=14, until="2025-02-03")},
+    ), output)
+
+    assert (report.commands, report.failed) == (4, 1)
+    lines = results(output)
+    assert [a["date"] for a in lines[2]["result"]] == ["2025-01-06", "2025-01-13", "2025-01-20"]
+    assert lines[3]["error"] == "Doctor is not available on 2 date(s): 2025-01-06, 2025-01-20"
+
+def test_batch_reports_errors_and_continues():
+    system = HospitalSystem()
+    output = io.StringIO()
+    stream = io.StringIO(
+        "not json\n"
+        "\n"
+        '{"op": "fly"}\n'
+        '{"op": "remove_patient", "args": {}}\n'
+        '{"op": "remove_patient", "args": {"patient_id": "p9"}}\n'
+        '{"op": "add_patient", "args": {"patient_id": "p1"}}\n'
+        '{"op": "add_doctor", "args": {"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}}\n'
+    )
+    report = run_batch(system, stream, output, chunk_size=2)
+
+    assert (report.commands, report.failed) == (6, 5)
+    lines = results(output)
+    assert [line["line"] for line in lines] == [1, 3, 4, 5, 6, 7]
+    assert lines[0]["error"].startswith("Invalid JSON")
+    assert lines[1]["error"] == "Unknown operation fly"
+    assert lines[2]["error"] == "Missing argument patient_id"
+    assert lines[3]["error"] == "Patient with ID p9 not found"
+    assert "missing 3 required positional arguments" in lines[4]["error"]
+    assert lines[5]["ok"] is True
+    assert "d1" in system.doctors
+
+def test_batch_checks_argument_types_before_running():
+    system = HospitalSystem()
+    output = io.StringIO()
+    booking = {"appointment_id": "a1", "patient_id": "p1", "doctor_id": "d1", "date": "2025-01-01", "time": "10:00"}
+    series = {"id_prefix": "s", "patient_id": "p1", "doctor_id": "d1", "start_date": "2025-01-06", "time": "09:00"}
+    report = run_batch(system, commands(
+        {"op": "add_patient", "args": {"patient_id": "p1", "name": "John", "age": "30", "gender": "M"}},
+        {"op": "add_doctor", "args": {"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}},
+        {"op": "schedule_appointment", "args": dict(booking, date=20250101)},
+        {"op": "schedule_series", "args": dict(series, count=[3])},
+        {"op": "cancel_appointment", "args": {"appointment_id": 1}},
+        {"op": "find_free_slots", "args": {"start_date": "2025-01-01", "minutes": "half an hour"}},
+        {"op": "schedule_series", "args": dict(series, count="2")},
+    ), output)
+
+    assert (report.commands, report.failed) == (7, 4)
+    lines = results(output)
+    assert lines[2]["error"] == "Field date: Invalid date value 20250101"
+    assert lines[3]["error"] == "Argument count: Invalid integer value [3]"
+    assert lines[4]["error"] == "Argument appointment_id: Invalid text value 1"
+    assert lines[5]["error"].startswith("Argument minutes: invalid literal")
+    assert [a["appointment_id"] for a in lines[6]["result"]] == ["s-1", "s-2"]
+    assert system.get_patient("p1").age == 30
+    assert sorted(system.appointments) == ["s-1", "s-2"]
+    system.check_invariants()
+
+def test_batch_command_line(tmp_path, capsys):
+    path = tmp_path / "commands.jsonl"
+    path.write_text('{"op": "add_doctor", "args": {"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}}\n'
+                    '{"op": "get_doctors_by_specialty", "args": {"specialty": "Diagnostic"}}\n'
+                    '{"op": "get_doctor", "args": {"doctor_id": "d2"}}\n')
+    assert main(["batch", str(path)]) == 0
+    out, err = capsys.readouterr()
+    lines = [json.loads(line) for line in out.splitlines()]
+    assert lines[1]["result"] == [{"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}]
+    assert lines[2] == {"ok": True, "result": None, "line": 3}
+    assert err == "Ran 3 commands, 0 failed.\n"
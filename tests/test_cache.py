@@ -0,0 +1,47 @@
+import pytest
+from src.cache import LRUCache
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    loads = []
+
+    def loader(key):
+        def load():
+            loads.append(key)
+            return key.upper()
+        return load
+
+    assert cache.get("a", loader("a")) == "A"
+    assert cache.get("b", loader("b")) == "B"
+    assert cache.get("a", loader("a")) == "A"
+    cache.get("c", loader("c"))
+    # b was used least recently
+    assert "b" not in cache and "a" in cache
+    assert cache.get("b", loader("b")) == "B"
+    assert loads == ["a", "b", "c", "b"]
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size, stats.capacity) == (1, 4, 2, 2, 2)
+    assert stats.hit_ratio == 0.2
+    with pytest.raises(ValueError, match="Capacity must be positive"):
+        LRUCache(0)
+
+def test_invalidation_drops_entries_and_loads_that_overlap_it():
+    cache = LRUCache(4)
+    cache.get("a", lambda: 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert "a" not in cache
+    assert cache.stats().invalidations == 1
+
+    def stale_load():
+        # Another thread changes the data while this load is reading it
+        cache.invalidate("a")
+        return 2
+
+    assert cache.get("a", stale_load) == 2
+    assert "a" not in cache
+    assert cache.get("a", lambda: 3) == 3
+    assert cache.get("a", lambda: 4) == 3
+    cache.clear()
+    assert len(cache) == 0
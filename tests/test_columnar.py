@@ -0,0 +1,63 @@
+import pytest
+from datetime import date, time
+from src.columnar import ColumnarRepository
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, BulkImportError
+from src.system import HospitalSystem
+
+@pytest.fixture
+def system():
+    system = HospitalSystem(ColumnarRepository())
+    system.add_patient(Patient("p1", "John", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    return system
+
+def test_columnar_views_are_built_on_read(system):
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 30), "Checkup")
+    first = system.get_appointment("a1")
+    second = system.get_appointment("a1")
+    assert first == second
+    assert first is not second
+    assert (first.date, first.time, first.status, first.description) == (
+        date(2025, 1, 1), time(10, 30), AppointmentStatus.SCHEDULED, "Checkup")
+
+def test_columnar_stale_view_cannot_override_status(system):
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    first = system.get_appointment("a1")
+    second = system.get_appointment("a1")
+    first.cancel()
+    with pytest.raises(ValueError, match="is no longer Scheduled"):
+        second.complete()
+    assert second.status == AppointmentStatus.SCHEDULED
+    assert system.get_appointment("a1").status == AppointmentStatus.CANCELLED
+    assert not system.repository.is_slot_booked("d1", date(2025, 1, 1), time(10, 0))
+    system.check_invariants()
+
+def test_columnar_store_keeps_minutes_only(system):
+    with pytest.raises(ValueError, match="to the minute"):
+        system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0, 30))
+    assert "a1" not in system.appointments
+    system.check_invariants()
+
+def test_columnar_bulk_schedule_rejects_seconds_before_writing(system):
+    rows = [Appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0)),
+            Appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0, 30))]
+    with pytest.raises(BulkImportError) as info:
+        system.bulk_schedule(rows)
+    assert [(error.row, error.message) for error in info.value.errors] == [
+        (1, "The compact store keeps appointment times to the minute")]
+    assert "a1" not in system.appointments
+    assert system.bulk_schedule(rows, atomic=False).errors[0].row == 1
+    assert system.get_appointment("a1").status == AppointmentStatus.SCHEDULED
+    system.check_invariants()
+
+def test_columnar_booked_times_round_start_up(system):
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 1))
+    assert list(system.repository.booked_times("d1", date(2025, 1, 1), time(10, 0, 1))) == [(date(2025, 1, 1), time(10, 1))]
+    assert list(system.repository.booked_times("d9", date(2025, 1, 1), time(0))) == []
+
+def test_columnar_check_invariants_detects_stale_index(system):
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.repository._status_col[0] = 1
+    with pytest.raises(AssertionError, match="Booked slot index"):
+        system.check_invariants()
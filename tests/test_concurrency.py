@@ -0,0 +1,163 @@
+import sys
+import threading
+import pytest
+from datetime import date, time, timedelta
+from src.concurrency import ConcurrentHospitalSystem, StripedLock
+from src.models import Patient, Doctor, AppointmentStatus, Recurrence, SeriesConflictError
+from src.repository import SqliteRepository
+
+THREADS = 8
+
+@pytest.fixture
+def system():
+    system = ConcurrentHospitalSystem(stripes=8)
+    for i in range(THREADS):
+        system.add_patient(Patient(f"p{i}", f"Patient {i}", 30, "F"))
+    for i in range(4):
+        system.add_doctor(Doctor(f"d{i}", f"Doctor {i}", "General"))
+    return system
+
+@pytest.fixture(autouse=True)
+def frequent_switches():
+    # Switch threads far more often than the default to give races a chance to show
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def run_threads(target):
+    errors = []
+
+    def guarded(index):
+        try:
+            target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=guarded, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+def slots():
+    return [(f"d{d}", date(2025, 1, 1 + day), time(8 + hour, 0)) for d in range(4) for day in range(5) for hour in range(8)]
+
+def test_concurrent_bookings_never_double_book(system):
+    won = [[] for _ in range(THREADS)]
+
+    def book(index):
+        # Every thread races for every slot
+        for n, (doctor_id, app_date, app_time) in enumerate(slots()):
+            try:
+                system.schedule_appointment(f"a{index}-{n}", f"p{index}", doctor_id, app_date, app_time)
+                won[index].append(n)
+            except ValueError as e:
+                assert str(e) == "Doctor is not available at this time"
+
+    run_threads(book)
+    assert sorted(n for wins in won for n in wins) == list(range(len(slots())))
+    assert len(system.appointments) == len(slots())
+    assert sum(system.count_active_appointments_by_patient(f"p{i}") for i in range(THREADS)) == len(slots())
+    system.check_invariants()
+
+def test_concurrent_series_are_all_or_nothing(system):
+    won = []
+
+    def book(index):
+        # Even threads race for the first 20 weeks, odd threads for the next 20
+        try:
+            won.append(system.schedule_series(f"s{index}", f"p{index}", "d0", date(2025, 1, 6) + timedelta(weeks=20 * (index % 2)),
+                                              time(9, 0), Recurrence.weekly(count=20)))
+        except SeriesConflictError as e:
+            assert len(e.conflicts) == 20
+
+    run_threads(book)
+    assert len(won) == 2
+    assert sorted(app.date for series in won for app in series) == [date(2025, 1, 6) + timedelta(weeks=n) for n in range(40)]
+    assert len(system.appointments) == 40
+    system.check_invariants()
+
+def test_concurrent_duplicate_ids_rejected(system):
+    def book(index):
+        for n in range(50):
+            try:
+                system.schedule_appointment(f"a{n}", f"p{index}", f"d{index % 4}", date(2025, 2, 1 + index), time(8, n))
+            except ValueError as e:
+                assert str(e) == f"Appointment with ID a{n} already exists"
+
+    run_threads(book)
+    assert len(system.appointments) == 50
+    system.check_invariants()
+
+def test_concurrent_status_changes_keep_counters_consistent(system):
+    for n, (doctor_id, app_date, app_time) in enumerate(slots()):
+        system.schedule_appointment(f"a{n}", f"p{n % THREADS}", doctor_id, app_date, app_time)
+
+    def change(index):
+        for n in range(len(slots())):
+            try:
+                if index % 2:
+                    system.cancel_appointment(f"a{n}")
+                else:
+                    system.get_appointment(f"a{n}").complete()
+            except ValueError:
+                pass
+
+    run_threads(change)
+    assert all(app.status != AppointmentStatus.SCHEDULED for app in system.appointments.values())
+    assert all(system.count_active_appointments_by_doctor(f"d{d}") == 0 for d in range(4))
+    system.check_invariants()
+
+def test_concurrent_add_and_remove_patients(system):
+    def churn(index):
+        for n in range(100):
+            system.add_patient(Patient(f"x{index}-{n}", "Temp", 40, "M"))
+            system.schedule_appointment(f"a{index}-{n}", f"x{index}-{n}", f"d{index % 4}", date(2025, 3, 1 + n % 28),
+                                        time(index, n // 28))
+            system.cancel_appointment(f"a{index}-{n}")
+            system.remove_patient(f"x{index}-{n}")
+
+    run_threads(churn)
+    assert len(system.patients) == THREADS
+    system.check_invariants()
+
+def test_striped_lock_is_reentrant_and_orders_stripes():
+    lock = StripedLock(4)
+    with lock.hold("a", "b", "c"):
+        with lock.hold("c", "a"):
+            pass
+    with pytest.raises(ValueError, match="Stripe count must be positive"):
+        StripedLock(0)
+
+def test_sqlite_repository_rejected():
+    repository = SqliteRepository()
+    with pytest.raises(ValueError, match="SqliteRepository cannot be shared between threads"):
+        ConcurrentHospitalSystem(repository)
+    repository.close()
+
+def test_range_iterators_stay_ordered_during_concurrent_bookings(system):
+    system.repository.READ_CHUNK = 4
+    days = [date(2025, 1, 1) + timedelta(days=n) for n in range(60)]
+    for n, day in enumerate(days):
+        system.schedule_appointment(f"early{n}", "p0", "d0", day, time(8, 0))
+    early = [f"early{n}" for n in range(len(days))]
+    start, end = date(2025, 1, 1), date(2025, 4, 1)
+
+    def work(index):
+        if index % 2:
+            # Writers book later slots on the same days, landing between the entries being read
+            for n, day in enumerate(days):
+                system.schedule_appointment(f"late{index}-{n}", f"p{index}", "d0", day, time(8 + index, 0))
+            return
+        for _ in range(5):
+            apps = list(system.get_appointments_between(start, end, "d0"))
+            moments = [(a.date, a.time) for a in apps]
+            assert moments == sorted(moments) and len(set(moments)) == len(moments)
+            assert [a.appointment_id for a in apps if a.appointment_id.startswith("early")] == early
+            booked = list(system.repository.booked_times("d0", start, time(0, 0)))
+            assert booked == sorted(set(booked)) and set(booked) >= {(day, time(8, 0)) for day in days}
+
+    run_threads(work)
+    system.check_invariants()
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import pytest
+from datetime import date, time
+from src.columnar import ColumnarRepository
+from src.concurrency import ConcurrentHospitalSystem
+from src.events import ChangeFeed, EventKind
+from src.models import Patient, Doctor, Anamnesis, ExamRequest, MedicalCertificate, AppointmentStatus, Recurrence
+from src.repository import InMemoryRepository, SqliteRepository
+from src.system import HospitalSystem
+
+REPOSITORIES = {"memory": InMemoryRepository, "sqlite": SqliteRepository, "columnar": ColumnarRepository}
+
+@pytest.fixture(params=sorted(REPOSITORIES))
+def system(request):
+    system = HospitalSystem(REPOSITORIES[request.param]())
+    system.add_patient(Patient("p0", "Earlier", 50, "M"))
+    yield system
+    system.close()
+
+def test_every_change_is_published_in_order(system):
+    subscription = system.enable_change_feed().subscribe()
+    system.add_patient(Patient("p1", "John", 30, "M", True, "HealthPlus"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 2), time(10, 0))
+    system.add_anamnesis(Anamnesis("a1", "Cough", "Flu"))
+    system.add_exam_request(ExamRequest("r1", "a1", "Blood Test"))
+    system.add_medical_certificate(MedicalCertificate("c1", "a1", 3))
+    system.complete_appointment("a1")
+    system.get_appointment("a2").cancel()
+    with pytest.raises(ValueError):
+        system.cancel_appointment("a1")
+    system.schedule_series("s", "p1", "d1", date(2025, 2, 1), time(9, 0), Recurrence.weekly(count=2))
+    system.remove_patient("p0")
+
+    events = subscription.poll()
+    assert [event.seq for event in events] == list(range(1, 13))
+    assert [event.kind for event in events] == [
+        EventKind.PATIENT_ADDED, EventKind.DOCTOR_ADDED, EventKind.APPOINTMENT_SCHEDULED,
+        EventKind.APPOINTMENT_SCHEDULED, EventKind.ANAMNESIS_ADDED, EventKind.EXAM_REQUESTED,
+        EventKind.CERTIFICATE_ISSUED, EventKind.APPOINTMENT_COMPLETED, EventKind.APPOINTMENT_CANCELLED,
+        EventKind.APPOINTMENT_SCHEDULED, EventKind.APPOINTMENT_SCHEDULED, EventKind.PATIENT_REMOVED,
+    ]
+    assert events[0].record.insurance_name == "HealthPlus"
+    # Appointment events carry the status the appointment had at the time
+    assert events[2].record.status == AppointmentStatus.SCHEDULED
+    assert events[7].record.status == AppointmentStatus.COMPLETED
+    assert events[9].record.appointment_id == "s-1"
+    assert events[-1].record == "p0"
+    assert subscription.poll() == []
+    assert subscription.dropped == 0
+
+def test_events_wait_for_the_batch_to_commit():
+    system = HospitalSystem(SqliteRepository())
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    subscription = system.enable_change_feed().subscribe()
+    with pytest.raises(RuntimeError):
+        with system.repository.batch():
+            system.add_patient(Patient("p1", "John", 30, "M"))
+            raise RuntimeError("rolled back")
+    assert "p1" not in system.patients
+    assert subscription.poll() == []
+
+    with system.repository.batch():
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+        assert subscription.poll() == []
+    assert [event.kind for event in subscription.poll()] == [EventKind.PATIENT_ADDED, EventKind.APPOINTMENT_SCHEDULED]
+    system.close()
+
+def test_change_feed_can_be_disabled():
+    system = HospitalSystem()
+    feed = system.enable_change_feed(ChangeFeed(capacity=8))
+    with pytest.raises(ValueError, match="already enabled"):
+        system.enable_change_feed()
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.disable_change_feed()
+    assert system.change_feed is None
+    system.add_doctor(Doctor("d2", "Dr. Grey", "Surgery"))
+    assert [event.record.doctor_id for event in feed.read(0)] == ["d1"]
+
+def test_ring_buffer_drops_the_oldest_events_for_slow_subscribers():
+    feed = ChangeFeed(capacity=4)
+    slow = feed.subscribe(after=0)
+    assert feed.last_seq == 0
+    for i in range(10):
+        assert feed.publish(EventKind.PATIENT_REMOVED, f"p{i}") == i + 1
+    assert (feed.first_seq, feed.last_seq) == (7, 10)
+
+    assert [event.seq for event in slow.poll(max_events=3)] == [7, 8, 9]
+    assert slow.dropped == 6
+    assert [event.seq for event in slow.poll()] == [10]
+    assert [event.seq for event in feed.read(8)] == [9, 10]
+    # A consumer resuming from the last seq it handled
+    assert [event.record for event in feed.subscribe(after=8).poll()] == ["p8", "p9"]
+    assert feed.subscribe().poll() == []
+    with pytest.raises(ValueError, match="Capacity must be positive"):
+        ChangeFeed(capacity=0)
+    with pytest.raises(ValueError, match="Limit must be positive"):
+        feed.read(0, limit=0)
+
+def test_blocking_poll_wakes_on_publish():
+    feed = ChangeFeed()
+    subscription = feed.subscribe()
+    assert subscription.poll(timeout=0.01) == []
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(subscription.poll(timeout=5)))
+    consumer.start()
+    feed.publish(EventKind.DOCTOR_REMOVED, "d1")
+    consumer.join()
+    assert [event.record for event in received] == ["d1"]
+
+def test_async_subscriber_receives_batches_from_other_threads():
+    system = ConcurrentHospitalSystem()
+    feed = system.enable_change_feed()
+    system.add_patient(Patient("p1", "John", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+
+    async def consume():
+        subscription = feed.subscribe_async(after=0)
+        assert len(await subscription.poll()) == 2
+        assert await subscription.poll(timeout=0.01) == []
+        booker = threading.Thread(target=lambda: [
+            system.schedule_appointment(f"a{i}", "p1", "d1", date(2025, 1, 1), time(8 + i, 0)) for i in range(5)])
+        booker.start()
+        records = []
+        async for batch in subscription:
+            records += [event.record.appointment_id for event in batch]
+            if len(records) == 5:
+                break
+        booker.join()
+        return records
+
+    assert asyncio.run(consume()) == [f"a{i}" for i in range(5)]
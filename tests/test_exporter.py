@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date, time
+from src.exporter import export, iter_columnar_batches, iter_records, columns
+from src.models import Patient, Doctor, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+from src.system import HospitalSystem
+
+@pytest.fixture
+def system():
+    system = HospitalSystem()
+    system.add_patient(Patient("p1", "John", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.add_doctor(Doctor("d2", "Dr. Grey", "Surgery"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0), "Checkup")
+    system.schedule_appointment("a2", "p1", "d2", date(2025, 1, 5), time(10, 0))
+    system.schedule_appointment("a3", "p1", "d1", date(2025, 2, 1), time(9, 30))
+    system.cancel_appointment("a2")
+    system.add_anamnesis(Anamnesis("a1", "Dor no peito", "Angina"))
+    system.add_exam_request(ExamRequest("r1", "a1", "ECG"))
+    system.add_exam_request(ExamRequest("r2", "a3", "X-Ray"))
+    system.add_medical_certificate(MedicalCertificate("c1", "a3", 2))
+    return system
+
+def test_export_csv_with_date_range(system):
+    output = io.StringIO()
+    count = export(system, "appointments", output, "csv", start=date(2025, 1, 2), end=date(2025, 1, 31))
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert count == 1
+    assert rows == [{"appointment_id": "a2", "patient_id": "p1", "doctor_id": "d2", "date": "2025-01-05",
+                     "time": "10:00:00", "status": "Cancelled", "description": ""}]
+
+def test_export_jsonl_by_doctor_and_status(system):
+    output = io.StringIO()
+    export(system, "appointments", output, "jsonl", doctor_id="d1", status=AppointmentStatus.SCHEDULED)
+    ids = [json.loads(line)["appointment_id"] for line in output.getvalue().splitlines()]
+    assert ids == ["a1", "a3"]
+
+def test_export_clinical_records_filtered_by_appointment(system):
+    output = io.StringIO()
+    export(system, "exam_requests", output, "jsonl", start=date(2025, 2, 1))
+    assert [json.loads(line)["request_id"] for line in output.getvalue().splitlines()] == ["r2"]
+    assert [a.appointment_id for a in iter_records(system, "anamneses", doctor_id="d1")] == ["a1"]
+    assert [c.certificate_id for c in iter_records(system, "medical_certificates")] == ["c1"]
+
+def test_export_writes_in_chunks(system):
+    class CountingOutput(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            CountingOutput.writes += 1
+            return super().write(text)
+
+    output = CountingOutput()
+    assert export(system, "appointments", output, "jsonl", chunk_size=2) == 3
+    assert CountingOutput.writes == 2
+    assert len(output.getvalue().splitlines()) == 3
+
+def test_export_empty_csv_has_header(system):
+    output = io.StringIO()
+    assert export(system, "appointments", output, "csv", doctor_id="nobody") == 0
+    assert output.getvalue().strip() == ",".join(columns("appointments"))
+
+def test_columnar_batches(system):
+    batches = list(iter_columnar_batches(iter_records(system, "appointments"), columns("appointments"), batch_size=2))
+    assert [len(b["appointment_id"]) for b in batches] == [2, 1]
+    assert batches[0]["status"] == ["Scheduled", "Cancelled"]
+
+def test_export_unknown_kind(system):
+    with pytest.raises(ValueError, match="Unknown record kind"):
+        export(system, "nurses", io.StringIO())
+
+def test_export_date_range_reads_only_the_window(system, monkeypatch):
+    system.remove_doctor("d2")
+    seen = []
+    between = system.repository.appointments_between
+
+    def spy(start, end, doctor_id=None):
+        for app in between(start, end, doctor_id):
+            seen.append(app.appointment_id)
+            yield app
+
+    monkeypatch.setattr(system.repository, "appointments_between", spy)
+    assert [a.appointment_id for a in iter_records(system, "appointments", end=date(2025, 1, 5))] == ["a1", "a2"]
+    assert [a.appointment_id for a in iter_records(system, "appointments", start=date(2025, 1, 5), doctor_id="d2")] == ["a2"]
+    assert [a.appointment_id for a in iter_records(system, "appointments", start=date(2025, 2, 2))] == []
+    assert seen == ["a1", "a2", "a2"]
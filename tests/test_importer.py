@@ -0,0 +1,88 @@
+import io
+import pytest
+from datetime import date, time
+from src.exporter import export
+from src.importer import detect_format, import_file, import_stream
+from src.models import Patient, Doctor, AppointmentStatus
+from src.system import HospitalSystem
+
+PATIENTS_CSV = """patient_id,name,age,gender,has_insurance,insurance_name
+p1,John,30,M,yes,HealthPlus
+p2,Jane,abc,F,no,
+p3,Ann,40,F,,
+p1,John,30,M,no,
+"""
+
+APPOINTMENTS_JSONL = """{"appointment_id": "a1", "patient_id": "p1", "doctor_id": "d1", "date": "2025-01-01", "time": "10:00"}
+
+{"appointment_id": "a2", "patient_id": "p1", "doctor_id": "d1", "date": "2025-01-01", "time": "10:00"}
+{"appointment_id": "a3", "patient_id": "p1", "doctor_id": "d1", "date": "2025-01-01", "time": "11:00", "description": "Return"}
+"""
+
+def test_import_csv_reports_rows_and_applies_valid_ones():
+    system = HospitalSystem()
+    report = import_stream(system, "patients", io.StringIO(PATIENTS_CSV), "csv", batch_size=2)
+    assert report.rows == 4
+    assert report.applied == 2
+    assert [err.row for err in report.errors] == [2, 4]
+    assert "already exists" in report.errors[1].message
+    assert system.get_patient("p1") == Patient("p1", "John", 30, "M", True, "HealthPlus")
+    assert system.get_patient("p3").has_insurance is False
+
+def test_import_atomic_batches():
+    system = HospitalSystem()
+    report = import_stream(system, "patients", io.StringIO(PATIENTS_CSV), "csv", batch_size=2, atomic=True)
+    # The first batch is rejected because of row 2, so row 4 is no longer a duplicate
+    assert report.applied == 2
+    assert [err.row for err in report.errors] == [2]
+    assert sorted(system.patients) == ["p1", "p3"]
+    assert system.get_patient("p1").has_insurance is False
+
+def test_import_jsonl_appointments():
+    system = HospitalSystem()
+    system.add_patient(Patient("p1", "John", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    report = import_stream(system, "appointments", io.StringIO(APPOINTMENTS_JSONL), "jsonl")
+    assert report.applied == 2
+    assert [(err.row, err.message) for err in report.errors] == [(2, "Doctor is not available at this time")]
+    assert system.get_appointment("a3").description == "Return"
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export_then_import_keeps_appointment_status(fmt):
+    source = HospitalSystem()
+    source.add_patient(Patient("p1", "John", 30, "M"))
+    source.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    source.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    source.cancel_appointment("a1")
+    # Takes the slot a1 freed
+    source.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    source.schedule_appointment("a3", "p1", "d1", date(2025, 1, 1), time(11, 0))
+    source.complete_appointment("a3")
+
+    target = HospitalSystem()
+    target.add_patient(Patient("p1", "John", 30, "M"))
+    target.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    output = io.StringIO()
+    export(source, "appointments", output, fmt)
+    report = import_stream(target, "appointments", io.StringIO(output.getvalue()), fmt, atomic=True)
+    assert (report.applied, report.errors) == (3, [])
+    assert {app_id: app.status for app_id, app in target.appointments.items()} == {
+        "a1": AppointmentStatus.CANCELLED, "a2": AppointmentStatus.SCHEDULED, "a3": AppointmentStatus.COMPLETED}
+    assert target.count_active_appointments_by_doctor("d1") == 1
+    assert target.get_appointment_counts("d1") == source.get_appointment_counts("d1")
+    target.check_invariants()
+
+def test_import_file_detects_format(tmp_path):
+    path = tmp_path / "doctors.jsonl"
+    path.write_text('{"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}\n')
+    system = HospitalSystem()
+    assert import_file(system, "doctors", str(path)).applied == 1
+    assert detect_format("x.CSV") == "csv"
+    with pytest.raises(ValueError, match="Cannot tell the format"):
+        detect_format("x.xlsx")
+    with pytest.raises(ValueError, match="--format is required"):
+        import_file(system, "doctors", "-")
+
+def test_import_unknown_kind():
+    with pytest.raises(ValueError, match="Unknown record kind"):
+        import_stream(HospitalSystem(), "nurses", io.StringIO(""), "csv")
@@ -0,0 +1,114 @@
+import json
+import pstats
+import pytest
+from datetime import date, time
+from src.concurrency import ConcurrentHospitalSystem
+from src.instrumentation import Histogram, Instrumentation, bucket_index, bucket_upper_bound
+from src.main import main
+from src.models import Patient, Doctor
+from src.system import HospitalSystem
+
+def test_buckets_cover_every_value_within_a_few_percent():
+    previous = -1
+    for value in list(range(2000)) + [10 ** 6, 10 ** 9 + 7, 2 ** 40]:
+        index = bucket_index(value)
+        upper = bucket_upper_bound(index)
+        assert value <= upper <= value * 1.07 + 1
+        if value < 2000:
+            # Indexes are contiguous and each bucket ends just before the next begins
+            assert index in (previous, previous + 1)
+            if index == previous + 1 and index > 0:
+                assert bucket_upper_bound(index - 1) == value - 1
+            previous = index
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) == 0
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert (histogram.count, histogram.total, histogram.max) == (1000, 500500, 1000)
+    assert 500 <= histogram.percentile(0.5) <= 530
+    assert 990 <= histogram.percentile(0.99) <= 1000
+    assert histogram.percentile(1) == 1000
+    assert sum(count for _, count in histogram.buckets()) == 1000
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        histogram.percentile(1.5)
+
+@pytest.fixture
+def system():
+    system = HospitalSystem()
+    system.add_patient(Patient("p1", "John", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dr. Smith", "Cardiology"))
+    system.add_doctor(Doctor("d2", "Dr. Jones", "Surgery"))
+    return system
+
+def test_instrumentation_records_calls_errors_and_scans(system):
+    metrics = system.enable_instrumentation()
+    assert system.instrumentation is metrics
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(9, 0))
+    with pytest.raises(ValueError):
+        system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.get_doctors_by_specialty("Surgery")
+    system.get_appointments_by_doctor("d1")
+    assert len(list(system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 2)))) == 1
+    # Nested calls are recorded under their own names
+    system.bulk_add_patients([Patient("p2", "Ann", 40, "F"), Patient("p3", "Bob", 50, "M")])
+
+    stats = metrics.to_dict()
+    assert stats["schedule_appointment"]["calls"] == 2
+    assert stats["schedule_appointment"]["errors"] == 1
+    assert stats["schedule_appointment"]["latency_ns"]["count"] == 2
+    assert stats["get_doctors_by_specialty"]["scanned"]["sum"] == 2
+    assert stats["get_appointments_by_doctor"]["scanned"]["sum"] == 1
+    assert stats["get_appointments_between"]["scanned"]["sum"] == 1
+    assert stats["add_patient"]["calls"] == 2
+    assert stats["bulk_add_patients"]["calls"] == 1
+    assert "enable_instrumentation" not in stats
+
+def test_instrumentation_can_be_disabled(system):
+    system.enable_instrumentation()
+    with pytest.raises(ValueError, match="already enabled"):
+        system.enable_instrumentation()
+    system.disable_instrumentation()
+    assert system.instrumentation is None
+    assert "add_patient" not in vars(system)
+    system.get_doctors_by_specialty("Surgery")
+    metrics = system.enable_instrumentation(Instrumentation())
+    system.get_doctor("d1")
+    assert list(metrics.to_dict()) == ["get_doctor"]
+
+def test_instrumentation_of_subclass_overrides():
+    system = ConcurrentHospitalSystem()
+    metrics = system.enable_instrumentation()
+    system.add_doctor(Doctor("d1", "Dr. Smith", "Cardiology"))
+    assert metrics.to_dict()["add_doctor"]["calls"] == 1
+    assert "d1" in system.doctors
+
+def test_exports(system):
+    metrics = system.enable_instrumentation()
+    system.get_patient("p1")
+    system.get_doctors_by_specialty("Surgery")
+    assert json.loads(metrics.to_json())["get_patient"]["calls"] == 1
+
+    text = metrics.to_prometheus()
+    assert "# TYPE hospital_method_calls_total counter" in text
+    assert 'hospital_method_calls_total{method="get_patient"} 1' in text
+    assert 'hospital_method_duration_seconds_bucket{method="get_patient",le="+Inf"} 1' in text
+    assert 'hospital_method_records_scanned_sum{method="get_doctors_by_specialty"} 2' in text
+    assert 'hospital_method_records_scanned_count{method="get_patient"}' not in text
+    metrics.reset()
+    assert metrics.to_dict() == {}
+
+def test_command_line_profile_and_metrics(tmp_path, capsys):
+    commands = tmp_path / "commands.jsonl"
+    commands.write_text('{"op": "add_doctor", "args": {"doctor_id": "d1", "name": "Dr. House", "specialty": "X"}}\n'
+                        '{"op": "get_doctor", "args": {"doctor_id": "d1"}}\n')
+    profile, metrics = tmp_path / "session.prof", tmp_path / "metrics.json"
+    assert main(["--profile", str(profile), "--metrics", str(metrics), "batch", str(commands)]) == 0
+    assert "Profile written" in capsys.readouterr().err
+    assert any(name == "add_doctor" for _, _, name in pstats.Stats(str(profile)).stats)
+    assert json.loads(metrics.read_text())["get_doctor"]["calls"] == 1
+
+    prometheus = tmp_path / "metrics.prom"
+    assert main(["--metrics", str(prometheus), "batch", str(commands)]) == 0
+    assert 'hospital_method_calls_total{method="add_doctor"} 1' in prometheus.read_text()
@@ -1,6 +1,7 @@
 import pytest
+import pickle
 from datetime import date, time
-from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate, Recurrence, SeriesConflictError
 
 # Patient Tests
 def test_patient_creation_success():
@@ -77,6 +78,16 @@ def test_appointment_complete_fail_if_cancelled():
     with pytest.raises(ValueError, match="Cannot complete a cancelled appointment"):
         app.complete()
 
+def test_appointment_detached_copy_has_no_observer():
+    notified = []
+    app = Appointment("1", "p1", "d1", date(2025, 1, 1), time(10, 0), description="Checkup")
+    app._observer = lambda appointment, previous: notified.append(appointment)
+    copy = app.detached()
+    assert copy == app and copy is not app
+    copy.cancel()
+    assert app.status == AppointmentStatus.SCHEDULED
+    assert notified == []
+
 # Anamnesis Tests
 def test_anamnesis_creation_success():
     a = Anamnesis("a1", "Headache", "Migraine")
@@ -125,3 +136,26 @@ def test_medical_certificate_creation_fail_empty_appointment_id():
 def test_medical_certificate_creation_fail_empty_id():
     with pytest.raises(ValueError, match="Certificate ID cannot be empty"):
         MedicalCertificate("", "a1", 3)
+
+# Recurrence Tests
+def test_recurrence_dates():
+    assert Recurrence.weekly(count=3).dates(date(2025, 1, 30)) == [date(2025, 1, 30), date(2025, 2, 6), date(2025, 2, 13)]
+    assert Recurrence(3, until=date(2025, 1, 7)).dates(date(2025, 1, 1)) == [date(2025, 1, 1), date(2025, 1, 4), date(2025, 1, 7)]
+    assert Recurrence(3, until=date(2025, 1, 1)).dates(date(2025, 1, 1)) == [date(2025, 1, 1)]
+    with pytest.raises(ValueError, match="end date must not be before the start date"):
+        Recurrence.weekly(until=date(2024, 12, 31)).dates(date(2025, 1, 1))
+
+def test_recurrence_validation():
+    with pytest.raises(ValueError, match="interval must be positive"):
+        Recurrence(0, count=2)
+    with pytest.raises(ValueError, match="either a count or an end date"):
+        Recurrence(7)
+    with pytest.raises(ValueError, match="either a count or an end date"):
+        Recurrence(7, 2, date(2025, 1, 1))
+    with pytest.raises(ValueError, match="count must be positive"):
+        Recurrence.weekly(count=0)
+
+def test_series_conflict_error_pickles_with_its_dates():
+    error = pickle.loads(pickle.dumps(SeriesConflictError([date(2025, 1, 6), date(2025, 1, 13)])))
+    assert error.conflicts == [date(2025, 1, 6), date(2025, 1, 13)]
+    assert str(error) == "Doctor is not available on 2 date(s): 2025-01-06, 2025-01-13"
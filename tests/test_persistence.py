@@ -0,0 +1,250 @@
+import os
+import time as time_module
+import pytest
+from datetime import date, time
+from src.columnar import ColumnarRepository
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate, Recurrence
+from src.persistence import DurableHospitalSystem, SyncPolicy, LOG_FILE, read_log
+from src.snapshot import list_snapshots, snapshot_name, write_snapshot
+
+def populate(system):
+    system.add_patient(Patient("p1", "John", 30, "M", True, "HealthPlus"))
+    system.add_patient(Patient("p2", "Jane", 25, "F"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.add_doctor(Doctor("d2", "Dr. Grey", "Surgery"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0), "Checkup")
+    system.schedule_appointment("a2", "p2", "d1", date(2025, 1, 1), time(11, 30))
+    system.schedule_appointment("a3", "p2", "d2", date(2025, 1, 2), time(9, 0))
+    system.add_anamnesis(Anamnesis("a1", "Cough", "Flu"))
+    system.add_exam_request(ExamRequest("r1", "a1", "Blood Test", "Fasting"))
+    system.add_medical_certificate(MedicalCertificate("c1", "a1", 3))
+    system.complete_appointment("a1")
+    system.get_appointment("a3").cancel()
+    system.remove_doctor("d2")
+
+def test_imported_status_survives_restart(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+        system.bulk_schedule([Appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0), AppointmentStatus.COMPLETED),
+                              Appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0))])
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.appointments == system.appointments
+        assert recovered.get_appointment("a1").status == AppointmentStatus.COMPLETED
+        recovered.check_invariants()
+
+@pytest.mark.parametrize("policy", list(SyncPolicy))
+def test_recovery_rebuilds_state(tmp_path, policy):
+    with DurableHospitalSystem(str(tmp_path), policy) as system:
+        populate(system)
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.patients == system.patients
+        assert recovered.doctors == system.doctors
+        assert recovered.appointments == system.appointments
+        assert recovered.get_appointment("a1").status == AppointmentStatus.COMPLETED
+        assert recovered.get_appointment("a3").status == AppointmentStatus.CANCELLED
+        assert recovered.get_anamnesis("a1").diagnosis == "Flu"
+        assert recovered.get_exam_requests_by_appointment("a1")[0].description == "Fasting"
+        assert recovered.get_medical_certificates_by_appointment("a1")[0].days == 3
+        recovered.check_invariants()
+
+def test_failed_operations_are_not_logged(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        with pytest.raises(ValueError):
+            system.add_patient(Patient("p1", "John", 30, "M"))
+        with pytest.raises(ValueError):
+            system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+
+    records = [record for _, record in read_log(os.path.join(str(tmp_path), LOG_FILE))]
+    assert [r["op"] for r in records] == ["add_patient"]
+
+def test_failed_log_write_changes_nothing(tmp_path, monkeypatch):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        populate(system)
+        system.add_patient(Patient("p3", "Ann", 40, "F"))
+        system.schedule_appointment("a4", "p2", "d1", date(2025, 1, 3), time(9, 0))
+        statuses = {app_id: app.status for app_id, app in system.appointments.items()}
+        counts = system.appointment_counts_snapshot()
+        subscription = system.enable_change_feed().subscribe()
+
+        def fail(op, args):
+            raise OSError("No space left on device")
+        monkeypatch.setattr(system._log, "append", fail)
+        changes = [
+            lambda: system.cancel_appointment("a4"),
+            lambda: system.get_appointment("a4").complete(),
+            lambda: system.add_patient(Patient("p4", "Bob", 50, "M")),
+            lambda: system.remove_patient("p3"),
+            lambda: system.add_doctor(Doctor("d3", "Dr. Who", "Surgery")),
+            lambda: system.schedule_appointment("a5", "p3", "d1", date(2025, 1, 3), time(10, 0)),
+            lambda: system.schedule_series("s", "p3", "d1", date(2025, 2, 3), time(9, 0), Recurrence.weekly(count=3)),
+            lambda: system.add_anamnesis(Anamnesis("a4", "Cough", "Flu")),
+            lambda: system.add_exam_request(ExamRequest("r2", "a4", "X-Ray")),
+            lambda: system.add_medical_certificate(MedicalCertificate("c2", "a4", 1)),
+        ]
+        for change in changes:
+            with pytest.raises(OSError):
+                change()
+
+        assert {app_id: app.status for app_id, app in system.appointments.items()} == statuses
+        assert sorted(system.patients) == ["p1", "p2", "p3"]
+        assert sorted(system.doctors) == ["d1"]
+        assert "a4" not in system.anamneses and "r2" not in system.exam_requests
+        assert system.count_active_appointments_by_doctor("d1") == 2
+        assert system.appointment_counts_snapshot().by_status("d1") == counts.by_status("d1")
+        assert subscription.poll() == []
+        system.check_invariants()
+        monkeypatch.undo()
+        system.cancel_appointment("a4")
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.get_appointment("a4").status == AppointmentStatus.CANCELLED
+        recovered.check_invariants()
+
+def test_series_is_logged_as_one_record(tmp_path):
+    with DurableHospitalSystem(str(tmp_path), SyncPolicy.ALWAYS) as system:
+        populate(system)
+        system.schedule_series("s", "p2", "d1", date(2025, 1, 8), time(10, 0), Recurrence.weekly(count=10), "Follow-up")
+        system.schedule_series("t", "p1", "d1", date(2025, 1, 8), time(8, 0), Recurrence(2, until=date(2025, 1, 12)))
+        system.cancel_appointment("s-2")
+
+    records = [record for _, record in read_log(os.path.join(str(tmp_path), LOG_FILE))]
+    assert [r["op"] for r in records[-3:]] == ["schedule_series", "schedule_series", "set_status"]
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.appointments == system.appointments
+        assert recovered.get_appointment("s-10").description == "Follow-up"
+        assert recovered.get_appointment("t-3").date == date(2025, 1, 12)
+        recovered.check_invariants()
+
+def test_torn_final_record_is_discarded(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        system.add_patient(Patient("p2", "Jane", 25, "F"))
+
+    path = os.path.join(str(tmp_path), LOG_FILE)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 5)
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.get_patient("p1") is not None
+        assert recovered.get_patient("p2") is None
+        recovered.add_patient(Patient("p3", "Ann", 40, "F"))
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert sorted(recovered.patients) == ["p1", "p3"]
+        assert [r["seq"] for _, r in read_log(path)] == [1, 2]
+
+def test_corrupt_final_record_is_discarded(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        system.add_patient(Patient("p2", "Jane", 25, "F"))
+
+    path = os.path.join(str(tmp_path), LOG_FILE)
+    with open(path, "r+b") as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b"!!")
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert list(recovered.patients) == ["p1"]
+
+def test_corrupt_record_followed_by_intact_ones_is_kept(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        for i in range(5):
+            system.add_patient(Patient(f"p{i}", "John", 30, "M"))
+
+    path = os.path.join(str(tmp_path), LOG_FILE)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.seek(12)
+        f.write(b"!")
+
+    with pytest.raises(ValueError, match="corrupt at offset 0"):
+        DurableHospitalSystem(str(tmp_path))
+    assert os.path.getsize(path) == size
+
+def test_batch_tail_is_synced_without_another_write(tmp_path):
+    with DurableHospitalSystem(str(tmp_path), SyncPolicy.BATCH, batch_size=100, batch_interval=0.01) as system:
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        system.add_patient(Patient("p2", "Jane", 25, "F"))
+        deadline = time_module.monotonic() + 5
+        while system._log._pending and time_module.monotonic() < deadline:
+            time_module.sleep(0.005)
+        assert system._log._pending == 0
+
+def test_invalid_batch_size(tmp_path):
+    with pytest.raises(ValueError, match="Batch size must be positive"):
+        DurableHospitalSystem(str(tmp_path), SyncPolicy.BATCH, batch_size=0)
+
+def test_snapshot_truncates_log_and_restores(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        populate(system)
+        system.snapshot()
+        assert os.path.getsize(os.path.join(str(tmp_path), LOG_FILE)) == 0
+        system.schedule_appointment("a4", "p1", "d1", date(2025, 1, 3), time(8, 15, 30, 250))
+
+    assert len(list_snapshots(str(tmp_path))) == 1
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.patients == system.patients
+        assert recovered.doctors == system.doctors
+        assert recovered.appointments == system.appointments
+        assert recovered.anamneses == system.anamneses
+        assert recovered.exam_requests == system.exam_requests
+        assert recovered.medical_certificates == system.medical_certificates
+        assert recovered.get_appointment("a4").time == time(8, 15, 30, 250)
+        recovered.check_invariants()
+
+        # Restored appointments still report status changes to the system
+        recovered.get_appointment("a2").cancel()
+        recovered.schedule_appointment("a5", "p1", "d1", date(2025, 1, 1), time(11, 30))
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert recovered.get_appointment("a2").status == AppointmentStatus.CANCELLED
+        assert recovered.get_appointment("a5") is not None
+
+def test_periodic_snapshots_replace_older_ones(tmp_path):
+    with DurableHospitalSystem(str(tmp_path), snapshot_every=3) as system:
+        for i in range(7):
+            system.add_patient(Patient(f"p{i}", "John", 30, "M"))
+
+    snapshots = list_snapshots(str(tmp_path))
+    assert [seq for seq, _ in snapshots] == [6]
+    assert [r["seq"] for _, r in read_log(os.path.join(str(tmp_path), LOG_FILE))] == [7]
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert len(recovered.patients) == 7
+
+def test_log_records_covered_by_snapshot_are_skipped(tmp_path):
+    with DurableHospitalSystem(str(tmp_path)) as system:
+        system.add_patient(Patient("p1", "John", 30, "M"))
+        system.add_patient(Patient("p2", "Jane", 25, "F"))
+        # Simulate a crash between writing the snapshot and truncating the log
+        write_snapshot(system, os.path.join(str(tmp_path), snapshot_name(2)), 2)
+        system.add_patient(Patient("p3", "Ann", 40, "F"))
+
+    with DurableHospitalSystem(str(tmp_path)) as recovered:
+        assert list(recovered.patients) == ["p1", "p2", "p3"]
+        recovered.add_patient(Patient("p4", "Bob", 50, "M"))
+    assert [r["seq"] for _, r in read_log(os.path.join(str(tmp_path), LOG_FILE))] == [1, 2, 3, 4]
+
+def test_load_snapshot_rejects_other_files(tmp_path):
+    path = os.path.join(str(tmp_path), snapshot_name(1))
+    with open(path, "wb") as f:
+        f.write(b"not a snapshot at all")
+    with pytest.raises(ValueError, match="is not a snapshot file"):
+        DurableHospitalSystem(str(tmp_path))
+
+def test_compact_repository_recovers_from_snapshot_and_log(tmp_path):
+    with DurableHospitalSystem(str(tmp_path), repository=ColumnarRepository()) as system:
+        populate(system)
+        system.snapshot()
+        system.get_appointment("a2").cancel()
+
+    with DurableHospitalSystem(str(tmp_path), repository=ColumnarRepository()) as recovered:
+        assert isinstance(recovered.repository, ColumnarRepository)
+        assert recovered.appointments == system.appointments
+        assert recovered.get_appointment("a2").status == AppointmentStatus.CANCELLED
+        assert recovered.count_active_appointments_by_doctor("d1") == 0
+        recovered.check_invariants()
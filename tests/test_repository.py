@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import pytest
+from datetime import date, time
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, ExamRequest
+from src.repository import InMemoryRepository, SqliteRepository
+from src.system import HospitalSystem
+
+@pytest.fixture
+def system():
+    system = HospitalSystem(SqliteRepository())
+    system.add_patient(Patient("p1", "John", 30, "M", True, "HealthPlus"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    yield system
+    system.close()
+
+def query_plan(system, sql, params):
+    rows = system.repository._conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return " ".join(row[-1] for row in rows)
+
+def test_sqlite_state_survives_reopen(tmp_path):
+    path = os.path.join(str(tmp_path), "hospital.db")
+    system = HospitalSystem(SqliteRepository(path))
+    system.add_patient(Patient("p1", "John", 30, "M", True, "HealthPlus"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 30))
+    system.get_appointment("a1").cancel()
+    system.close()
+
+    reopened = HospitalSystem(SqliteRepository(path))
+    assert reopened.get_patient("p1") == Patient("p1", "John", 30, "M", True, "HealthPlus")
+    assert reopened.get_appointment("a1").status == AppointmentStatus.CANCELLED
+    assert reopened.repository._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    reopened.close()
+
+def test_sqlite_mapping_views(system):
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(11, 0))
+    assert len(system.appointments) == 2
+    assert list(system.appointments) == ["a1", "a2"]
+    assert [a.appointment_id for a in system.appointments.values()] == ["a1", "a2"]
+    assert [key for key, _ in system.appointments.items()] == ["a1", "a2"]
+    assert "a1" in system.appointments
+    assert "a3" not in system.appointments
+
+def test_sqlite_stale_copy_cannot_override_status(system):
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    first = system.get_appointment("a1")
+    second = system.get_appointment("a1")
+    first.cancel()
+    with pytest.raises(ValueError, match="is no longer Scheduled"):
+        second.complete()
+    assert second.status == AppointmentStatus.SCHEDULED
+    assert system.get_appointment("a1").status == AppointmentStatus.CANCELLED
+
+def test_sqlite_lookups_use_indexes(system):
+    assert "idx_appointments_patient" in query_plan(
+        system, "SELECT * FROM appointments WHERE patient_id = ? ORDER BY rowid", ("p1",))
+    assert "idx_appointments_slot" in query_plan(
+        system, "SELECT 1 FROM appointments WHERE doctor_id = ? AND date = ? AND time = ? AND status = 'Scheduled'",
+        ("d1", "2025-01-01", "10:00:00"))
+    assert "idx_exam_requests_appointment" in query_plan(
+        system, "SELECT * FROM exam_requests WHERE appointment_id = ? ORDER BY rowid", ("a1",))
+
+def test_sqlite_clinical_records_require_appointment(system):
+    with pytest.raises(sqlite3.IntegrityError):
+        system.repository.add_exam_request(ExamRequest("r1", "missing", "X-Ray"))
+
+def test_memory_appointment_that_cannot_be_sorted_leaves_no_trace():
+    repository = InMemoryRepository()
+    system = HospitalSystem(repository)
+    system.add_patient(Patient("p1", "John", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dr. House", "Diagnostic"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    with pytest.raises(TypeError):
+        repository.add_appointment(Appointment("a2", "p1", "d1", 20250101, time(11, 0)))
+    with pytest.raises(TypeError):
+        repository.add_appointment(Appointment("a3", "p1", "d2", date(2025, 1, 1), "10:00"))
+    assert list(system.appointments) == ["a1"]
+    assert repository.count_active_by_patient("p1") == 1
+    system.check_invariants()
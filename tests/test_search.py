@@ -0,0 +1,135 @@
+import os
+import pytest
+from datetime import date, time
+from src.models import Patient, Doctor, Anamnesis, ExamRequest
+from src.repository import SqliteRepository
+from src.search import TextIndex, fold, tokenize
+from src.sortedlist import SortedList
+from src.system import HospitalSystem
+
+@pytest.fixture
+def system():
+    system = HospitalSystem()
+    system.add_patient(Patient("p1", "João", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dra. Inês", "Cardiologia"))
+    for i in range(1, 5):
+        system.schedule_appointment(f"a{i}", "p1", "d1", date(2025, 1, i), time(10, 0))
+    system.add_anamnesis(Anamnesis("a1", "Dor no peito e falta de ar", "Angina"))
+    system.add_anamnesis(Anamnesis("a2", "Dor de cabeça", "Enxaqueca"))
+    system.add_anamnesis(Anamnesis("a3", "Dor torácica, dor ao respirar", "Pleurite"))
+    system.add_exam_request(ExamRequest("r1", "a2", "Eletrocardiograma", "Suspeita de dor no PEITO"))
+    system.add_exam_request(ExamRequest("r2", "a4", "Raio-X de tórax"))
+    return system
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    assert fold("Pressão ARTERIAL elevada, coração") == "pressao arterial elevada, coracao"
+    assert tokenize("Dor no peito e falta de ar") == ["dor", "peito", "falta", "ar"]
+    assert tokenize("raio-x_2") == ["raio", "x", "2"]
+
+def test_search_all_terms(system):
+    # a2 mentions "dor" in both its anamnesis and its exam request
+    assert system.search_clinical_text("dor peito") == ["a2", "a1"]
+    assert system.search_clinical_text("DOR NO PEITO") == ["a2", "a1"]
+    assert system.search_clinical_text("peito enxaqueca") == ["a2"]
+    assert system.search_clinical_text("peito fratura") == []
+    assert system.search_clinical_text("de") == []
+
+def test_search_is_accent_insensitive(system):
+    assert system.search_clinical_text("torax") == ["a4"]
+    assert sorted(system.search_clinical_text("tórax toracica", match_all=False)) == ["a3", "a4"]
+    assert system.search_clinical_text("cabeca") == ["a2"]
+
+def test_search_any_term_ranks_by_score(system):
+    # a2 and a3 mention "dor" twice and tie; ties go by appointment ID
+    assert system.search_clinical_text("dor", match_all=False) == ["a2", "a3", "a1"]
+    assert system.search_clinical_text("dor pleurite", match_all=False) == ["a3", "a2", "a1"]
+    assert system.search_clinical_text("dor pleurite", match_all=False, limit=1) == ["a3"]
+    with pytest.raises(ValueError, match="Limit must be positive"):
+        system.search_clinical_text("dor", limit=0)
+
+def test_failed_records_are_not_indexed(system):
+    with pytest.raises(ValueError):
+        system.add_anamnesis(Anamnesis("a1", "Febre alta", "Gripe"))
+    with pytest.raises(ValueError):
+        system.add_exam_request(ExamRequest("r1", "a1", "Hemograma"))
+    assert system.search_clinical_text("febre") == []
+    assert system.search_clinical_text("hemograma") == []
+
+def test_index_rebuilt_on_reopen(tmp_path):
+    path = os.path.join(str(tmp_path), "hospital.db")
+    system = HospitalSystem(SqliteRepository(path))
+    system.add_patient(Patient("p1", "João", 30, "M"))
+    system.add_doctor(Doctor("d1", "Dra. Inês", "Cardiologia"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.add_exam_request(ExamRequest("r1", "a1", "Ecocardiograma", "Sopro cardíaco"))
+    system.close()
+    reopened = HospitalSystem(SqliteRepository(path))
+    assert reopened.search_clinical_text("sopro cardiaco") == ["a1"]
+    reopened.close()
+
+def test_text_index_counts_documents():
+    index = TextIndex()
+    index.add("x", "febre")
+    index.add("x", "tosse")
+    index.add("y", "febre febre")
+    assert len(index) == 2
+    assert index.search("febre tosse") == ["x"]
+    assert index.search("febre") == ["y", "x"]
+
+@pytest.fixture
+def front_desk():
+    system = HospitalSystem()
+    for patient_id, name in [("P100", "Maria da Silva"), ("P101", "José Silveira"), ("P200", "Mário Souza"),
+                             ("X1", "Ana Maria Costa"), ("P102", "Márcia Silva Gonçalves")]:
+        system.add_patient(Patient(patient_id, name, 40, "F"))
+    return system
+
+def ids(patients):
+    return [p.patient_id for p in patients]
+
+def test_search_patients_by_id_prefix(front_desk):
+    assert ids(front_desk.search_patients("p10")) == ["P100", "P101", "P102"]
+    assert ids(front_desk.search_patients("x1")) == ["X1"]
+    assert ids(front_desk.search_patients("p10", limit=2)) == ["P100", "P101"]
+
+def test_search_patients_by_name_words(front_desk):
+    assert ids(front_desk.search_patients("silva")) == ["P100", "P102"]
+    assert ids(front_desk.search_patients("silv")) == ["P100", "P102", "P101"]
+    # Exact word matches come before words one typo away ("marcia", "mario")
+    assert ids(front_desk.search_patients("maria")) == ["P100", "X1", "P102", "P200"]
+    assert ids(front_desk.search_patients("mar")) == ["P102", "P100", "X1", "P200"]
+    assert ids(front_desk.search_patients("maria silva")) == ["P100", "P102"]
+    assert ids(front_desk.search_patients("SILVA mar")) == ["P100", "P102"]
+    assert ids(front_desk.search_patients("goncalves")) == ["P102"]
+    assert front_desk.search_patients("  ") == []
+
+def test_search_patients_tolerates_one_typo(front_desk):
+    assert ids(front_desk.search_patients("slva")) == ["P100", "P102"]
+    assert ids(front_desk.search_patients("silvva")) == ["P100", "P102"]
+    assert ids(front_desk.search_patients("sliva")) == ["P100", "P102"]
+    assert ids(front_desk.search_patients("souzza mario")) == ["P200"]
+    assert front_desk.search_patients("slv") == []
+
+def test_search_patients_follows_removals(front_desk):
+    front_desk.remove_patient("P100")
+    assert ids(front_desk.search_patients("silv")) == ["P102", "P101"]
+    assert ids(front_desk.search_patients("p10")) == ["P101", "P102"]
+    with pytest.raises(ValueError, match="Limit must be positive"):
+        front_desk.search_patients("silva", limit=0)
+
+def test_sorted_strings_across_blocks():
+    from src.search import _starting_with
+    values = SortedList()
+    words = [f"w{i:05d}" for i in range(3000)]
+    for word in reversed(words):
+        values.add(word)
+    values.add("w00001")
+    assert len(values) == 3000
+    assert list(_starting_with(values, "w0")) == words
+    for word in words[::2]:
+        values.remove(word)
+    values.remove("missing")
+    assert list(_starting_with(values, "w01")) == [w for w in words[1::2] if w.startswith("w01")]
+    assert list(values.irange("w00100", "w00106")) == ["w00101", "w00103", "w00105"]
+    assert list(values.irange("w02997")) == ["w02997", "w02999"]
+    assert list(values.irange("x")) == []
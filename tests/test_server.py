@@ -0,0 +1,148 @@
+import asyncio
+import json
+from src.server import start_server
+from src.system import HospitalSystem
+
+def request(method, path, body=None, headers=""):
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n{headers}\r\n"
+    return head.encode("ascii") + data
+
+async def read_response(reader):
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    headers = dict(line.split(": ", 1) for line in head[1:] if line)
+    body = await reader.readexactly(int(headers["Content-Length"]))
+    return status, json.loads(body) if body else None, headers
+
+def exchange(system, *requests):
+    """Send all requests pipelined on one connection and return the responses in order."""
+    async def run():
+        server = await start_server(system, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"".join(requests))
+        await writer.drain()
+        responses = [await read_response(reader) for _ in requests]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+    return asyncio.run(run())
+
+PATIENT = {"patient_id": "p1", "name": "John", "age": 30, "gender": "M", "has_insurance": True, "insurance_name": "HealthPlus"}
+DOCTOR = {"doctor_id": "d1", "name": "Dr. House", "specialty": "Diagnostic"}
+APPOINTMENT = {"appointment_id": "a1", "patient_id": "p1", "doctor_id": "d1", "date": "2025-01-01", "time": "10:00"}
+
+def test_pipelined_workflow():
+    system = HospitalSystem()
+    responses = exchange(
+        system,
+        request("POST", "/patients", PATIENT),
+        request("POST", "/doctors", DOCTOR),
+        request("POST", "/appointments", APPOINTMENT),
+        request("POST", "/anamneses", {"appointment_id": "a1", "symptoms": "Fever", "diagnosis": "Flu"}),
+        request("POST", "/exam-requests", {"request_id": "e1", "appointment_id": "a1", "exam_name": "Blood"}),
+        request("POST", "/certificates", {"certificate_id": "c1", "appointment_id": "a1", "days": 2}),
+        request("POST", "/appointments/a1/complete"),
+        request("GET", "/appointments/a1/bundle"),
+        request("GET", "/patients/p1/appointments"),
+    )
+    assert [status for status, _, _ in responses] == [201, 201, 201, 201, 201, 201, 200, 200, 200]
+    assert responses[2][1]["status"] == "Scheduled"
+    assert responses[6][1]["status"] == "Completed"
+    bundle = responses[7][1]
+    assert bundle["anamnesis"]["diagnosis"] == "Flu"
+    assert [r["request_id"] for r in bundle["exam_requests"]] == ["e1"]
+    assert [c["certificate_id"] for c in bundle["medical_certificates"]] == ["c1"]
+    assert [a["appointment_id"] for a in responses[8][1]] == ["a1"]
+    assert system.get_appointment("a1").status.value == "Completed"
+
+def test_errors_map_to_status_codes():
+    system = HospitalSystem()
+    responses = exchange(
+        system,
+        request("GET", "/patients/missing"),
+        request("POST", "/patients", PATIENT),
+        request("POST", "/patients", PATIENT),
+        request("POST", "/patients", {"patient_id": "p2"}),
+        request("POST", "/appointments", APPOINTMENT),
+        request("PUT", "/patients/p1"),
+        request("GET", "/nowhere"),
+        request("GET", "/free-slots?from=2025-01-01"),
+    )
+    assert [status for status, _, _ in responses] == [404, 201, 409, 400, 404, 405, 404, 400]
+    assert responses[0][1] == {"error": "Patient with ID missing not found"}
+    assert responses[2][1] == {"error": "Patient with ID p1 already exists"}
+    assert responses[4][1] == {"error": "Doctor with ID d1 not found"}
+
+def test_free_slots_and_removal():
+    system = HospitalSystem()
+    responses = exchange(
+        system,
+        request("POST", "/patients", PATIENT),
+        request("POST", "/doctors", DOCTOR),
+        request("POST", "/appointments", dict(APPOINTMENT, time="08:00")),
+        request("GET", "/free-slots?from=2025-01-01&doctor=d1&count=2"),
+        request("GET", "/doctors?specialty=Diagnostic"),
+        request("DELETE", "/patients/p1"),
+        request("POST", "/appointments/a1/cancel"),
+        request("DELETE", "/patients/p1"),
+    )
+    assert [status for status, _, _ in responses] == [201, 201, 201, 200, 200, 409, 200, 204]
+    assert responses[3][1] == [{"doctor_id": "d1", "date": "2025-01-01", "time": "08:30:00"},
+                               {"doctor_id": "d1", "date": "2025-01-01", "time": "09:00:00"}]
+    assert [d["doctor_id"] for d in responses[4][1]] == ["d1"]
+    assert "p1" not in system.patients
+
+def test_connection_close_is_honoured():
+    async def run():
+        server = await start_server(HospitalSystem(), port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request("GET", "/doctors", headers="Connection: close\r\n"))
+        status, body, headers = await read_response(reader)
+        rest = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return status, body, headers, rest
+    status, body, headers, rest = asyncio.run(run())
+    assert (status, body, headers["Connection"], rest) == (200, [], "close", b"")
+
+def test_malformed_request_gets_400():
+    async def run():
+        server = await start_server(HospitalSystem(), port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"garbage\r\n\r\n")
+        response = await read_response(reader)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+    status, body, _ = asyncio.run(run())
+    assert (status, body) == (400, {"error": "Malformed request line"})
+
+def test_badly_typed_fields_get_400_and_bugs_get_500():
+    system = HospitalSystem()
+
+    def broken(*args):
+        raise RuntimeError("boom")
+
+    system.get_doctors_by_specialty = broken
+    responses = exchange(
+        system,
+        request("POST", "/patients", PATIENT),
+        request("POST", "/doctors", DOCTOR),
+        request("POST", "/appointments", dict(APPOINTMENT, date=20250101)),
+        request("POST", "/patients", dict(PATIENT, patient_id="p2", age="old")),
+        request("POST", "/patients", dict(PATIENT, patient_id=7)),
+        request("GET", "/doctors?specialty=Diagnostic"),
+        request("POST", "/appointments", APPOINTMENT),
+    )
+    assert [status for status, _, _ in responses] == [201, 201, 400, 400, 400, 500, 201]
+    assert responses[2][1] == {"error": "Field date: Invalid date value 20250101"}
+    assert responses[5][1] == {"error": "Internal server error"}
+    assert list(system.appointments) == ["a1"]
+    assert list(system.patients) == ["p1"]
@@ -0,0 +1,139 @@
+import pytest
+from datetime import date, time, timedelta
+from src.models import (Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate,
+                        Recurrence, SeriesConflictError)
+from src.sharding import HashRing, ShardedHospitalSystem
+
+def test_hash_ring_spreads_keys_and_moves_few_when_growing():
+    keys = [f"d{i}" for i in range(5000)]
+    four, five = HashRing(4), HashRing(5)
+    owners = [four.shard_for(key) for key in keys]
+    assert owners == [HashRing(4).shard_for(key) for key in keys]
+    assert all(owners.count(shard) > 500 for shard in range(4))
+    moved = [key for key, owner in zip(keys, owners) if five.shard_for(key) != owner]
+    # Only keys taken over by the new shard move
+    assert all(five.shard_for(key) == 4 for key in moved)
+    assert len(moved) < len(keys) * 0.35
+    with pytest.raises(ValueError, match="Shard count must be positive"):
+        HashRing(0)
+
+@pytest.fixture
+def front():
+    with ShardedHospitalSystem(shards=3) as front:
+        front.add_patient(Patient("p1", "John", 30, "M"))
+        front.add_patient(Patient("p2", "Ann", 40, "F"))
+        for i in range(6):
+            front.add_doctor(Doctor(f"d{i}", f"Dr. {i}", "Cardiology" if i % 2 else "Surgery"))
+        yield front
+
+def test_bookings_go_to_the_doctors_shard(front):
+    assert len({front.shard_of(f"d{i}") for i in range(6)}) > 1
+    for i in range(6):
+        front.schedule_appointment(f"a{i}", "p1", f"d{i}", date(2025, 1, 6 - i), time(9, 0))
+    with pytest.raises(ValueError, match="Doctor is not available at this time"):
+        front.schedule_appointment("a9", "p2", "d0", date(2025, 1, 6), time(9, 0))
+    with pytest.raises(ValueError, match="Appointment with ID a3 already exists"):
+        front.schedule_appointment("a3", "p2", "d0", date(2025, 1, 7), time(9, 0))
+    with pytest.raises(ValueError, match="Doctor with ID d9 not found"):
+        front.schedule_appointment("a9", "p2", "d9", date(2025, 1, 7), time(9, 0))
+
+    front.cancel_appointment("a1")
+    front.complete_appointment("a2")
+    assert front.get_appointment("a1").status == AppointmentStatus.CANCELLED
+    assert front.get_appointment("a9") is None
+    with pytest.raises(ValueError, match="Appointment with ID a9 not found"):
+        front.cancel_appointment("a9")
+    with pytest.raises(ValueError, match="Cannot cancel a completed appointment"):
+        front.cancel_appointment("a2")
+
+    # Gathered from every shard in time order
+    assert [a.appointment_id for a in front.get_appointments_by_patient("p1")] == ["a5", "a4", "a3", "a2", "a1", "a0"]
+    assert front.get_appointments_by_patient("p2") == []
+    assert front.count_active_appointments_by_patient("p1") == 4
+    assert front.count_active_appointments_by_doctor("d0") == 1
+    assert [a.appointment_id for a in front.get_appointments_by_doctor("d3")] == ["a3"]
+    front.check_invariants()
+
+def test_patients_are_replicated(front):
+    front.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(9, 0))
+    with pytest.raises(ValueError, match="Cannot remove patient with active appointments"):
+        front.remove_patient("p1")
+    front.complete_appointment("a1")
+    front.remove_patient("p1")
+    assert front.get_patient("p1") is None
+    with pytest.raises(ValueError, match="Patient with ID p1 not found"):
+        front.remove_patient("p1")
+    with pytest.raises(ValueError, match="Patient with ID p2 already exists"):
+        front.add_patient(Patient("p2", "Ann", 40, "F"))
+    front.check_invariants()
+
+def test_doctor_queries(front):
+    assert sorted(d.doctor_id for d in front.get_doctors_by_specialty("Cardiology")) == ["d1", "d3", "d5"]
+    assert front.get_doctor("d4").specialty == "Surgery"
+    front.remove_doctor("d4")
+    assert front.get_doctor("d4") is None
+
+    front.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(8, 0))
+    slots = front.find_free_slots(date(2025, 1, 1), date(2025, 1, 1), specialty="Cardiology", count=4)
+    assert [(s.doctor_id, s.time) for s in slots] == [("d3", time(8, 0)), ("d5", time(8, 0)),
+                                                      ("d1", time(8, 30)), ("d3", time(8, 30))]
+    assert front.find_free_slots(date(2025, 1, 1), date(2025, 1, 1), doctor_id="d1", count=1)[0].time == time(8, 30)
+
+def test_schedule_many(front):
+    day = date(2025, 2, 1)
+    rows = [Appointment(f"a{i}", "p1", f"d{i % 6}", day + timedelta(days=i // 6), time(9, 0)) for i in range(30)]
+    rows.append(Appointment("a0", "p1", "d1", day, time(10, 0)))
+    rows.append(Appointment("b1", "p1", "d1", day, time(9, 0)))
+    rows.append(Appointment("b2", "p9", "d2", day, time(11, 0)))
+    result = front.schedule_many(rows)
+    assert result.applied == 30
+    assert [(e.row, e.message) for e in result.errors] == [
+        (30, "Appointment with ID a0 already exists"),
+        (31, "Doctor is not available at this time"),
+        (32, "Patient with ID p9 not found"),
+    ]
+    assert front.count_active_appointments_by_patient("p1") == 30
+    front.cancel_appointment("a29")
+    assert front.count_active_appointments_by_patient("p1") == 29
+    front.check_invariants()
+
+def test_schedule_series(front):
+    series = front.schedule_series("s", "p1", "d2", date(2025, 1, 6), time(9, 0), Recurrence.weekly(count=12))
+    assert [app.appointment_id for app in series] == [f"s-{n}" for n in range(1, 13)]
+    front.cancel_appointment("s-12")
+    assert front.count_active_appointments_by_doctor("d2") == 11
+    with pytest.raises(SeriesConflictError) as error:
+        front.schedule_series("t", "p2", "d2", date(2025, 1, 13), time(9, 0), Recurrence(14, count=3))
+    assert error.value.conflicts == [date(2025, 1, 13), date(2025, 1, 27), date(2025, 2, 10)]
+    with pytest.raises(ValueError, match="Appointment with ID s-1 already exists"):
+        front.schedule_series("s", "p2", "d3", date(2025, 1, 6), time(9, 0), Recurrence.weekly(count=1))
+    front.check_invariants()
+
+def test_clinical_records_go_to_the_appointments_shard(front):
+    for i in range(6):
+        front.schedule_appointment(f"a{i}", "p1", f"d{i}", date(2025, 1, 6), time(9, 0))
+    for i in range(6):
+        front.add_anamnesis(Anamnesis(f"a{i}", "Cough", "Flu"))
+        front.add_exam_request(ExamRequest(f"r{i}", f"a{i}", "Blood Test"))
+        front.add_medical_certificate(MedicalCertificate(f"c{i}", f"a{i}", i + 1))
+    with pytest.raises(ValueError, match="Anamnesis for appointment a1 already exists"):
+        front.add_anamnesis(Anamnesis("a1", "Fever", "Flu"))
+    # Another shard has never seen r1 or c1, so the front rejects the duplicate IDs itself
+    with pytest.raises(ValueError, match="Exam request with ID r1 already exists"):
+        front.add_exam_request(ExamRequest("r1", "a4", "X-Ray"))
+    with pytest.raises(ValueError, match="Certificate with ID c1 already exists"):
+        front.add_medical_certificate(MedicalCertificate("c1", "a4", 2))
+    with pytest.raises(ValueError, match="Appointment with ID a9 not found"):
+        front.add_exam_request(ExamRequest("r9", "a9", "X-Ray"))
+
+    assert front.get_anamnesis("a3").diagnosis == "Flu"
+    assert front.get_anamnesis("a9") is None
+    assert [r.request_id for r in front.get_exam_requests_by_appointment("a4")] == ["r4"]
+    assert [c.days for c in front.get_medical_certificates_by_appointment("a5")] == [6]
+    assert front.get_medical_certificates_by_appointment("a9") == []
+    bundle = front.get_appointment_bundle("a2")
+    assert (bundle.appointment.appointment_id, bundle.anamnesis.appointment_id) == ("a2", "a2")
+    assert [r.request_id for r in bundle.exam_requests] == ["r2"]
+    front.complete_appointment("a2")
+    assert bundle.appointment.status == AppointmentStatus.SCHEDULED
+    front.check_invariants()
@@ -1,11 +1,21 @@
+import copy
+import dataclasses
+import pickle
 import pytest
-from datetime import date, time
-from src.models import Patient, Doctor, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate
+from datetime import date, datetime, time, timedelta
+from src.models import Patient, Doctor, Appointment, AppointmentStatus, Anamnesis, ExamRequest, MedicalCertificate, BulkImportError, Recurrence, SeriesConflictError
+from src.columnar import ColumnarRepository
+from src.repository import InMemoryRepository, SqliteRepository
 from src.system import HospitalSystem
 
-@pytest.fixture
-def system():
-    return HospitalSystem()
+REPOSITORIES = {"memory": InMemoryRepository, "sqlite": SqliteRepository, "columnar": ColumnarRepository}
+
+@pytest.fixture(params=sorted(REPOSITORIES))
+def system(request):
+    repository = REPOSITORIES[request.param]()
+    system = HospitalSystem(repository)
+    yield system
+    system.close()
 
 @pytest.fixture
 def sample_patient():
@@ -234,3 +244,357 @@ def test_add_medical_certificate_duplicate(system, sample_patient, sample_doctor
     system.add_medical_certificate(cert)
     with pytest.raises(ValueError, match="already exists"):
         system.add_medical_certificate(cert)
+
+def test_appointment_indexes_follow_schedule_cancel_complete(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.add_patient(Patient("p2", "Jane", 25, "F"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.schedule_appointment("a2", "p2", "d1", date(2025, 1, 1), time(11, 0))
+    system.schedule_appointment("a3", "p1", "d1", date(2025, 1, 2), time(10, 0))
+    system.check_invariants()
+
+    system.cancel_appointment("a1")
+    system.complete_appointment("a3")
+    system.check_invariants()
+
+    assert [a.appointment_id for a in system.get_appointments_by_patient("p1")] == ["a1", "a3"]
+    assert [a.appointment_id for a in system.get_appointments_by_doctor("d1")] == ["a1", "a2", "a3"]
+    assert system.get_appointments_by_patient("p1")[0].status == AppointmentStatus.CANCELLED
+
+def test_appointment_indexes_empty_for_known_entity(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    assert system.get_appointments_by_patient("p1") == []
+    assert system.get_appointments_by_doctor("d1") == []
+
+def test_check_invariants_detects_stale_index(sample_patient, sample_doctor):
+    system = HospitalSystem(InMemoryRepository())
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    del system.appointments["a1"]
+    with pytest.raises(AssertionError, match="index does not match"):
+        system.check_invariants()
+
+def test_cancel_releases_doctor_slot(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.cancel_appointment("a1")
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.check_invariants()
+
+def test_direct_status_change_releases_doctor_slot(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.get_appointment("a1").complete()
+    system.check_invariants()
+    app = system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    assert app.status == AppointmentStatus.SCHEDULED
+    with pytest.raises(ValueError, match="Doctor is not available"):
+        system.schedule_appointment("a3", "p1", "d1", date(2025, 1, 1), time(10, 0))
+
+def test_remove_after_direct_cancel(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(11, 0))
+    assert system.count_active_appointments_by_patient("p1") == 2
+
+    system.get_appointment("a1").cancel()
+    with pytest.raises(ValueError, match="Cannot remove doctor with active appointments"):
+        system.remove_doctor("d1")
+
+    system.get_appointment("a2").complete()
+    system.get_appointment("a2").complete()
+    system.check_invariants()
+    assert system.count_active_appointments_by_doctor("d1") == 0
+    system.remove_patient("p1")
+    system.remove_doctor("d1")
+
+def test_get_appointment_bundle(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2023, 1, 1), time(10, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2023, 1, 2), time(10, 0))
+    anamnesis = Anamnesis("a1", "Fever", "Flu")
+    system.add_anamnesis(anamnesis)
+    system.add_exam_request(ExamRequest("r1", "a1", "X-Ray"))
+    system.add_exam_request(ExamRequest("r2", "a2", "Blood Test"))
+    system.add_exam_request(ExamRequest("r3", "a1", "MRI"))
+    system.add_medical_certificate(MedicalCertificate("c1", "a1", 2))
+    system.check_invariants()
+
+    bundle = system.get_appointment_bundle("a1")
+    assert bundle.appointment.appointment_id == "a1"
+    assert bundle.anamnesis == anamnesis
+    assert [r.request_id for r in bundle.exam_requests] == ["r1", "r3"]
+    assert [c.certificate_id for c in bundle.medical_certificates] == ["c1"]
+
+    empty = system.get_appointment_bundle("a2")
+    assert empty.anamnesis is None
+    assert empty.medical_certificates == []
+
+def test_get_appointment_bundle_not_found(system):
+    with pytest.raises(ValueError, match="Appointment with ID nonexistent not found"):
+        system.get_appointment_bundle("nonexistent")
+
+def test_bulk_add_patients_atomic_rejects_whole_batch(system, sample_patient):
+    system.add_patient(sample_patient)
+    batch = [Patient("p2", "Jane", 25, "F"), Patient("p1", "John", 30, "M"), Patient("p2", "Ann", 40, "F")]
+    with pytest.raises(BulkImportError) as e:
+        system.bulk_add_patients(batch)
+    assert [(err.row, err.message) for err in e.value.errors] == [
+        (1, "Patient with ID p1 already exists"),
+        (2, "Patient with ID p2 already exists"),
+    ]
+    assert system.get_patient("p2") is None
+
+def test_bulk_add_doctors_reports_per_row(system, sample_doctor):
+    system.add_doctor(sample_doctor)
+    result = system.bulk_add_doctors([Doctor("d2", "Dr. Grey", "Surgery"), Doctor("d1", "Dr. Who", "Time")], atomic=False)
+    assert result.applied == 1
+    assert [err.row for err in result.errors] == [1]
+    assert system.get_doctor("d2") is not None
+
+def test_bulk_schedule_detects_conflicts_inside_batch(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a0", "p1", "d1", date(2025, 1, 1), time(9, 0))
+    batch = [
+        Appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0)),
+        Appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0)),
+        Appointment("a3", "p9", "d1", date(2025, 1, 1), time(11, 0)),
+        Appointment("a4", "p1", "d9", date(2025, 1, 1), time(11, 0)),
+        Appointment("a1", "p1", "d1", date(2025, 1, 1), time(12, 0)),
+        Appointment("a5", "p1", "d1", date(2025, 1, 1), time(9, 0)),
+        Appointment("a6", "p1", "d1", date(2025, 1, 1), time(13, 0), description="Follow-up"),
+    ]
+    result = system.bulk_schedule(batch, atomic=False)
+    assert result.applied == 2
+    assert [(err.row, err.message) for err in result.errors] == [
+        (1, "Doctor is not available at this time"),
+        (2, "Patient with ID p9 not found"),
+        (3, "Doctor with ID d9 not found"),
+        (4, "Appointment with ID a1 already exists"),
+        (5, "Doctor is not available at this time"),
+    ]
+    assert system.get_appointment("a6").description == "Follow-up"
+    assert system.count_active_appointments_by_doctor("d1") == 3
+    system.check_invariants()
+
+def test_bulk_schedule_atomic_applies_nothing_on_error(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    batch = [
+        Appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0)),
+        Appointment("a2", "p1", "d1", date(2025, 1, 1), time(10, 0)),
+    ]
+    with pytest.raises(BulkImportError, match="row 1: Doctor is not available"):
+        system.bulk_schedule(batch)
+    assert len(system.appointments) == 0
+    assert system.bulk_schedule(batch[:1]).applied == 1
+
+def test_schedule_series_books_every_occurrence(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    series = system.schedule_series("s", "p1", "d1", date(2025, 1, 6), time(9, 0), Recurrence.weekly(count=52))
+    assert len(series) == 52
+    assert (series[0].appointment_id, series[0].date) == ("s-1", date(2025, 1, 6))
+    assert (series[-1].appointment_id, series[-1].date) == ("s-52", date(2025, 12, 29))
+    assert system.count_active_appointments_by_doctor("d1") == 52
+
+    series = system.schedule_series("t", "p1", "d1", date(2025, 1, 6), time(10, 0), Recurrence(10, until=date(2025, 2, 5)),
+                                    "Physiotherapy")
+    assert [app.date for app in series] == [date(2025, 1, 6), date(2025, 1, 16), date(2025, 1, 26), date(2025, 2, 5)]
+    assert system.get_appointment("t-4").description == "Physiotherapy"
+    system.check_invariants()
+
+def test_schedule_series_reports_every_conflict_and_books_nothing(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 13), time(9, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 2, 3), time(9, 0))
+    system.schedule_appointment("a3", "p1", "d1", date(2025, 1, 20), time(9, 0))
+    system.cancel_appointment("a3")
+    with pytest.raises(SeriesConflictError, match="Doctor is not available on 2 date") as error:
+        system.schedule_series("s", "p1", "d1", date(2025, 1, 6), time(9, 0), Recurrence.weekly(count=8))
+    assert error.value.conflicts == [date(2025, 1, 13), date(2025, 2, 3)]
+    assert len(system.appointments) == 3
+
+    system.schedule_appointment("s-3", "p1", "d1", date(2025, 5, 5), time(9, 0))
+    with pytest.raises(ValueError, match="Appointment with ID s-3 already exists"):
+        system.schedule_series("s", "p1", "d1", date(2025, 3, 3), time(9, 0), Recurrence.weekly(count=4))
+    with pytest.raises(ValueError, match="Patient with ID p9 not found"):
+        system.schedule_series("t", "p9", "d1", date(2025, 3, 3), time(9, 0), Recurrence.weekly(count=4))
+    with pytest.raises(ValueError, match="Doctor with ID d9 not found"):
+        system.schedule_series("t", "p1", "d9", date(2025, 3, 3), time(9, 0), Recurrence.weekly(count=4))
+    assert len(system.appointments) == 4
+    system.check_invariants()
+
+def test_patient_history_lists_visits_with_their_records(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 2), time(9, 0))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(9, 0))
+    system.add_anamnesis(Anamnesis("a1", "Cough", "Flu"))
+    system.add_exam_request(ExamRequest("r1", "a1", "Blood Test"))
+
+    history = system.get_patient_history("p1")
+    assert history.patient == sample_patient
+    assert [visit.appointment.appointment_id for visit in history.visits] == ["a1", "a2"]
+    assert history.visits[0].anamnesis.diagnosis == "Flu"
+    assert [r.request_id for r in history.visits[0].exam_requests] == ["r1"]
+    assert history.visits[1].anamnesis is None and history.visits[1].medical_certificates == []
+    with pytest.raises(ValueError, match="Patient with ID p9 not found"):
+        system.get_patient_history("p9")
+
+def test_patient_history_cache_is_invalidated_by_every_change(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_patient(Patient("p2", "Ann", 40, "F"))
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(9, 0))
+    other = system.get_patient_history("p2")
+
+    changes = [
+        lambda: system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 2), time(9, 0)),
+        lambda: system.add_anamnesis(Anamnesis("a1", "Cough", "Flu")),
+        lambda: system.add_exam_request(ExamRequest("r1", "a1", "Blood Test")),
+        lambda: system.add_medical_certificate(MedicalCertificate("c1", "a1", 3)),
+        lambda: system.complete_appointment("a1"),
+        lambda: system.get_appointment("a2").cancel(),
+    ]
+    for change in changes:
+        before = system.get_patient_history("p1")
+        assert system.get_patient_history("p1") is before
+        change()
+        after = system.get_patient_history("p1")
+        assert after is not before
+    assert after.visits[0].appointment.status == AppointmentStatus.COMPLETED
+    assert after.visits[0].medical_certificates[0].days == 3
+    assert after.visits[1].appointment.status == AppointmentStatus.CANCELLED
+    # Changes for p1 never touched p2's entry
+    assert system.get_patient_history("p2") is other
+
+    stats = system.history_cache_stats()
+    assert (stats.hits, stats.misses, stats.invalidations) == (12, 8, 6)
+
+def test_patient_history_cache_is_bounded(system, sample_doctor, monkeypatch):
+    monkeypatch.setattr(HospitalSystem, "HISTORY_CACHE_SIZE", 3)
+    small = HospitalSystem(system.repository)
+    for i in range(5):
+        small.add_patient(Patient(f"p{i}", f"Patient {i}", 30, "F"))
+        small.get_patient_history(f"p{i}")
+    stats = small.history_cache_stats()
+    assert (stats.size, stats.capacity, stats.evictions, stats.hits) == (3, 3, 2, 0)
+    small.get_patient_history("p4")
+    assert small.history_cache_stats().hits == 1
+
+def test_booked_appointments_copy_and_pickle_without_the_system(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    booked = system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    assert dataclasses.asdict(booked)["appointment_id"] == "a1"
+    assert dataclasses.astuple(booked)[0] == "a1"
+    for duplicate in (pickle.loads(pickle.dumps(booked)), copy.deepcopy(booked), copy.copy(booked)):
+        assert duplicate == booked
+        # Copies are detached: changing one leaves the system's appointment and indexes alone
+        duplicate.cancel()
+        assert system.get_appointment("a1").status == AppointmentStatus.SCHEDULED
+        assert system.count_active_appointments_by_doctor("d1") == 1
+    system.get_appointment("a1").cancel()
+    assert system.count_active_appointments_by_doctor("d1") == 0
+    system.check_invariants()
+
+def test_find_free_slots_for_doctor(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(8, 0))
+    system.schedule_appointment("a2", "p1", "d1", date(2025, 1, 1), time(9, 15))
+    system.schedule_appointment("a3", "p1", "d1", date(2025, 1, 1), time(10, 0))
+    system.cancel_appointment("a3")
+
+    slots = system.find_free_slots(date(2025, 1, 1), date(2025, 1, 2), doctor_id="d1", count=3,
+                                   slot_length=timedelta(minutes=30), day_start=time(8, 0), day_end=time(11, 0))
+    assert [(s.date, s.time) for s in slots] == [
+        (date(2025, 1, 1), time(8, 30)),
+        (date(2025, 1, 1), time(9, 30)),
+        (date(2025, 1, 1), time(10, 0)),
+    ]
+
+def test_find_free_slots_spills_to_next_day(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(8, 0))
+    slots = system.find_free_slots(date(2025, 1, 1), date(2025, 1, 3), doctor_id="d1", count=2,
+                                   slot_length=timedelta(hours=1), day_start=time(8, 0), day_end=time(9, 0))
+    assert [s.date for s in slots] == [date(2025, 1, 2), date(2025, 1, 3)]
+    assert system.find_free_slots(date(2025, 1, 1), date(2025, 1, 1), doctor_id="d1",
+                                  slot_length=timedelta(hours=1), day_start=time(8, 0), day_end=time(9, 0)) == []
+
+def test_find_free_slots_by_specialty(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.add_doctor(Doctor("d2", "Dr. Jones", "Cardiology"))
+    system.add_doctor(Doctor("d3", "Dr. Grey", "Surgery"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 1), time(8, 0))
+    slots = system.find_free_slots(date(2025, 1, 1), date(2025, 1, 1), specialty="Cardiology", count=3)
+    assert [(s.doctor_id, s.time) for s in slots] == [("d2", time(8, 0)), ("d1", time(8, 30)), ("d2", time(8, 30))]
+
+def test_find_free_slots_validation(system, sample_doctor):
+    system.add_doctor(sample_doctor)
+    with pytest.raises(ValueError, match="either a doctor ID or a specialty"):
+        system.find_free_slots(date(2025, 1, 1), date(2025, 1, 2))
+    with pytest.raises(ValueError, match="Doctor with ID d9 not found"):
+        system.find_free_slots(date(2025, 1, 1), date(2025, 1, 2), doctor_id="d9")
+    with pytest.raises(ValueError, match="Slot length must be positive"):
+        system.find_free_slots(date(2025, 1, 1), date(2025, 1, 2), doctor_id="d1", slot_length=timedelta(0))
+
+def test_get_appointments_between(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    system.add_doctor(Doctor("d2", "Dr. Jones", "Surgery"))
+    system.schedule_appointment("a1", "p1", "d1", date(2025, 1, 2), time(9, 0))
+    system.schedule_appointment("a2", "p1", "d2", date(2025, 1, 1), time(14, 0))
+    system.schedule_appointment("a3", "p1", "d1", date(2025, 1, 1), time(8, 0))
+    system.schedule_appointment("a4", "p1", "d2", date(2025, 1, 2), time(9, 0))
+    system.schedule_appointment("a5", "p1", "d1", date(2025, 1, 3), time(8, 0))
+    system.cancel_appointment("a3")
+    system.schedule_appointment("a6", "p1", "d1", date(2025, 1, 1), time(8, 0))
+
+    def ids(appointments):
+        return [a.appointment_id for a in appointments]
+
+    # Same moment in booking order, every status included
+    assert ids(system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 3))) == ["a3", "a6", "a2", "a1", "a4"]
+    assert ids(system.get_appointments_between(date(2025, 1, 2), date(2025, 1, 3))) == ["a1", "a4"]
+    assert ids(system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 9), doctor_id="d1")) == ["a3", "a6", "a1", "a5"]
+    assert ids(system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 9), doctor_id="d1",
+                                               status=AppointmentStatus.CANCELLED)) == ["a3"]
+    # Start is inclusive and end exclusive, to the second
+    assert ids(system.get_appointments_between(datetime(2025, 1, 1, 8, 0), datetime(2025, 1, 2, 9, 0))) == ["a3", "a6", "a2"]
+    assert ids(system.get_appointments_between(datetime(2025, 1, 1, 8, 0, 1), datetime(2025, 1, 2, 9, 0, 1))) == ["a2", "a1", "a4"]
+    assert ids(system.get_appointments_between(date(2025, 1, 4), date(2025, 1, 4))) == []
+    assert ids(system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 9), doctor_id="d2",
+                                               status=AppointmentStatus.COMPLETED)) == []
+
+def test_get_appointments_between_is_lazy(system, sample_patient, sample_doctor):
+    system.add_patient(sample_patient)
+    system.add_doctor(sample_doctor)
+    for day in range(1, 29):
+        system.schedule_appointment(f"a{day}", "p1", "d1", date(2025, 2, day), time(8, 0))
+    appointments = system.get_appointments_between(date(2025, 2, 1), date(2025, 3, 1), doctor_id="d1")
+    assert next(appointments).appointment_id == "a1"
+    assert next(appointments).appointment_id == "a2"
+    system.check_invariants()
+
+def test_get_appointments_between_validation(system, sample_doctor):
+    system.add_doctor(sample_doctor)
+    with pytest.raises(ValueError, match="Start must not be after end"):
+        system.get_appointments_between(date(2025, 1, 2), date(2025, 1, 1))
+    # Checked up front rather than when the iterator is first read
+    with pytest.raises(ValueError, match="Doctor with ID d9 not found"):
+        system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 2), doctor_id="d9")
+    assert list(system.get_appointments_between(date(2025, 1, 1), date(2025, 1, 2), doctor_id="d1")) == []